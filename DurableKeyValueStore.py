@@ -0,0 +1,624 @@
+# RWKeyValueStore that survives restarts: write-ahead log plus memory-mapped
+# snapshots.
+#
+# Every write is appended to a log before put() returns, and compact() folds
+# the log into a sorted snapshot file. Opening a store maps the newest
+# snapshot without reading it and replays only the log written since, so
+# start-up time depends on the length of that tail, not on the number of keys.
+#
+# The segments in memory hold only keys written since the snapshot (deletes
+# as tombstones). Any other key is binary-searched in the mapped snapshot and
+# its value unpickled straight from the mapping: the first read of a key costs
+# a few page faults, keys never read are never loaded.
+#
+# Keys must be str, bytes or int; values anything picklable. A value is
+# pickled when it's written, so changing a stored object in place afterwards
+# isn't persisted.
+#
+# `fsync` decides what has happened to a write when put() returns:
+#   "always"    the record is on disk. Concurrent writers share fsyncs (group
+#               commit): one of them syncs everything appended so far while
+#               the others wait for it, then the next one takes over
+#   "interval"  the record is written to the OS, which a background thread
+#               fsyncs every `fsync_interval` seconds. Survives the process
+#               crashing; a power loss can lose the last interval
+#   "none"      written to the OS, synced only on compact() and close()
+#
+# Files in the store directory, N the generation:
+#   snapshot-N.kvs   every key as of the start of log-N.wal
+#   log-N.wal        records appended since
+# compact() starts log-(N+1), writes snapshot-(N+1) from snapshot-N plus the
+# segments, then deletes the older files; a crash part way leaves the old
+# snapshot and both logs, which replay to the same state. Once a log reaches
+# `compact_after` records a background compaction starts on its own.
+#
+#   store = DurableKeyValueStore("cache/", fsync="interval")
+#   store.put("BTC/INR", 5_000_000)
+#   store.close()
+import contextlib
+import mmap
+import os
+import pickle
+import struct
+import threading
+import zlib
+from array import array
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from RWKeyValueStore import _MISSING, RWKeyValueStore, Shard
+
+FSYNC_POLICIES = ("always", "interval", "none")
+
+_PUT, _DELETE = 1, 2
+_DELETED = object()
+_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+# log record: crc32 of the body, body length | body: op, key length, key, value
+_FRAME = struct.Struct("<II")
+_BODY = struct.Struct("<BI")
+
+# snapshot: header, records (key length, value length, key, value) sorted by
+# key, then the offset of every record as native uint64 for the binary search
+_MAGIC = b"KVSNAP01"
+_HEADER = struct.Struct("<8sQQ")  # magic, record count, index offset
+_ENTRY = struct.Struct("<II")
+
+
+# ---------- Keys ----------
+# Keys are stored as bytes tagged with their type, so "1", b"1" and 1 stay
+# distinct. Snapshots are sorted by these bytes, not by the keys themselves.
+def encode_key(key: Hashable) -> bytes:
+    kind = type(key)
+    if kind is str:
+        return b"s" + key.encode()
+    if kind is bytes:
+        return b"b" + key
+    if kind is int:
+        return b"i" + str(key).encode()
+    raise TypeError(f"keys must be str, bytes or int, not {kind.__name__}")
+
+
+def decode_key(data: bytes) -> Hashable:
+    tag, body = data[:1], data[1:]
+    if tag == b"s":
+        return body.decode()
+    if tag == b"b":
+        return bytes(body)
+    if tag == b"i":
+        return int(body)
+    raise ValueError(f"bad key tag {tag!r}")
+
+
+def snapshot_path(directory: str, generation: int) -> str:
+    return os.path.join(directory, f"snapshot-{generation:08d}.kvs")
+
+
+def log_path(directory: str, generation: int) -> str:
+    return os.path.join(directory, f"log-{generation:08d}.wal")
+
+
+def _generations(directory: str, prefix: str, suffix: str) -> List[int]:
+    found = []
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith(suffix):
+            try:
+                found.append(int(name[len(prefix):-len(suffix)]))
+            except ValueError:
+                pass
+    return sorted(found)
+
+
+def _fsync_dir(directory: str) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# ---------- Write-Ahead Log ----------
+class WriteAheadLog:
+    def __init__(self, path: str, fsync: str = "interval", interval: float = 0.05):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, not {fsync!r}")
+        self.path = path
+        self.fsync = fsync
+        # unbuffered: every append is one write(2), so a record is in the OS
+        # (and safe from a process crash) as soon as append() returns
+        self._file = open(path, "ab", buffering=0)
+        self._cond = threading.Condition(threading.Lock())
+        self._appended = 0
+        self._synced = 0
+        self._syncing = False
+        self.syncs = 0
+        self._closed = threading.Event()
+        self._syncer = None
+        if fsync == "interval":
+            self._syncer = threading.Thread(target=self._sync_loop, args=(interval,),
+                                            name=f"fsync {os.path.basename(path)}", daemon=True)
+            self._syncer.start()
+
+    @property
+    def records(self) -> int:
+        return self._appended
+
+    def append(self, op: int, key: bytes, value: bytes = b"") -> int:
+        """Write one record; returns its sequence number for commit()."""
+        body = _BODY.pack(op, len(key)) + key + value
+        record = _FRAME.pack(zlib.crc32(body), len(body)) + body
+        with self._cond:
+            self._file.write(record)
+            self._appended += 1
+            return self._appended
+
+    def commit(self, seq: int) -> None:
+        """Return once record `seq` and everything before it are fsynced.
+        Whoever finds no sync running starts one covering every record
+        appended so far; the rest wait for it and usually find their own
+        record already covered."""
+        with self._cond:
+            while self._synced < seq:
+                if self._syncing:
+                    self._cond.wait()
+                    continue
+                self._syncing = True
+                target = self._appended
+                synced = False
+                self._cond.release()
+                try:
+                    os.fsync(self._file.fileno())
+                    synced = True
+                finally:
+                    self._cond.acquire()
+                    self._syncing = False
+                    if synced:
+                        self._synced = max(self._synced, target)
+                        self.syncs += 1
+                    self._cond.notify_all()
+
+    def sync(self) -> None:
+        self.commit(self._appended)
+
+    def _sync_loop(self, interval: float) -> None:
+        while not self._closed.wait(interval):
+            if self._synced < self._appended:
+                self.sync()
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._syncer is not None:
+            self._syncer.join()
+        self.sync()
+        self._file.close()
+
+
+def read_log(path: str) -> Iterator[Tuple[int, bytes, memoryview]]:
+    """(op, key, value) for each record in the log at `path`. A torn or
+    corrupt record (a crash mid-write) ends the log: it and anything after it
+    are cut off once the records before it have been read."""
+    with open(path, "rb") as f:
+        data = f.read()
+    view = memoryview(data)
+    pos, end = 0, len(data)
+    while pos + _FRAME.size <= end:
+        crc, length = _FRAME.unpack_from(data, pos)
+        start = pos + _FRAME.size
+        body = view[start:start + length]
+        if len(body) < _BODY.size or len(body) < length or zlib.crc32(body) != crc:
+            break
+        op, key_length = _BODY.unpack_from(body)
+        key_end = _BODY.size + key_length
+        yield op, bytes(body[_BODY.size:key_end]), body[key_end:]
+        pos = start + length
+    if pos < end:
+        with open(path, "r+b") as f:
+            f.truncate(pos)
+
+
+# ---------- Snapshot ----------
+# A snapshot replaced by compact() or clear() is retired rather than closed:
+# readers that walk it without holding a segment lock (items(), keys(),
+# len()) pin it first, and the last of them to unpin closes it.
+class SnapshotFile:
+    def __init__(self, path: str):
+        self.path = path
+        self._users = 0
+        self._retired = False
+        self._users_lock = threading.Lock()
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, index = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or index + 8 * self.count > len(self._map):
+            self._map.close()
+            raise ValueError(f"{path} is not a snapshot file")
+        self._view = memoryview(self._map)
+        self._offsets = self._view[index:index + 8 * self.count].cast("Q")
+
+    def find(self, key: bytes) -> Optional[memoryview]:
+        """The stored value for encoded `key` (a view into the mapping), or None."""
+        offsets, data = self._offsets, self._map
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = offsets[mid]
+            key_length, value_length = _ENTRY.unpack_from(data, offset)
+            start = offset + _ENTRY.size
+            probe = data[start:start + key_length]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                start += key_length
+                return self._view[start:start + value_length]
+        return None
+
+    def __iter__(self) -> Iterator[Tuple[bytes, memoryview]]:
+        """(encoded key, value) in key order."""
+        data, view = self._map, self._view
+        for offset in self._offsets:
+            key_length, value_length = _ENTRY.unpack_from(data, offset)
+            start = offset + _ENTRY.size
+            end = start + key_length
+            yield data[start:end], view[end:end + value_length]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def pin(self) -> None:
+        with self._users_lock:
+            self._users += 1
+
+    def unpin(self) -> None:
+        with self._users_lock:
+            self._users -= 1
+            unused = self._retired and not self._users
+        if unused:
+            self.close()
+
+    def retire(self) -> None:
+        """Close now if nothing has it pinned, else when the last pin goes."""
+        with self._users_lock:
+            self._retired = True
+            unused = not self._users
+        if unused:
+            self.close()
+
+    def close(self) -> None:
+        try:
+            self._offsets.release()
+            self._view.release()
+            self._map.close()
+        except BufferError:
+            # a value view is still held somewhere; the mapping goes with it
+            pass
+
+    @staticmethod
+    def write(path: str, entries: Iterable[Tuple[bytes, bytes]]) -> int:
+        """Write (encoded key, value) pairs, already in key order, to a new
+        snapshot at `path`, atomically; returns the number written."""
+        offsets = array("Q")
+        tmp = path + ".tmp"
+        with open(tmp, "wb", buffering=1 << 20) as f:
+            f.write(bytes(_HEADER.size))
+            pos = _HEADER.size
+            for key, value in entries:
+                offsets.append(pos)
+                f.write(_ENTRY.pack(len(key), len(value)))
+                f.write(key)
+                f.write(value)
+                pos += _ENTRY.size + len(key) + len(value)
+            padding = -pos % 8
+            f.write(bytes(padding))
+            offsets.tofile(f)
+            f.seek(0)
+            f.write(_HEADER.pack(_MAGIC, len(offsets), pos + padding))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        _fsync_dir(os.path.dirname(path) or ".")
+        return len(offsets)
+
+
+def _merged(snapshot: SnapshotFile, changes: List[Tuple[bytes, Any]]) -> Iterator[Tuple[bytes, bytes]]:
+    """The snapshot's entries with `changes` (sorted (encoded key, value or
+    _DELETED) pairs) applied; untouched values are copied without unpickling."""
+    old = iter(snapshot)
+    current = next(old, None)
+    for key, value in changes:
+        while current is not None and current[0] < key:
+            yield current
+            current = next(old, None)
+        if current is not None and current[0] == key:
+            current = next(old, None)
+        if value is not _DELETED:
+            yield key, pickle.dumps(value, _PROTOCOL)
+    while current is not None:
+        yield current
+        current = next(old, None)
+
+
+# ---------- Store ----------
+class DurableKeyValueStore(RWKeyValueStore):
+    def __init__(self, path: str, shards: int = 16, fsync: str = "interval", fsync_interval: float = 0.05,
+                 compact_after: Optional[int] = 1_000_000):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, not {fsync!r}")
+        super().__init__(shards)
+        self.path = path
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.compact_after = compact_after
+        self._compact_lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        self.replayed = 0
+        self._recover()
+
+    def _open_log(self, generation: int) -> WriteAheadLog:
+        return WriteAheadLog(log_path(self.path, generation), self.fsync, self.fsync_interval)
+
+    def _recover(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        for name in os.listdir(self.path):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(self.path, name))
+        snapshots = _generations(self.path, "snapshot-", ".kvs")
+        if not snapshots:
+            SnapshotFile.write(snapshot_path(self.path, 0), ())
+            snapshots = [0]
+        generation = snapshots[-1]
+        self._snapshot = SnapshotFile(snapshot_path(self.path, generation))
+
+        logs = [g for g in _generations(self.path, "log-", ".wal") if g >= generation]
+        for log in logs:
+            for op, key, value in read_log(log_path(self.path, log)):
+                decoded = decode_key(key)
+                self._shard(decoded).data[decoded] = pickle.loads(value) if op == _PUT else _DELETED
+                self.replayed += 1
+        self._generation = max([generation] + logs)
+        self._log = self._open_log(self._generation)
+        self._remove_before(generation)
+
+    def _remove_before(self, generation: int) -> None:
+        for old in _generations(self.path, "snapshot-", ".kvs"):
+            if old < generation:
+                os.remove(snapshot_path(self.path, old))
+        for old in _generations(self.path, "log-", ".wal"):
+            if old < generation:
+                os.remove(log_path(self.path, old))
+
+    def _read(self, shard: Shard, key: Hashable, default: Any) -> Any:
+        value = shard.data.get(key, _MISSING)
+        if value is _MISSING:
+            raw = self._snapshot.find(encode_key(key))
+            return default if raw is None else pickle.loads(raw)
+        return default if value is _DELETED else value
+
+    def _committed(self, log: WriteAheadLog, seq: int) -> None:
+        if self.fsync == "always":
+            log.commit(seq)
+        if self.compact_after is not None and log.records >= self.compact_after:
+            compactor = self._compactor
+            if (compactor is None or not compactor.is_alive()) and not self._compact_lock.locked():
+                self._compactor = threading.Thread(target=self.compact, name="compact", daemon=True)
+                self._compactor.start()
+
+    @contextlib.contextmanager
+    def _pinned_snapshot(self) -> Iterator[SnapshotFile]:
+        # snapshots are only replaced with every segment locked, so under any
+        # one segment's lock the current one can't be retired before it's pinned
+        with self._shards[0].lock.read():
+            snapshot = self._snapshot
+            snapshot.pin()
+        try:
+            yield snapshot
+        finally:
+            snapshot.unpin()
+
+    @contextlib.contextmanager
+    def _all_locked(self) -> Iterator[None]:
+        with contextlib.ExitStack() as stack:
+            for shard in self._shards:
+                stack.enter_context(shard.lock.write())
+            yield
+
+    # ---------- Single Keys ----------
+    def get(self, key: Hashable, default: Any = None, timeout: Optional[float] = None) -> Any:
+        shard = self._shard(key)
+        with shard.lock.read(timeout):
+            return self._read(shard, key, default)
+
+    def __contains__(self, key: Hashable) -> bool:
+        shard = self._shard(key)
+        with shard.lock.read():
+            value = shard.data.get(key, _MISSING)
+            if value is _MISSING:
+                return self._snapshot.find(encode_key(key)) is not None
+            return value is not _DELETED
+
+    @contextlib.contextmanager
+    def view(self, key: Hashable, default: Any = None, timeout: Optional[float] = None) -> Iterator[Any]:
+        shard = self._shard(key)
+        with shard.lock.read(timeout):
+            yield self._read(shard, key, default)
+
+    def put(self, key: Hashable, value: Any, timeout: Optional[float] = None) -> None:
+        encoded, pickled = encode_key(key), pickle.dumps(value, _PROTOCOL)
+        shard = self._shard(key)
+        with shard.lock.write(timeout):
+            shard.data[key] = value
+            log = self._log
+            seq = log.append(_PUT, encoded, pickled)
+        self._committed(log, seq)
+
+    __setitem__ = put
+
+    def delete(self, key: Hashable, timeout: Optional[float] = None) -> bool:
+        encoded = encode_key(key)
+        shard = self._shard(key)
+        with shard.lock.write(timeout):
+            value = shard.data.get(key, _MISSING)
+            if value is _MISSING:
+                present = self._snapshot.find(encoded) is not None
+            else:
+                present = value is not _DELETED
+            if not present:
+                return False
+            # a tombstone even if the snapshot lacks the key: a compaction
+            # running now may be writing it into the next one
+            shard.data[key] = _DELETED
+            log = self._log
+            seq = log.append(_DELETE, encoded)
+        self._committed(log, seq)
+        return True
+
+    def compute(self, key: Hashable, fn: Callable[[Any], Any], timeout: Optional[float] = None) -> Any:
+        encoded = encode_key(key)
+        shard = self._shard(key)
+        with shard.lock.write(timeout):
+            value = fn(self._read(shard, key, None))
+            pickled = pickle.dumps(value, _PROTOCOL)
+            shard.data[key] = value
+            log = self._log
+            seq = log.append(_PUT, encoded, pickled)
+        self._committed(log, seq)
+        return value
+
+    # ---------- Several Keys ----------
+    def get_many(self, keys: Iterable[Hashable], timeout: Optional[float] = None) -> Dict[Hashable, Any]:
+        found = {}
+        for index, group in self._grouped(keys).items():
+            shard = self._shards[index]
+            with shard.lock.read(timeout):
+                for key in group:
+                    value = self._read(shard, key, _MISSING)
+                    if value is not _MISSING:
+                        found[key] = value
+        return found
+
+    def update(self, items: Dict[Hashable, Any], timeout: Optional[float] = None) -> None:
+        records = {key: (encode_key(key), pickle.dumps(value, _PROTOCOL)) for key, value in items.items()}
+        last: Dict[WriteAheadLog, int] = {}
+        for index, group in self._grouped(items).items():
+            shard = self._shards[index]
+            with shard.lock.write(timeout):
+                log = self._log
+                for key in group:
+                    shard.data[key] = items[key]
+                    last[log] = log.append(_PUT, *records[key])
+        for log, seq in last.items():
+            self._committed(log, seq)
+
+    def _changes(self, timeout: Optional[float] = None) -> Dict[Hashable, Any]:
+        changes: Dict[Hashable, Any] = {}
+        for shard in self._shards:
+            with shard.lock.read(timeout):
+                changes.update(shard.data)
+        return changes
+
+    def items(self, timeout: Optional[float] = None) -> List[Tuple[Hashable, Any]]:
+        """Not a point-in-time copy: a compaction finishing part way through
+        can't lose or duplicate keys, but writes made meanwhile may or may not
+        show up."""
+        # segments first: keys a compaction drops from them after this are in
+        # the snapshot taken next
+        changes = self._changes(timeout)
+        with self._pinned_snapshot() as snapshot:
+            result = [(key, pickle.loads(value)) for key, value in
+                      ((decode_key(encoded), value) for encoded, value in snapshot) if key not in changes]
+        result.extend((key, value) for key, value in changes.items() if value is not _DELETED)
+        return result
+
+    def keys(self) -> Iterator[Hashable]:
+        changes = self._changes()
+        with self._pinned_snapshot() as snapshot:
+            yield from (key for key in (decode_key(encoded) for encoded, _ in snapshot) if key not in changes)
+        yield from (key for key, value in changes.items() if value is not _DELETED)
+
+    def clear(self) -> None:
+        with self._compact_lock:
+            with self._all_locked():
+                old_log = self._log
+                self._generation += 1
+                SnapshotFile.write(snapshot_path(self.path, self._generation), ())
+                self._snapshot.retire()
+                self._snapshot = SnapshotFile(snapshot_path(self.path, self._generation))
+                self._log = self._open_log(self._generation)
+                for shard in self._shards:
+                    shard.data.clear()
+            old_log.close()
+            self._remove_before(self._generation)
+
+    def __len__(self) -> int:
+        """Snapshot size corrected by the keys written since it was taken:
+        costs a snapshot lookup per key in memory."""
+        changes = self._changes()
+        with self._pinned_snapshot() as snapshot:
+            total = snapshot.count
+            for key, value in changes.items():
+                stored = snapshot.find(encode_key(key)) is not None
+                if value is _DELETED:
+                    total -= stored
+                else:
+                    total += not stored
+        return total
+
+    # ---------- Persistence ----------
+    def compact(self) -> int:
+        """Fold the log into a new snapshot; returns the number of keys in it.
+        Writes carry on meanwhile (into the next log), only the switch to it
+        locks every segment."""
+        with self._compact_lock:
+            with self._all_locked():
+                frozen = [dict(shard.data) for shard in self._shards]
+                old_log = self._log
+                self._generation += 1
+                generation = self._generation
+                self._log = self._open_log(generation)
+            old_log.close()
+            _fsync_dir(self.path)
+
+            changes = sorted(((encode_key(key), value) for data in frozen for key, value in data.items()),
+                             key=lambda change: change[0])
+            path = snapshot_path(self.path, generation)
+            count = SnapshotFile.write(path, _merged(self._snapshot, changes))
+            snapshot = SnapshotFile(path)
+            with self._all_locked():
+                self._snapshot.retire()
+                self._snapshot = snapshot
+
+            # drop what the snapshot now holds, unless rewritten since
+            for shard, data in zip(self._shards, frozen):
+                with shard.lock.write():
+                    live = shard.data
+                    for key, value in data.items():
+                        if live.get(key, _MISSING) is value:
+                            del live[key]
+            self._remove_before(generation)
+            return count
+
+    def sync(self) -> None:
+        """fsync everything written so far, whatever the policy."""
+        self._log.sync()
+
+    def close(self) -> None:
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._compact_lock:
+            self._log.close()
+            self._snapshot.retire()
+
+    def __enter__(self) -> "DurableKeyValueStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def report(self) -> str:
+        return (f"{self.path}: generation {self._generation}, {self._snapshot.count:,} keys in snapshot, "
+                f"{sum(len(shard.data) for shard in self._shards):,} in memory, "
+                f"{self._log.records:,} log records ({self._log.syncs:,} fsyncs), "
+                f"{self.replayed:,} replayed on open")
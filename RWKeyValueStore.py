@@ -0,0 +1,140 @@
+# Thread-safe in-process key-value store with lock striping.
+#
+# Keys are spread over `shards` segments by hash, each a plain dict behind
+# its own ReadWriteLock. Reads of a segment run side by side, a write locks
+# only its own segment, so writes to different segments never wait on each
+# other and a write only holds up readers of 1/shards of the keys.
+# Operations on several keys (get_many, update, items, len) lock one segment
+# at a time, so they are atomic per segment, not across the whole store.
+#
+# Every operation takes an optional `timeout` and raises TimeoutError if the
+# segment's lock isn't acquired in time.
+#
+#   store = RWKeyValueStore(shards=16)
+#   store.put("BTC/INR", 5_000_000)
+#   store.compute("hits", lambda n: (n or 0) + 1)
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from ReadWriteLock import ReadWriteLock
+
+_MISSING = object()
+
+
+class Shard:
+    __slots__ = ("lock", "data")
+
+    def __init__(self):
+        self.lock = ReadWriteLock()
+        self.data: Dict[Hashable, Any] = {}
+
+
+class RWKeyValueStore:
+    def __init__(self, shards: int = 16):
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self._shards = [Shard() for _ in range(shards)]
+
+    @property
+    def shards(self) -> int:
+        return len(self._shards)
+
+    def _shard(self, key: Hashable) -> Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def _grouped(self, keys: Iterable[Hashable]) -> Dict[int, List[Hashable]]:
+        groups: Dict[int, List[Hashable]] = {}
+        count = len(self._shards)
+        for key in keys:
+            groups.setdefault(hash(key) % count, []).append(key)
+        return groups
+
+    # ---------- Single Keys ----------
+    def get(self, key: Hashable, default: Any = None, timeout: Optional[float] = None) -> Any:
+        shard = self._shard(key)
+        with shard.lock.read(timeout):
+            return shard.data.get(key, default)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        shard = self._shard(key)
+        with shard.lock.read():
+            return key in shard.data
+
+    @contextmanager
+    def view(self, key: Hashable, default: Any = None, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Hold the segment's read lock while the caller works with the value,
+        e.g. to read a large value without copying it. Writing to the store
+        inside the block deadlocks (the lock isn't reentrant)."""
+        shard = self._shard(key)
+        with shard.lock.read(timeout):
+            yield shard.data.get(key, default)
+
+    def put(self, key: Hashable, value: Any, timeout: Optional[float] = None) -> None:
+        shard = self._shard(key)
+        with shard.lock.write(timeout):
+            shard.data[key] = value
+
+    __setitem__ = put
+
+    def delete(self, key: Hashable, timeout: Optional[float] = None) -> bool:
+        """Remove `key`; returns whether it was there."""
+        shard = self._shard(key)
+        with shard.lock.write(timeout):
+            return shard.data.pop(key, _MISSING) is not _MISSING
+
+    def compute(self, key: Hashable, fn: Callable[[Any], Any], timeout: Optional[float] = None) -> Any:
+        """Atomically replace the value with fn(old value or None) and return
+        it. `fn` runs under the segment's write lock: keep it short and don't
+        touch the store from inside it."""
+        shard = self._shard(key)
+        with shard.lock.write(timeout):
+            value = shard.data[key] = fn(shard.data.get(key))
+            return value
+
+    # ---------- Several Keys ----------
+    def get_many(self, keys: Iterable[Hashable], timeout: Optional[float] = None) -> Dict[Hashable, Any]:
+        """The keys that are present, taking each segment's read lock once."""
+        found = {}
+        for index, group in self._grouped(keys).items():
+            shard = self._shards[index]
+            with shard.lock.read(timeout):
+                data = shard.data
+                for key in group:
+                    if key in data:
+                        found[key] = data[key]
+        return found
+
+    def update(self, items: Dict[Hashable, Any], timeout: Optional[float] = None) -> None:
+        for index, group in self._grouped(items).items():
+            shard = self._shards[index]
+            with shard.lock.write(timeout):
+                for key in group:
+                    shard.data[key] = items[key]
+
+    def items(self, timeout: Optional[float] = None) -> List[Tuple[Hashable, Any]]:
+        result: List[Tuple[Hashable, Any]] = []
+        for shard in self._shards:
+            with shard.lock.read(timeout):
+                result.extend(shard.data.items())
+        return result
+
+    def keys(self) -> Iterator[Hashable]:
+        return (key for key, _ in self.items())
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            with shard.lock.write():
+                shard.data.clear()
+
+    def __len__(self) -> int:
+        total = 0
+        for shard in self._shards:
+            with shard.lock.read():
+                total += len(shard.data)
+        return total
@@ -0,0 +1,107 @@
+# Writer-preferring read/write lock.
+#
+# Any number of readers can hold the lock together; a writer holds it alone.
+# As soon as a writer is waiting, new readers queue behind it instead of
+# joining the readers already inside, so a steady stream of reads can't keep
+# a writer out forever. Readers get in again as soon as no writer is waiting
+# or writing.
+#
+# Not reentrant: a thread holding the lock (either way) must not acquire it
+# again, and a reader can't upgrade to a writer.
+#
+#   lock = ReadWriteLock()
+#   with lock.read():
+#       ...
+#   with lock.write(timeout=0.5):   # TimeoutError if not acquired in time
+#       ...
+import threading
+from typing import Callable, Optional
+
+
+# Context manager for one side of the lock. Plain class rather than
+# @contextmanager: it is entered on every store read, and a generator-based
+# one costs more than the lock itself.
+class _Hold:
+    __slots__ = ("_acquire", "_release", "_timeout", "_name")
+
+    def __init__(self, acquire: Callable[[Optional[float]], bool], release: Callable[[], None],
+                 timeout: Optional[float], name: str):
+        self._acquire = acquire
+        self._release = release
+        self._timeout = timeout
+        self._name = name
+
+    def __enter__(self) -> None:
+        if not self._acquire(self._timeout):
+            raise TimeoutError(f"{self._name} lock not acquired within {self._timeout}s")
+
+    def __exit__(self, *exc) -> None:
+        self._release()
+
+
+class ReadWriteLock:
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+        self._read = _Hold(self.acquire_read, self.release_read, None, "read")
+        self._write = _Hold(self.acquire_write, self.release_write, None, "write")
+
+    def acquire_read(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            # fast path: nobody writing or waiting to
+            if not self._writing and not self._writers_waiting:
+                self._readers += 1
+                return True
+            if not self._cond.wait_for(lambda: not self._writing and not self._writers_waiting, timeout):
+                return False
+            self._readers += 1
+            return True
+
+    def release_read(self) -> None:
+        with self._cond:
+            if self._readers <= 0:
+                raise RuntimeError("release_read() without acquire_read()")
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                acquired = self._cond.wait_for(lambda: not self._writing and not self._readers, timeout)
+            finally:
+                self._writers_waiting -= 1
+            if acquired:
+                self._writing = True
+            elif not self._writers_waiting:
+                # readers held back for this writer can go in now
+                self._cond.notify_all()
+            return acquired
+
+    def release_write(self) -> None:
+        with self._cond:
+            if not self._writing:
+                raise RuntimeError("release_write() without acquire_write()")
+            self._writing = False
+            self._cond.notify_all()
+
+    def read(self, timeout: Optional[float] = None) -> _Hold:
+        if timeout is None:
+            return self._read
+        return _Hold(self.acquire_read, self.release_read, timeout, "read")
+
+    def write(self, timeout: Optional[float] = None) -> _Hold:
+        if timeout is None:
+            return self._write
+        return _Hold(self.acquire_write, self.release_write, timeout, "write")
+
+    @property
+    def readers(self) -> int:
+        return self._readers
+
+    @property
+    def writing(self) -> bool:
+        return self._writing
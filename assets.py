@@ -0,0 +1,146 @@
+# Asset pipeline for the pygame games in this repo.
+#
+# Build time: `python assets.py build` packs every animation frame listed in
+# ANIMATIONS into one sprite sheet (graphics/atlas.png) plus an index of frame
+# rects (graphics/atlas.json).
+#
+# Run time: Assets loads and converts the atlas once, hands out frames as
+# subsurfaces of it (so they share its display-matched pixel format) and
+# precomputed per-animation frame lists. Standalone images, fonts and sounds
+# are loaded on first use and memoized. The atlas is rebuilt automatically if
+# it is missing or older than any of its source frames.
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import pygame
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ATLAS_IMAGE = os.path.join("graphics", "atlas.png")
+ATLAS_INDEX = os.path.join("graphics", "atlas.json")
+ATLAS_WIDTH = 512
+PADDING = 1
+
+ANIMATIONS = {
+    "fly": ["graphics/Fly/Fly1.png", "graphics/Fly/Fly2.png"],
+    "snail": ["graphics/snail/snail1.png", "graphics/snail/snail2.png"],
+    "player_stand": ["graphics/Player/player_stand.png"],
+    "player_walk": ["graphics/Player/player_walk_1.png", "graphics/Player/player_walk_2.png"],
+    "player_jump": ["graphics/Player/jump.png"],
+}
+
+
+def _path(relative: str) -> str:
+    return os.path.join(ROOT, relative)
+
+
+def _sources() -> List[str]:
+    return sorted({frame for frames in ANIMATIONS.values() for frame in frames})
+
+
+def atlas_is_stale() -> bool:
+    if not (os.path.exists(_path(ATLAS_IMAGE)) and os.path.exists(_path(ATLAS_INDEX))):
+        return True
+    built = min(os.path.getmtime(_path(ATLAS_IMAGE)), os.path.getmtime(_path(ATLAS_INDEX)))
+    return any(os.path.getmtime(_path(source)) > built for source in _sources())
+
+
+def build_atlas() -> Dict[str, Tuple[int, int, int, int]]:
+    """Shelf-pack all animation frames, tallest first, into one sheet."""
+    images = {source: pygame.image.load(_path(source)) for source in _sources()}
+
+    rects = {}
+    x = y = shelf_height = 0
+    for source in sorted(images, key=lambda s: images[s].get_height(), reverse=True):
+        w, h = images[source].get_size()
+        if x + w > ATLAS_WIDTH:
+            x, y = 0, y + shelf_height + PADDING
+            shelf_height = 0
+        rects[source] = (x, y, w, h)
+        x += w + PADDING
+        shelf_height = max(shelf_height, h)
+
+    sheet = pygame.Surface((ATLAS_WIDTH, y + shelf_height), pygame.SRCALPHA)
+    for source, rect in rects.items():
+        sheet.blit(images[source], rect[:2])
+
+    pygame.image.save(sheet, _path(ATLAS_IMAGE))
+    with open(_path(ATLAS_INDEX), "w") as f:
+        json.dump({"frames": rects, "animations": ANIMATIONS}, f, indent=2)
+    return rects
+
+
+class Assets:
+    def __init__(self):
+        self._atlas = None
+        self._frames: Dict[str, pygame.Surface] = {}
+        self._animations: Dict[str, List[pygame.Surface]] = {}
+        self._images: Dict[str, pygame.Surface] = {}
+        self._fonts: Dict[Tuple[str, int], pygame.font.Font] = {}
+        self._sounds: Dict[str, pygame.mixer.Sound] = {}
+
+    def _load_atlas(self) -> None:
+        if atlas_is_stale():
+            build_atlas()
+        with open(_path(ATLAS_INDEX)) as f:
+            index = json.load(f)
+
+        # convert_alpha() needs a display mode; without one keep the raw sheet
+        self._atlas = pygame.image.load(_path(ATLAS_IMAGE))
+        if pygame.display.get_surface() is not None:
+            self._atlas = self._atlas.convert_alpha()
+
+        self._frames = {source: self._atlas.subsurface(rect) for source, rect in index["frames"].items()}
+        self._animations = {name: [self._frames[source] for source in frames]
+                            for name, frames in index["animations"].items()}
+
+    def frame(self, source: str) -> pygame.Surface:
+        if self._atlas is None:
+            self._load_atlas()
+        return self._frames[source]
+
+    def animation(self, name: str) -> List[pygame.Surface]:
+        if self._atlas is None:
+            self._load_atlas()
+        return self._animations[name]
+
+    def animation_frame(self, name: str, ticks: int, ticks_per_frame: int = 10) -> pygame.Surface:
+        frames = self.animation(name)
+        return frames[(ticks // ticks_per_frame) % len(frames)]
+
+    def image(self, path: str, alpha: bool = True) -> pygame.Surface:
+        surface = self._images.get(path)
+        if surface is None:
+            surface = pygame.image.load(_path(path))
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha() if alpha else surface.convert()
+            self._images[path] = surface
+        return surface
+
+    def font(self, path: str, size: int) -> pygame.font.Font:
+        key = (path, size)
+        font = self._fonts.get(key)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = self._fonts[key] = pygame.font.Font(_path(path), size)
+        return font
+
+    def sound(self, path: str) -> pygame.mixer.Sound:
+        sound = self._sounds.get(path)
+        if sound is None:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            sound = self._sounds[path] = pygame.mixer.Sound(_path(path))
+        return sound
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["build"]:
+        start = time.perf_counter()
+        rects = build_atlas()
+        print(f"packed {len(rects)} frames into {ATLAS_IMAGE} in {(time.perf_counter() - start) * 1000:.1f} ms")
+    else:
+        print("usage: python assets.py build")
@@ -0,0 +1,61 @@
+# Asset startup and blit benchmark: ad hoc per-file loading vs the Assets atlas.
+#
+#   python -m benchmarks.bench_assets [sprites per frame]
+#
+# Startup is timed from nothing loaded to every animation frame ready; the
+# blit test draws the same sprite mix each frame onto a display-format surface.
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import assets
+
+FRAMES = 300
+
+
+def load_adhoc(convert):
+    surfaces = {}
+    for frames in assets.ANIMATIONS.values():
+        for source in frames:
+            surface = pygame.image.load(assets._path(source))
+            surfaces[source] = surface.convert_alpha() if convert else surface
+    return surfaces
+
+
+def blit_cost(screen, sprites, count):
+    times = []
+    for frame in range(FRAMES):
+        start = time.perf_counter()
+        for i in range(count):
+            screen.blit(sprites[i % len(sprites)], ((i * 37) % 900, (i * 53) % 700))
+        times.append(time.perf_counter() - start)
+    return statistics.mean(times) * 1000
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    screen = pygame.display.set_mode((1000, 800))
+    if assets.atlas_is_stale():
+        assets.build_atlas()
+
+    start = time.perf_counter()
+    raw = load_adhoc(convert=False)
+    print(f"startup  ad hoc, unconverted  {(time.perf_counter() - start) * 1000:7.2f} ms")
+    start = time.perf_counter()
+    load_adhoc(convert=True)
+    print(f"startup  ad hoc, converted    {(time.perf_counter() - start) * 1000:7.2f} ms")
+    start = time.perf_counter()
+    store = assets.Assets()
+    for name in assets.ANIMATIONS:
+        store.animation(name)
+    print(f"startup  atlas                {(time.perf_counter() - start) * 1000:7.2f} ms")
+
+    atlas_sprites = [surface for name in assets.ANIMATIONS for surface in store.animation(name)]
+    print(f"blit     unconverted          {blit_cost(screen, list(raw.values()), count):7.3f} ms/frame")
+    print(f"blit     atlas                {blit_cost(screen, atlas_sprites, count):7.3f} ms/frame")
+    pygame.quit()
@@ -0,0 +1,129 @@
+# Write throughput per fsync policy and recovery time for DurableKeyValueStore.
+#
+#   python -m benchmarks.bench_durable_kv [keys] [seconds] [directory]
+#
+# writes    1 and WRITERS threads put small values for `seconds` under each
+#           fsync policy, next to the in-memory RWKeyValueStore
+# recovery  a store of `keys` keys (snapshot written directly) plus a log
+#           tail of TAIL writes is reopened: times the open, random reads
+#           from the mapped snapshot, and compacting the tail back into it
+#
+# Files go to a temporary directory under `directory` (default: the system
+# temp dir) - point it at the disk you care about, fsync costs are the
+# disk's, and on tmpfs they are free.
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from DurableKeyValueStore import FSYNC_POLICIES, DurableKeyValueStore, SnapshotFile, encode_key, snapshot_path
+from RWKeyValueStore import RWKeyValueStore
+
+WRITERS = 8
+TAIL = 100_000
+READS = 100_000
+VALUE = {"bid": 5_000_000.0, "ask": 5_000_100.0, "ts": 1_700_000_000}
+
+
+def key(i):
+    return f"key:{i:012d}"
+
+
+def write_throughput(store, threads, duration):
+    """Puts per second over all `threads`."""
+    stop = threading.Event()
+    counts = [0] * threads
+
+    def writer(index):
+        rng = random.Random(index)
+        count = 0
+        while not stop.is_set():
+            store.put(key(rng.randrange(1_000_000)), VALUE)
+            count += 1
+        counts[index] = count
+
+    workers = [threading.Thread(target=writer, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    time.sleep(duration)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def build(path, keys):
+    """A store directory holding `keys` keys in its snapshot and TAIL more
+    writes in its log."""
+    import pickle
+    value = pickle.dumps(VALUE, pickle.HIGHEST_PROTOCOL)
+    os.makedirs(path)
+    SnapshotFile.write(snapshot_path(path, 0), ((encode_key(key(i)), value) for i in range(keys)))
+    with DurableKeyValueStore(path, fsync="none", compact_after=None) as store:
+        rng = random.Random(1)
+        for i in range(TAIL):
+            if i % 10:
+                store.put(key(rng.randrange(keys * 2)), VALUE)
+            else:
+                store.delete(key(rng.randrange(keys)))
+
+
+if __name__ == "__main__":
+    keys = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    root = tempfile.mkdtemp(prefix="bench_durable_kv-", dir=sys.argv[3] if len(sys.argv) > 3 else None)
+    try:
+        print(f"Puts/second, {duration:g}s per run")
+        print(f"  {'threads':<14}{1:>10}{WRITERS:>10}")
+        memory = RWKeyValueStore()
+        print(f"  {'in-memory':<14}" + "".join(f"{write_throughput(memory, n, duration):10,.0f}" for n in (1, WRITERS)))
+        for policy in FSYNC_POLICIES:
+            rates = []
+            for threads in (1, WRITERS):
+                with DurableKeyValueStore(os.path.join(root, f"{policy}-{threads}"), fsync=policy,
+                                          compact_after=None) as store:
+                    rates.append(write_throughput(store, threads, duration))
+                    records, syncs = store._log.records, store._log.syncs
+            print(f"  {policy:<14}" + "".join(f"{rate:10,.0f}" for rate in rates)
+                  + f"   ({records / max(syncs, 1):,.1f} records/fsync at {WRITERS} threads)")
+
+        path = os.path.join(root, "recovery")
+        start = time.perf_counter()
+        build(path, keys)
+        size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+        print(f"Recovery: {keys:,} keys + {TAIL:,} log records, {size / 2 ** 20:,.0f} MiB "
+              f"(built in {time.perf_counter() - start:.1f}s)")
+
+        # drop the files from the page cache where we can, so reads fault from disk
+        if hasattr(os, "posix_fadvise"):
+            for name in os.listdir(path):
+                with open(os.path.join(path, name), "rb") as f:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+        start = time.perf_counter()
+        store = DurableKeyValueStore(path, compact_after=None)
+        print(f"  open          {time.perf_counter() - start:8.3f} s   ({store.replayed:,} records replayed)")
+        rng = random.Random(2)
+        probes = [key(rng.randrange(keys)) for _ in range(READS)]
+        for label in ("cold reads", "warm reads"):
+            start = time.perf_counter()
+            found = sum(store.get(probe) is not None for probe in probes)
+            spent = time.perf_counter() - start
+            print(f"  {label:<13} {READS / spent:8,.0f} /s   ({spent / READS * 1e6:.1f} us each, {found:,} found)")
+        start = time.perf_counter()
+        count = store.compact()
+        print(f"  compact       {time.perf_counter() - start:8.3f} s   ({count:,} keys)")
+        print(f"  {store.report()}")
+        store.close()
+
+        start = time.perf_counter()
+        store = DurableKeyValueStore(path, compact_after=None)
+        print(f"  reopen        {time.perf_counter() - start:8.3f} s   ({store.replayed:,} records replayed, "
+              f"{len(store):,} keys)")
+        store.close()
+    finally:
+        shutil.rmtree(root)
@@ -0,0 +1,50 @@
+# Headless draw-cost benchmark: full-window draw() vs DirtyRectRenderer.
+#
+#   python -m benchmarks.bench_render [frames]
+#
+# Uses SDL's dummy video driver, so it measures CPU-side fill/blit/update work.
+import os
+import random
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import rainDodge
+from dodge_render import DirtyRectRenderer
+from dodge_sim import DodgeSim
+
+
+def scene(frames, seed=1):
+    # the same star field for both renderers; hits are ignored so it keeps going
+    sim = DodgeSim(rng=random.Random(seed))
+    for _ in range(frames):
+        sim.ticks += 1
+        if sim.ticks % 20 == 0:
+            sim.stars.spawn(sim.rng.randint(0, sim.config.width - sim.config.star_width))
+        sim.stars.update(sim.config.star_vel, sim.player)
+        yield sim
+
+
+def bench(name, draw, frames):
+    times = []
+    for sim in scene(frames):
+        start = time.perf_counter()
+        draw(sim.player, sim.elapsed_time, sim.stars)
+        times.append(time.perf_counter() - start)
+    times = sorted(t * 1000 for t in times)
+    print(f"{name:<6} mean={statistics.mean(times):6.3f} ms  p95={times[int(len(times) * 0.95)]:6.3f} ms")
+
+
+if __name__ == "__main__":
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rainDodge.setup_window()
+
+    bench("full", rainDodge.draw, frames)
+    renderer = DirtyRectRenderer(rainDodge.WIN, rainDodge.FONT, rainDodge.BG_COLOR)
+    bench("dirty", renderer.draw, frames)
+    print(f"text cache: {renderer.text.hits} hits, {renderer.text.misses} misses")
+    pygame.quit()
@@ -0,0 +1,80 @@
+# Headless frame-time benchmark: original list-of-Rect star loop vs StarField.
+#
+#   python -m benchmarks.bench_stars [star counts...]
+#
+# Each run spawns enough stars per frame to keep roughly N on screen, warms up
+# until the screen is full, then times the movement/cull/collision step only.
+import random
+import statistics
+import sys
+import time
+
+import pygame
+
+from dodge_stars import StarField
+
+WIDTH, HEIGHT = 1000, 800
+STAR_WIDTH, STAR_HEIGHT = 30, 40
+STAR_VEL = 5
+PLAYER = pygame.Rect(WIDTH // 2 - 30, HEIGHT - 50, 60, 40)
+FRAMES = 300
+
+
+def legacy_step(stars, player):
+    hit = False
+    for star in stars[:]:
+        star.y += STAR_VEL
+        if star.y > HEIGHT:
+            stars.remove(star)
+        elif star.colliderect(player):
+            hit = True
+    return hit
+
+
+def run_legacy(per_frame, frames, rng):
+    stars = []
+    times = []
+    for frame in range(frames):
+        for _ in range(per_frame):
+            stars.append(pygame.Rect(rng.randint(0, WIDTH - STAR_WIDTH), -STAR_HEIGHT, STAR_WIDTH, STAR_HEIGHT))
+        start = time.perf_counter()
+        legacy_step(stars, PLAYER)
+        times.append(time.perf_counter() - start)
+    return times, len(stars)
+
+
+def run_starfield(per_frame, frames, rng):
+    stars = StarField(WIDTH, HEIGHT, STAR_WIDTH, STAR_HEIGHT)
+    times = []
+    for frame in range(frames):
+        for _ in range(per_frame):
+            stars.spawn(rng.randint(0, WIDTH - STAR_WIDTH))
+        start = time.perf_counter()
+        stars.update(STAR_VEL, PLAYER)
+        times.append(time.perf_counter() - start)
+    return times, len(stars)
+
+
+def summarize(name, count, times, warmup):
+    times = sorted(t * 1000 for t in times[warmup:])
+    p99 = times[int(len(times) * 0.99) - 1]
+    print(f"{name:<10} stars={count:>6}  mean={statistics.mean(times):7.3f} ms  "
+          f"p99={p99:7.3f} ms  max={times[-1]:7.3f} ms")
+
+
+if __name__ == "__main__":
+    targets = [int(n) for n in sys.argv[1:]] or [1000, 5000, 10000, 20000]
+    lifetime = (HEIGHT + STAR_HEIGHT) // STAR_VEL + 1
+
+    for target in targets:
+        per_frame = max(1, target // lifetime)
+        warmup = lifetime + 1
+        frames = warmup + FRAMES
+
+        times, count = run_starfield(per_frame, frames, random.Random(1))
+        summarize("starfield", count, times, warmup)
+
+        # the original loop is quadratic; keep it to sizes that finish
+        if target <= 10000:
+            times, count = run_legacy(per_frame, frames, random.Random(1))
+            summarize("legacy", count, times, warmup)
@@ -0,0 +1,48 @@
+# Headless tick-rate benchmark: list-of-Rect loop vs StarField vs ArrayStarField.
+#
+#   python -m benchmarks.bench_stars_np [star counts...]
+#
+# Holds roughly N stars on screen and times the move/cull/collide step. The
+# 60 ticks/s column says whether the step alone fits in a 16.7 ms frame.
+import random
+import statistics
+import sys
+import time
+
+from benchmarks.bench_stars import (HEIGHT, PLAYER, STAR_HEIGHT, STAR_VEL, STAR_WIDTH, WIDTH, run_legacy,
+                                    run_starfield)
+from dodge_stars_np import ArrayStarField
+
+FRAMES = 200
+
+
+def run_array(per_frame, frames, rng):
+    stars = ArrayStarField(WIDTH, HEIGHT, STAR_WIDTH, STAR_HEIGHT)
+    times = []
+    for frame in range(frames):
+        stars.spawn_many([rng.randint(0, WIDTH - STAR_WIDTH) for _ in range(per_frame)])
+        start = time.perf_counter()
+        stars.update(STAR_VEL, PLAYER)
+        times.append(time.perf_counter() - start)
+    return times, len(stars)
+
+
+def report(name, times, count, warmup):
+    mean = statistics.mean(times[warmup:]) * 1000
+    fits = "yes" if mean < 1000 / 60 else "no"
+    print(f"{name:<10} stars={count:>7}  mean={mean:8.3f} ms  ticks/s={1000 / mean:9,.0f}  60 ticks/s: {fits}")
+
+
+if __name__ == "__main__":
+    targets = [int(n) for n in sys.argv[1:]] or [10000, 100000]
+    lifetime = (HEIGHT + STAR_HEIGHT) // STAR_VEL + 1
+
+    for target in targets:
+        per_frame = max(1, target // lifetime)
+        warmup = lifetime + 1
+        frames = warmup + FRAMES
+
+        report("array", *run_array(per_frame, frames, random.Random(1)), warmup)
+        report("starfield", *run_starfield(per_frame, frames, random.Random(1)), warmup)
+        if target <= 10000:
+            report("legacy", *run_legacy(per_frame, frames, random.Random(1)), warmup)
@@ -0,0 +1,29 @@
+BASE_URL = "https://coinswitch.co"
+
+# ---------- Endpoints ----------
+VALIDATE_KEYS = "/trade/api/v2/validate/keys"
+TICKER = "/trade/api/v2/24hr/ticker"
+DEPTH = "/trade/api/v2/depth"
+TRADES = "/trade/api/v2/trades"
+ORDER = "/trade/api/v2/order"
+ORDERS = "/trade/api/v2/orders"
+PORTFOLIO = "/trade/api/v2/user/portfolio"
+
+# ---------- Futures ----------
+FUTURES_EXCHANGE = "EXCHANGE_2"
+FUTURES_INSTRUMENT_INFO = "/trade/api/v2/futures/instrument_info"
+
+# ---------- Rate Limits ----------
+# (requests, per seconds) allowed per endpoint; anything not listed gets
+# DEFAULT_RATE_LIMIT. Conservative defaults - set them to the limits of the
+# account's API plan.
+DEFAULT_RATE_LIMIT = (10, 1.0)
+RATE_LIMITS = {
+    TICKER: (20, 1.0),
+    DEPTH: (20, 1.0),
+    TRADES: (20, 1.0),
+    ORDER: (10, 1.0),
+    ORDERS: (5, 1.0),
+    PORTFOLIO: (5, 1.0),
+    FUTURES_INSTRUMENT_INFO: (2, 1.0),
+}
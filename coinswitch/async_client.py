@@ -0,0 +1,149 @@
+import asyncio
+import json
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from coinswitch.URL import BASE_URL, DEFAULT_RATE_LIMIT, RATE_LIMITS, TICKER, VALIDATE_KEYS
+from coinswitch.client import CoinSwitchError
+from coinswitch.signature_generation import EMPTY_PAYLOAD, Signer, canonical_payload, with_params
+from rate_limit import TokenBucket, backoff, parse_retry_after
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+
+# ---------- Async CoinSwitch Client ----------
+# Same signing as CoinSwitchClient, but on one aiohttp session, so any number
+# of calls can be in flight over at most `concurrency` keep-alive
+# connections:
+#   - each endpoint path has its own token bucket (URL.RATE_LIMITS, scaled
+#     by `headroom` so requests bunched up in transit still land under the
+#     exchange's limit), so a burst of ticker polls can't use up the budget
+#     for orders
+#   - identical GETs already in flight are coalesced: later callers wait on
+#     the first one's response instead of sending their own. They all get
+#     the same decoded object, so don't modify it
+#   - a 429 is retried up to `max_retries` times after the Retry-After (or a
+#     jittered backoff), any other non-2xx raises CoinSwitchError
+#
+#   async with AsyncCoinSwitchClient(API_KEY, SECRET_KEY) as client:
+#       tickers = await client.get_many(TICKER, [{"symbol": s, "exchange": "coinswitchx"} for s in symbols])
+class AsyncCoinSwitchClient:
+    def __init__(self, api_key, secret_key, base_url=BASE_URL, rate_limits=None,
+                 default_rate_limit=DEFAULT_RATE_LIMIT, headroom=0.9, concurrency=20, timeout=10,
+                 max_retries=3):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.signer = Signer(secret_key)
+        self.rate_limits = RATE_LIMITS if rate_limits is None else rate_limits
+        self.default_rate_limit = default_rate_limit
+        self.headroom = headroom
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.session = None
+        self._slots = None
+
+        self._buckets = {}
+        self._in_flight = {}
+        self.sent = 0
+        self.coalesced = 0
+        self.throttled = 0
+
+    async def open(self):
+        if self.session is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+            connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'Content-Type': 'application/json', 'X-AUTH-APIKEY': self.api_key})
+        return self
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _bucket(self, endpoint):
+        path = urlsplit(endpoint).path
+        bucket = self._buckets.get(path)
+        if bucket is None:
+            count, per = self.rate_limits.get(path, self.default_rate_limit)
+            # headroom slows the refill; the burst never drops below one request
+            bucket = self._buckets[path] = TokenBucket(count * self.headroom / per, count * self.headroom)
+        return bucket
+
+    # ---------- Requests ----------
+    async def request(self, method, endpoint, params=None, payload=None):
+        """Signed call; returns the decoded JSON response."""
+        if method != "GET":
+            return await self._send(method, endpoint, endpoint, canonical_payload(payload))
+
+        endpoint, signed_endpoint = with_params(endpoint, params)
+        task = self._in_flight.get(endpoint)
+        if task is None:
+            task = asyncio.ensure_future(self._send(method, endpoint, signed_endpoint, EMPTY_PAYLOAD))
+            self._in_flight[endpoint] = task
+            task.add_done_callback(lambda done: self._in_flight.pop(endpoint, None)
+                                   if self._in_flight.get(endpoint) is done else None)
+        else:
+            self.coalesced += 1
+        # one caller being cancelled must not cancel the request for the rest
+        return await asyncio.shield(task)
+
+    async def _send(self, method, endpoint, signed_endpoint, body):
+        headers = {'X-AUTH-SIGNATURE': self.signer.sign(method + signed_endpoint + body,
+                                                         cache=body == EMPTY_PAYLOAD)}
+        bucket = self._bucket(endpoint)
+        for attempt in range(self.max_retries + 1):
+            # take a token only once a connection is free, or requests queued
+            # behind the connection limit would all go out together
+            async with self._slots:
+                await bucket.acquire()
+                self.sent += 1
+                async with self.session.request(method, self.base_url + endpoint, data=body,
+                                                headers=headers) as response:
+                    data = await response.read()
+                    status = response.status
+                    retry_after = response.headers.get("Retry-After")
+            if status == 429 and attempt < self.max_retries:
+                self.throttled += 1
+                await asyncio.sleep(max(parse_retry_after(retry_after) or 0, backoff(attempt)))
+            elif status >= 300:
+                raise CoinSwitchError(status, data.decode("utf-8", errors="replace"))
+            else:
+                return loads(data)
+
+    async def get(self, endpoint, params=None):
+        return await self.request("GET", endpoint, params=params)
+
+    async def post(self, endpoint, payload=None):
+        return await self.request("POST", endpoint, payload=payload)
+
+    async def delete(self, endpoint, payload=None):
+        return await self.request("DELETE", endpoint, payload=payload)
+
+    async def get_many(self, endpoint, params_list, return_exceptions=False):
+        """GET `endpoint` once per params dict, all at once; results in order."""
+        return await asyncio.gather(*(self.get(endpoint, params) for params in params_list),
+                                    return_exceptions=return_exceptions)
+
+    async def tickers(self, symbols, exchange="coinswitchx"):
+        return await self.get_many(TICKER, [{"symbol": symbol, "exchange": exchange} for symbol in symbols])
+
+    async def validate_keys(self):
+        return await self.get(VALIDATE_KEYS)
+
+    def report(self):
+        return (f"CoinSwitch: {self.sent} requests sent, {self.coalesced} coalesced, "
+                f"{self.throttled} throttled (429)")
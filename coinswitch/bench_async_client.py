@@ -0,0 +1,150 @@
+import asyncio
+import collections
+import json
+import sys
+import time
+from urllib.parse import unquote_plus
+
+from aiohttp import web
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric import ed25519
+
+from coinswitch.URL import ORDER, RATE_LIMITS, TICKER
+from coinswitch.async_client import AsyncCoinSwitchClient
+from coinswitch.client import CoinSwitchClient, CoinSwitchError
+from rate_limit import TokenBucket
+
+# ---------- Async CoinSwitch client check ----------
+# A local mock exchange that answers every call after LATENCY, checks every
+# signature, and enforces URL.RATE_LIMITS per endpoint with its own token
+# buckets, answering 429 + Retry-After past them. Against it:
+#   sync       CoinSwitchClient polling each ticker once, one after another
+#   async      STRATEGIES callers each polling every ticker at once through
+#              one AsyncCoinSwitchClient, plus a burst of orders
+#   unlimited  the same async polling with the client's limits turned off and
+#              no retries, to show the mock really enforces them
+#
+#   python -m coinswitch.bench_async_client [symbols]
+
+API_KEY = "bench-api-key"
+LATENCY = 0.05
+STRATEGIES = 3
+ORDERS = 10
+
+
+class MockExchange:
+    def __init__(self, public_key):
+        self.public_key = public_key
+        self.buckets = {path: TokenBucket(count / per, count) for path, (count, per) in RATE_LIMITS.items()}
+        self.served = collections.Counter()
+        self.rejected = collections.Counter()
+        self.bad_signatures = 0
+
+    def _take(self, path):
+        bucket = self.buckets[path]
+        now = time.monotonic()
+        bucket.tokens = min(bucket.capacity, bucket.tokens + (now - bucket.updated) * bucket.rate)
+        bucket.updated = now
+        if bucket.tokens < 1:
+            return False
+        bucket.tokens -= 1
+        return True
+
+    async def handle(self, request):
+        body = await request.text() or "{}"
+        message = request.method + unquote_plus(request.path_qs) + body
+        try:
+            self.public_key.verify(bytes.fromhex(request.headers.get("X-AUTH-SIGNATURE", "")), message.encode())
+            if request.headers.get("X-AUTH-APIKEY") != API_KEY:
+                raise InvalidSignature
+        except (ValueError, InvalidSignature):
+            self.bad_signatures += 1
+            return web.json_response({"message": "Invalid Access"}, status=401)
+        if not self._take(request.path):
+            self.rejected[request.path] += 1
+            return web.json_response({"message": "Too many requests"}, status=429, headers={"Retry-After": "1"})
+
+        await asyncio.sleep(LATENCY)
+        self.served[request.path] += 1
+        if request.path == TICKER:
+            symbol = request.query["symbol"]
+            return web.json_response({"data": {request.query["exchange"]: {"symbol": symbol, "lastPrice": "1.0"}}})
+        order = json.loads(body)
+        return web.json_response({"data": {"order_id": f"o-{self.served[ORDER]}", **order}})
+
+    def reset(self):
+        self.__init__(self.public_key)
+
+
+async def serve(exchange):
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", exchange.handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+
+async def poll(client, symbols):
+    per_strategy = [client.tickers(symbols) for _ in range(STRATEGIES)]
+    return await asyncio.gather(*per_strategy, return_exceptions=True)
+
+
+async def main(count):
+    key = ed25519.Ed25519PrivateKey.generate()
+    secret_key = key.private_bytes_raw().hex()
+    exchange = MockExchange(key.public_key())
+    runner, port = await serve(exchange)
+    base_url = f"http://127.0.0.1:{port}"
+    symbols = [f"COIN{i}/INR" for i in range(count)]
+    print(f"{count} symbols, {STRATEGIES} callers each, mock latency {LATENCY * 1000:.0f} ms, "
+          f"ticker limit {RATE_LIMITS[TICKER][0]}/{RATE_LIMITS[TICKER][1]:g}s")
+    ok = True
+
+    with CoinSwitchClient(API_KEY, secret_key, base_url=base_url) as client:
+        start = time.perf_counter()
+        for symbol in symbols:
+            await asyncio.to_thread(client.get, TICKER, {"symbol": symbol, "exchange": "coinswitchx"})
+        spent = time.perf_counter() - start
+    print(f"  sync       {count:4d} tickers   {spent:5.2f}s   {sum(exchange.rejected.values())} rejected")
+
+    exchange.reset()
+    async with AsyncCoinSwitchClient(API_KEY, secret_key, base_url=base_url) as client:
+        start = time.perf_counter()
+        results = await poll(client, symbols)
+        spent = time.perf_counter() - start
+        failed = [r for r in results if isinstance(r, Exception)]
+        print(f"  async      {STRATEGIES * count:4d} tickers   {spent:5.2f}s   {exchange.served[TICKER]} sent, "
+              f"{sum(exchange.rejected.values())} rejected, {len(failed)} failed")
+        ok &= not failed and exchange.served[TICKER] == count and not exchange.rejected
+        ok &= all(r[i]["data"]["coinswitchx"]["symbol"] == s for r in results for i, s in enumerate(symbols))
+
+        start = time.perf_counter()
+        orders = await asyncio.gather(*(
+            client.post(ORDER, {"side": "buy", "symbol": symbols[i % count], "type": "limit", "price": 100 + i,
+                                "quantity": 1, "exchange": "coinswitchx"})
+            for i in range(ORDERS)))
+        spent = time.perf_counter() - start
+        print(f"  orders     {len(orders):4d} placed    {spent:5.2f}s   {exchange.rejected[ORDER]} rejected")
+        ok &= len({order["data"]["order_id"] for order in orders}) == ORDERS
+        print(f"  {client.report()}")
+
+    exchange.reset()
+    unlimited = {path: (10_000, 1.0) for path in RATE_LIMITS}
+    async with AsyncCoinSwitchClient(API_KEY, secret_key, base_url=base_url, rate_limits=unlimited,
+                                     max_retries=0) as client:
+        results = await client.get_many(TICKER, [{"symbol": s, "exchange": "coinswitchx"} for s in symbols],
+                                        return_exceptions=True)
+        throttled = sum(isinstance(r, CoinSwitchError) and r.status == 429 for r in results)
+    print(f"  unlimited  {count:4d} tickers   {throttled} got 429")
+    ok &= throttled > 0 or count <= RATE_LIMITS[TICKER][0]
+
+    ok &= exchange.bad_signatures == 0
+    await runner.cleanup()
+    return ok
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    sys.exit(0 if asyncio.run(main(count)) else 1)
@@ -0,0 +1,142 @@
+import http.server
+import json
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import unquote_plus
+
+import requests
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric import ed25519
+
+from coinswitch.URL import VALIDATE_KEYS
+from coinswitch.client import CoinSwitchClient
+from coinswitch.signature_generation import Signer, signature_message
+
+# ---------- CoinSwitch client benchmark ----------
+# Signs with a throwaway key and calls a local mock of the validate-keys
+# endpoint that checks every signature the way the exchange does. Compares the
+# old validate_keys.py path (parse the hex key, json.dumps, sign, one-off
+# requests.request on a new connection) with CoinSwitchClient.
+#
+#   python -m coinswitch.bench_client [requests]
+
+API_KEY = "bench-api-key"
+
+
+class MockExchange(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # answer in one segment; otherwise delayed ACKs add ~40 ms to every keep-alive call
+    disable_nagle_algorithm = True
+    public_key = None
+    rejected = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode() if length else "{}"
+        message = (self.command + unquote_plus(self.path) + body).encode()
+        try:
+            signature = bytes.fromhex(self.headers.get("X-AUTH-SIGNATURE", ""))
+            if self.path.split("?")[0] != VALIDATE_KEYS or self.headers.get("X-AUTH-APIKEY") != API_KEY:
+                raise InvalidSignature
+            self.public_key.verify(signature, message)
+            status, reply = 200, {"message": "Valid Access"}
+        except (ValueError, InvalidSignature):
+            MockExchange.rejected += 1
+            status, reply = 401, {"message": "Invalid Access"}
+        data = json.dumps(reply).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve_mock(public_key):
+    MockExchange.public_key = public_key
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), MockExchange)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def legacy_sign(secret_key, method, endpoint, payload):
+    signature_msg = method + endpoint + json.dumps(payload, separators=(',', ':'), sort_keys=True)
+    key = ed25519.Ed25519PrivateKey.from_private_bytes(bytes.fromhex(secret_key))
+    return key.sign(bytes(signature_msg, 'utf-8')).hex()
+
+
+def legacy_request(base_url, secret_key):
+    headers = {
+        'Content-Type': 'application/json',
+        'X-AUTH-SIGNATURE': legacy_sign(secret_key, "GET", VALIDATE_KEYS, {}),
+        'X-AUTH-APIKEY': API_KEY,
+    }
+    response = requests.request("GET", base_url + VALIDATE_KEYS, headers=headers, json={})
+    response.raise_for_status()
+    return response.json()
+
+
+def rate(fn, seconds=1.0):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for _ in range(100):
+            fn()
+        count += 100
+    return count / (time.perf_counter() - start)
+
+
+def latencies(fn, n):
+    times = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def report_latency(name, times):
+    times = sorted(times)
+    p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+    print(f"  {name:<20} p50 {statistics.median(times) * 1000:6.2f} ms   p99 {p99 * 1000:6.2f} ms   "
+          f"{len(times) / sum(times):6.0f} req/s")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    key = ed25519.Ed25519PrivateKey.generate()
+    secret_key = key.private_bytes_raw().hex()
+    server = serve_mock(key.public_key())
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    signer = Signer(secret_key)
+    order = {"symbol": "BTC/INR", "side": "buy", "type": "limit", "price": 5_000_000, "quantity": 0.0001,
+             "exchange": "coinswitchx"}
+
+    assert legacy_sign(secret_key, "POST", "/trade/api/v2/order", order) == \
+        signer.sign_request("POST", "/trade/api/v2/order", order)
+
+    print("Signatures/second")
+    for name, fn in [
+        ("legacy GET", lambda: legacy_sign(secret_key, "GET", VALIDATE_KEYS, {})),
+        ("Signer GET uncached", lambda: signer.sign(signature_message("GET", VALIDATE_KEYS), cache=False)),
+        ("Signer GET cached", lambda: signer.sign_request("GET", VALIDATE_KEYS)),
+        ("legacy order", lambda: legacy_sign(secret_key, "POST", "/trade/api/v2/order", order)),
+        ("Signer order", lambda: signer.sign_request("POST", "/trade/api/v2/order", order)),
+    ]:
+        print(f"  {name:<20} {rate(fn):10,.0f}/s")
+
+    print(f"validate keys against the local mock, {n} calls")
+    legacy = latencies(lambda: legacy_request(base_url, secret_key), n)
+    report_latency("one-off requests", legacy)
+    with CoinSwitchClient(API_KEY, secret_key, base_url=base_url) as client:
+        client.validate_keys()
+        pooled = latencies(client.validate_keys, n)
+    report_latency("CoinSwitchClient", pooled)
+    print(f"  {statistics.median(legacy) / statistics.median(pooled):.1f}x lower median latency, "
+          f"{MockExchange.rejected} rejected signatures")
+    server.shutdown()
+    sys.exit(1 if MockExchange.rejected else 0)
@@ -0,0 +1,84 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+from coinswitch.instrument_info import InstrumentRegistry
+
+# ---------- Instrument registry benchmark ----------
+# A fake instrument_info endpoint with COUNT contracts that takes
+# FETCH_LATENCY per call. Times a cold start (no snapshot, has to fetch), a
+# warm start from the snapshot, symbol and base-asset lookups, and a
+# background refresh that picks up a few changed contracts.
+#
+#   python -m coinswitch.bench_instruments [count]
+
+FETCH_LATENCY = 0.3
+ASSETS = ["BTC", "ETH", "SOL", "XRP", "DOGE", "ADA", "AVAX", "LINK", "DOT", "MATIC", "LTC", "TRX"]
+
+
+def fake_instruments(count):
+    data = {}
+    for i in range(count):
+        base = ASSETS[i % len(ASSETS)]
+        # perpetuals first, then dated contracts on the same assets
+        symbol = f"{base}USDT" if i < len(ASSETS) else f"{base}USDT_{i // len(ASSETS)}"
+        data[symbol] = {"base_asset": base.lower(), "quote_asset": "usdt", "price_precision": i % 5 + 1,
+                        "quantity_precision": i % 4, "min_quantity": "0.001", "max_quantity": "1000",
+                        "max_leverage": str(random.choice([10, 20, 25, 50, 75, 100]))}
+    return data
+
+
+class FakeEndpoint:
+    def __init__(self, data):
+        self.data = data
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(FETCH_LATENCY)
+        return self.data
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    endpoint = FakeEndpoint(fake_instruments(count))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "instruments.json")
+        cold, cold_time = timed(lambda: InstrumentRegistry(endpoint, path).start())
+        cold.stop()
+        warm, warm_time = timed(lambda: InstrumentRegistry(endpoint, path).start())
+        print(f"{count} instruments, snapshot {os.path.getsize(path) / 1024:.0f} KB")
+        print(f"  cold start  {cold_time * 1000:8.2f} ms  (fetch)")
+        print(f"  warm start  {warm_time * 1000:8.2f} ms  (snapshot, {endpoint.calls} fetch so far)")
+
+        symbols = [instrument.symbol for instrument in warm]
+        lookups = symbols * (200_000 // len(symbols))
+        _, spent = timed(lambda: [warm[symbol].round_price(101.2345) for symbol in lookups])
+        print(f"  lookup + round_price  {len(lookups) / spent:12,.0f}/s")
+        _, spent = timed(lambda: [warm.get(symbol) for symbol in lookups])
+        print(f"  get                   {len(lookups) / spent:12,.0f}/s")
+        _, spent = timed(lambda: [warm.by_base("BTC") for _ in lookups])
+        print(f"  by_base               {len(lookups) / spent:12,.0f}/s")
+        warm.stop()
+
+        for symbol in symbols[:5]:
+            endpoint.data[symbol] = dict(endpoint.data[symbol], max_leverage="5")
+        endpoint.data["NEWUSDT"] = dict(endpoint.data[symbols[0]], base_asset="new")
+        registry = InstrumentRegistry(endpoint, path, ttl=0.5).start()
+        deadline = time.time() + 5
+        while registry.refreshes == 0 and time.time() < deadline:
+            time.sleep(0.05)
+        registry.stop()
+        print(f"  {registry.report()}")
+        ok = registry.last_changes == (1, 5, 0) and registry[symbols[0]].max_leverage == 5.0 and \
+            InstrumentRegistry(endpoint, path).load()
+    sys.exit(0 if ok else 1)
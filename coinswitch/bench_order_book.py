@@ -0,0 +1,146 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from coinswitch.order_book import OrderBook
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+# ---------- Order book replay benchmark ----------
+# Replays a recorded depth stream (JSON lines: {"type": "snapshot"|"diff",
+# "seq", "bids", "asks"}, levels as [price, quantity] strings) into an
+# OrderBook, reading best bid/ask and the top TOP_N levels after every diff.
+# Snapshot lines stand in for the REST snapshot fetched after a gap and are
+# only applied while the book is out of sync. Compared against rebuilding
+# sorted levels from a dict on every update, the way a poll-the-full-book
+# script works.
+#
+# Without a file a synthetic recording is generated: a random-walk market
+# with LEVELS levels a side, a dropped message every GAP_EVERY diffs and a
+# snapshot every SNAPSHOT_EVERY.
+#
+#   python -m coinswitch.bench_order_book [recording.jsonl] [diffs]
+
+LEVELS = 500
+TICK = 0.5
+TOP_N = 10
+GAP_EVERY = 50_000
+SNAPSHOT_EVERY = 5_000
+BASELINE_DIFFS = 20_000
+
+
+def levels(side, reverse):
+    return [[f"{price:.1f}", f"{quantity:.4f}"] for price, quantity in sorted(side.items(), reverse=reverse)]
+
+
+def record(path, diffs, seed=7):
+    rng = random.Random(seed)
+    mid = 60_000.0
+    bids = {mid - TICK * (i + 1): rng.uniform(0.01, 5) for i in range(LEVELS)}
+    asks = {mid + TICK * (i + 1): rng.uniform(0.01, 5) for i in range(LEVELS)}
+    with open(path, "w") as f:
+        f.write(json.dumps({"type": "snapshot", "seq": 0, "bids": levels(bids, True),
+                            "asks": levels(asks, False)}) + "\n")
+        for seq in range(1, diffs + 1):
+            mid += rng.choice((-TICK, 0, 0, TICK))
+            diff = {"bids": [], "asks": []}
+            for _ in range(rng.randint(1, 4)):
+                is_bid = rng.random() < 0.5
+                side, name = (bids, "bids") if is_bid else (asks, "asks")
+                distance = int(rng.expovariate(1 / 20)) + 1
+                price = mid - TICK * distance if is_bid else mid + TICK * distance
+                quantity = 0.0 if price in side and rng.random() < 0.3 else rng.uniform(0.01, 5)
+                if quantity:
+                    side[price] = quantity
+                else:
+                    side.pop(price, None)
+                diff[name].append([f"{price:.1f}", f"{quantity:.4f}"])
+            # levels that crossed the moving mid are cleared
+            for price in [p for p in bids if p >= mid]:
+                del bids[price]
+                diff["bids"].append([f"{price:.1f}", "0"])
+            for price in [p for p in asks if p <= mid]:
+                del asks[price]
+                diff["asks"].append([f"{price:.1f}", "0"])
+            if seq % GAP_EVERY != 0 or seq == diffs:
+                f.write(json.dumps({"type": "diff", "seq": seq, **diff}) + "\n")
+            if seq % SNAPSHOT_EVERY == 0 or seq == diffs:
+                f.write(json.dumps({"type": "snapshot", "seq": seq, "bids": levels(bids, True),
+                                    "asks": levels(asks, False)}) + "\n")
+
+
+def replay(messages):
+    book = OrderBook("BTC/USDT")
+    start = time.perf_counter()
+    for message in messages:
+        if message["type"] == "snapshot":
+            if not book.synced:
+                book.snapshot(message["seq"], message["bids"], message["asks"])
+            continue
+        if book.apply(message["seq"], message["bids"], message["asks"]):
+            book.best_bid()
+            book.best_ask()
+            book.top(TOP_N)
+    return book, time.perf_counter() - start
+
+
+def rebuild(messages):
+    """Dicts updated in place, levels re-sorted for every read."""
+    bids, asks = {}, {}
+    updates = 0
+    start = time.perf_counter()
+    for message in messages:
+        if message["type"] == "snapshot":
+            if updates == 0:
+                bids = {float(p): float(q) for p, q in message["bids"]}
+                asks = {float(p): float(q) for p, q in message["asks"]}
+            continue
+        for side, name in ((bids, "bids"), (asks, "asks")):
+            for price, quantity in message[name]:
+                if float(quantity):
+                    side[float(price)] = float(quantity)
+                else:
+                    side.pop(float(price), None)
+        sorted_bids = sorted(bids.items(), reverse=True)
+        sorted_asks = sorted(asks.items())
+        sorted_bids[0], sorted_asks[0], sorted_bids[:TOP_N], sorted_asks[:TOP_N]
+        updates += 1
+        if updates == BASELINE_DIFFS:
+            break
+    return updates, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        if len(sys.argv) > 1 and os.path.exists(sys.argv[1]):
+            path = sys.argv[1]
+        else:
+            path = os.path.join(tmp, "depth.jsonl")
+            record(path, int(sys.argv[2]) if len(sys.argv) > 2 else 200_000)
+        with open(path, "rb") as f:
+            messages = [loads(line) for line in f]
+
+    diffs = sum(message["type"] == "diff" for message in messages)
+    print(f"{diffs:,} diffs, {len(messages) - diffs} snapshots recorded")
+
+    book, spent = replay(messages)
+    print(f"  incremental  {book.applied / spent:10,.0f} updates/s  (apply + best bid/ask + top {TOP_N})")
+    print(f"  {book.report()}")
+    updates, spent_rebuild = rebuild(messages)
+    print(f"  rebuild      {updates / spent_rebuild:10,.0f} updates/s  (first {updates:,} diffs)")
+
+    # the recording ends with a snapshot of the true book
+    last = messages[-1]
+    check = OrderBook("check")
+    check.snapshot(last["seq"], last["bids"], last["asks"])
+    ok = book.seq == last["seq"] and book.top(LEVELS * 4) == check.top(LEVELS * 4)
+    print(f"  final book {'matches' if ok else 'DIFFERS FROM'} the recorded snapshot; "
+          f"buy 10 VWAP {book.vwap('buy', 10)[0]:.2f}, mid {book.mid():.2f}")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,69 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+from coinswitch.URL import BASE_URL, VALIDATE_KEYS
+from coinswitch.signature_generation import EMPTY_PAYLOAD, Signer, canonical_payload, with_params
+
+
+class CoinSwitchError(Exception):
+    def __init__(self, status, body):
+        super().__init__(f"HTTP {status}: {body[:200]}")
+        self.status = status
+        self.body = body
+
+
+# ---------- CoinSwitch Client ----------
+# One keep-alive session and one parsed signing key for the life of the
+# client, so a call costs a signature (or an LRU hit for repeated GETs) and
+# a round-trip on an already open connection. The API key and content type
+# are session headers; only the signature is set per request. Up to
+# `pool_maxsize` connections are kept open for callers on several threads.
+class CoinSwitchClient:
+    def __init__(self, api_key, secret_key, base_url=BASE_URL, timeout=10, pool_maxsize=10):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.signer = Signer(secret_key)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({'Content-Type': 'application/json', 'X-AUTH-APIKEY': api_key})
+
+    def request(self, method, endpoint, params=None, payload=None):
+        """Signed call; returns the decoded JSON response, raises CoinSwitchError
+        for any non-2xx status."""
+        if method == "GET":
+            endpoint, signed_endpoint = with_params(endpoint, params)
+        else:
+            signed_endpoint = endpoint
+        body = canonical_payload(payload)
+        signature = self.signer.sign(method + signed_endpoint + body, cache=body == EMPTY_PAYLOAD)
+
+        response = self.session.request(method, self.base_url + endpoint, data=body,
+                                        headers={'X-AUTH-SIGNATURE': signature}, timeout=self.timeout)
+        if not response.ok:
+            raise CoinSwitchError(response.status_code, response.text)
+        return response.json()
+
+    def get(self, endpoint, params=None):
+        return self.request("GET", endpoint, params=params)
+
+    def post(self, endpoint, payload=None):
+        return self.request("POST", endpoint, payload=payload)
+
+    def delete(self, endpoint, payload=None):
+        return self.request("DELETE", endpoint, payload=payload)
+
+    def validate_keys(self):
+        return self.get(VALIDATE_KEYS)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
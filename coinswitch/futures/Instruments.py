@@ -0,0 +1,36 @@
+import os
+
+from coinswitch.URL import FUTURES_EXCHANGE, FUTURES_INSTRUMENT_INFO
+from coinswitch.instrument_info import InstrumentRegistry
+
+# ---------- Futures Instruments ----------
+# The futures contract specs (tick size, lot size, leverage limits) as an
+# InstrumentRegistry: loaded from SNAPSHOT_PATH at startup and refetched in
+# the background every TTL seconds.
+#
+#   instruments = futures_instruments(client)
+#   btc = instruments["BTCUSDT"]
+#   price = btc.round_price(price)
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "instruments.json")
+TTL = 15 * 60
+
+
+def futures_instruments(client, exchange=FUTURES_EXCHANGE, path=SNAPSHOT_PATH, ttl=TTL, start=True):
+    """Registry of futures instruments fetched with a CoinSwitchClient."""
+    def fetch():
+        return client.get(FUTURES_INSTRUMENT_INFO, {"exchange": exchange})["data"]
+
+    registry = InstrumentRegistry(fetch, path, ttl)
+    return registry.start() if start else registry
+
+
+if __name__ == "__main__":
+    from coinswitch.client import CoinSwitchClient
+    from coinswitch.keys import API_KEY, SECRET_KEY
+
+    with CoinSwitchClient(API_KEY, SECRET_KEY) as client:
+        instruments = futures_instruments(client)
+        print(instruments.report())
+        for instrument in instruments.by_quote("USDT")[:10]:
+            print(instrument)
+        instruments.stop()
@@ -0,0 +1,249 @@
+import json
+import os
+import threading
+import time
+from dataclasses import astuple, dataclass, fields
+
+from rate_limit import backoff
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+DEFAULT_TTL = 15 * 60
+SNAPSHOT_VERSION = 1
+
+
+# ---------- Instrument ----------
+@dataclass(slots=True, frozen=True)
+class Instrument:
+    symbol: str
+    base_asset: str
+    quote_asset: str
+    tick_size: float
+    lot_size: float
+    min_quantity: float
+    max_quantity: float
+    max_leverage: float
+    status: str = "TRADING"
+
+    def round_price(self, price):
+        """Nearest valid price (a multiple of tick_size)."""
+        return round(round(price / self.tick_size) * self.tick_size, 12)
+
+    def round_quantity(self, quantity):
+        """Largest valid quantity not above `quantity` (a multiple of lot_size)."""
+        return round(int(quantity / self.lot_size + 1e-9) * self.lot_size, 12)
+
+
+FIELDS = tuple(field.name for field in fields(Instrument))
+
+
+def _number(raw, name, precision_name, default=0.0):
+    value = raw.get(name)
+    if value not in (None, ""):
+        return float(value)
+    precision = raw.get(precision_name)
+    if precision not in (None, ""):
+        return 10.0 ** -int(precision)
+    return default
+
+
+def parse_instrument(symbol, raw):
+    """Instrument from one entry of the instrument_info response; sizes given
+    as precisions (number of decimals) are turned into step sizes."""
+    return Instrument(
+        symbol=raw.get("symbol") or symbol,
+        base_asset=(raw.get("base_asset") or "").upper(),
+        quote_asset=(raw.get("quote_asset") or "").upper(),
+        tick_size=_number(raw, "tick_size", "price_precision"),
+        lot_size=_number(raw, "lot_size", "quantity_precision"),
+        min_quantity=float(raw.get("min_quantity") or 0),
+        max_quantity=float(raw.get("max_quantity") or 0),
+        max_leverage=float(raw.get("max_leverage") or 1),
+        status=raw.get("status") or "TRADING",
+    )
+
+
+def parse_instruments(data):
+    """{symbol: Instrument} from the response data - either a dict keyed by
+    symbol or a list of entries carrying their own "symbol"."""
+    items = data.items() if isinstance(data, dict) else ((raw.get("symbol"), raw) for raw in data)
+    instruments = (parse_instrument(symbol, raw) for symbol, raw in items)
+    return {instrument.symbol: instrument for instrument in instruments}
+
+
+# ---------- Snapshot ----------
+# A compact JSON file: field names once, then one list of values per
+# instrument, plus when it was fetched. A few hundred instruments load in
+# about a millisecond.
+def save_snapshot(path, instruments, fetched_at):
+    snapshot = {"version": SNAPSHOT_VERSION, "fetched_at": fetched_at, "fields": FIELDS,
+                "rows": [astuple(instrument) for instrument in instruments.values()]}
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(snapshot, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def load_snapshot(path):
+    """({symbol: Instrument}, fetched_at), or None if there is no usable snapshot."""
+    try:
+        with open(path, "rb") as f:
+            snapshot = loads(f.read())
+    except (FileNotFoundError, ValueError):
+        return None
+    if snapshot.get("version") != SNAPSHOT_VERSION or tuple(snapshot.get("fields", ())) != FIELDS:
+        return None
+    instruments = {row[0]: Instrument(*row) for row in snapshot["rows"]}
+    return instruments, snapshot["fetched_at"]
+
+
+# ---------- Instrument Registry ----------
+# Every instrument spec in memory, indexed by symbol and by base/quote asset,
+# so order-building code gets an O(1) dict hit and never the network.
+#
+# Starts from the on-disk snapshot at `path`; only if there is none does
+# start() wait for a fetch. `fetch()` returns the raw instrument data (see
+# parse_instruments). A daemon thread refetches once the data is `ttl`
+# seconds old. A refresh only replaces the instruments that actually
+# changed, then swaps in the new indexes in one assignment, so readers on
+# other threads never see a half-built index and need no lock. Failed
+# refreshes keep the old data and retry with backoff.
+class InstrumentRegistry:
+    def __init__(self, fetch, path, ttl=DEFAULT_TTL):
+        self.fetch = fetch
+        self.path = path
+        self.ttl = ttl
+        self.fetched_at = 0.0
+        self._index = ({}, {}, {})
+
+        self.refreshes = 0
+        self.failures = 0
+        self.last_changes = (0, 0, 0)
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------- Lookups ----------
+    def get(self, symbol, default=None):
+        return self._index[0].get(symbol, default)
+
+    def __getitem__(self, symbol):
+        return self._index[0][symbol]
+
+    def __contains__(self, symbol):
+        return symbol in self._index[0]
+
+    def __len__(self):
+        return len(self._index[0])
+
+    def __iter__(self):
+        return iter(self._index[0].values())
+
+    def by_base(self, asset):
+        """Instruments with `asset` as the base asset, e.g. every BTC contract."""
+        return self._index[1].get(asset.upper(), ())
+
+    def by_quote(self, asset):
+        return self._index[2].get(asset.upper(), ())
+
+    @property
+    def stale(self):
+        return time.time() - self.fetched_at >= self.ttl
+
+    # ---------- Loading ----------
+    def _install(self, instruments):
+        by_base, by_quote = {}, {}
+        for instrument in instruments.values():
+            by_base.setdefault(instrument.base_asset, []).append(instrument)
+            by_quote.setdefault(instrument.quote_asset, []).append(instrument)
+        self._index = (instruments,
+                       {asset: tuple(group) for asset, group in by_base.items()},
+                       {asset: tuple(group) for asset, group in by_quote.items()})
+
+    def load(self):
+        """Fill the registry from the snapshot; returns False if there is none."""
+        loaded = load_snapshot(self.path)
+        if loaded is None:
+            return False
+        instruments, self.fetched_at = loaded
+        self._install(instruments)
+        return True
+
+    def refresh(self):
+        """Fetch now and apply what changed; returns (added, changed, removed)."""
+        with self._refresh_lock:
+            fresh = parse_instruments(self.fetch())
+            current = self._index[0]
+            added = changed = 0
+            instruments = dict(current)
+            for symbol, instrument in fresh.items():
+                old = current.get(symbol)
+                if old is None:
+                    added += 1
+                elif old != instrument:
+                    changed += 1
+                else:
+                    continue
+                instruments[symbol] = instrument
+            removed = [symbol for symbol in current if symbol not in fresh]
+            for symbol in removed:
+                del instruments[symbol]
+
+            if added or changed or removed:
+                self._install(instruments)
+            self.fetched_at = time.time()
+            save_snapshot(self.path, self._index[0], self.fetched_at)
+            self.refreshes += 1
+            self.last_changes = (added, changed, len(removed))
+            return self.last_changes
+
+    # ---------- Background Refresh ----------
+    def start(self):
+        """Load the snapshot (fetching only if there is none) and start the
+        background refresh thread."""
+        if not self.load():
+            self.refresh()
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="instrument-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        attempt = 0
+        while True:
+            if attempt:
+                wait = backoff(attempt, base=1.0, cap=self.ttl)
+            else:
+                wait = self.fetched_at + self.ttl - time.time()
+            if self._stop.wait(max(0.0, wait)):
+                return
+            try:
+                self.refresh()
+                attempt = 0
+            except Exception as e:
+                self.failures += 1
+                attempt += 1
+                print(f"Instrument refresh failed ({type(e).__name__}: {e}); keeping {len(self)} cached")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def report(self):
+        age = time.time() - self.fetched_at
+        added, changed, removed = self.last_changes
+        return (f"Instruments: {len(self)} ({len(self._index[1])} base assets), {age:.0f}s old, "
+                f"{self.refreshes} refreshes (last +{added} ~{changed} -{removed}), {self.failures} failed")
@@ -0,0 +1,153 @@
+import bisect
+import collections
+
+
+# ---------- Book Side ----------
+# Quantities by price in a dict, plus the prices in a sorted list with the
+# best price first (bids are stored negated so both sides sort ascending).
+# Finding a level is a binary search; inserting or removing one shifts the
+# list, which for books of a few thousand levels is a memmove of a few KB -
+# cheaper in practice than any tree in pure Python. Best price is keys[0].
+class BookSide:
+    def __init__(self, bids):
+        self.sign = -1.0 if bids else 1.0
+        self.levels = {}
+        self.keys = []
+
+    def clear(self):
+        self.levels.clear()
+        self.keys.clear()
+
+    def set(self, price, quantity):
+        """Set the quantity at `price`; 0 removes the level."""
+        levels = self.levels
+        if quantity:
+            if price not in levels:
+                bisect.insort(self.keys, self.sign * price)
+            levels[price] = quantity
+        elif price in levels:
+            del levels[price]
+            keys = self.keys
+            del keys[bisect.bisect_left(keys, self.sign * price)]
+
+    def best(self):
+        """(price, quantity) at the top of the book, or None."""
+        if not self.keys:
+            return None
+        price = self.sign * self.keys[0]
+        return price, self.levels[price]
+
+    def top(self, n):
+        levels, sign = self.levels, self.sign
+        return [(sign * key, levels[sign * key]) for key in self.keys[:n]]
+
+    def vwap(self, size):
+        """(average price, quantity filled) for taking `size` from the top,
+        walking only as many levels as that needs."""
+        levels, sign = self.levels, self.sign
+        filled = cost = 0.0
+        for key in self.keys:
+            price = sign * key
+            take = min(levels[price], size - filled)
+            filled += take
+            cost += take * price
+            if filled >= size:
+                break
+        return (cost / filled if filled else None), filled
+
+    def __len__(self):
+        return len(self.keys)
+
+
+# ---------- Order Book ----------
+# One instrument's book kept up to date from a snapshot plus incremental
+# diffs. Every diff carries a sequence number that must be exactly one more
+# than the last applied:
+#   - older diffs (already covered by the snapshot) are ignored
+#   - a jump means messages were lost: the book is marked out of sync,
+#     `on_gap(book)` is called so the caller can fetch a new snapshot, and
+#     diffs are buffered (up to `buffer_size`) until it arrives; snapshot()
+#     then replays the buffered ones that come after it
+# Diff levels are (price, quantity) pairs, quantity 0 removing the level.
+class OrderBook:
+    def __init__(self, symbol, on_gap=None, buffer_size=10_000):
+        self.symbol = symbol
+        self.on_gap = on_gap
+        self.bids = BookSide(bids=True)
+        self.asks = BookSide(bids=False)
+        self.seq = None
+        self.synced = False
+        self._buffer = collections.deque(maxlen=buffer_size)
+
+        self.applied = 0
+        self.ignored = 0
+        self.gaps = 0
+        self.snapshots = 0
+
+    def snapshot(self, seq, bids, asks):
+        """Replace the book with a full snapshot taken at `seq`."""
+        for side, levels in ((self.bids, bids), (self.asks, asks)):
+            side.clear()
+            for price, quantity in levels:
+                side.set(float(price), float(quantity))
+        self.seq = seq
+        self.synced = True
+        self.snapshots += 1
+
+        buffered, self._buffer = self._buffer, collections.deque(maxlen=self._buffer.maxlen)
+        for diff in buffered:
+            self.apply(*diff)
+
+    def apply(self, seq, bids=(), asks=()):
+        """Apply one diff; returns True if it changed the book."""
+        if not self.synced:
+            self._buffer.append((seq, bids, asks))
+            return False
+        if seq <= self.seq:
+            self.ignored += 1
+            return False
+        if seq != self.seq + 1:
+            self.gaps += 1
+            self.synced = False
+            self._buffer.append((seq, bids, asks))
+            if self.on_gap is not None:
+                self.on_gap(self)
+            return False
+
+        for price, quantity in bids:
+            self.bids.set(float(price), float(quantity))
+        for price, quantity in asks:
+            self.asks.set(float(price), float(quantity))
+        self.seq = seq
+        self.applied += 1
+        return True
+
+    # ---------- Reads ----------
+    def best_bid(self):
+        return self.bids.best()
+
+    def best_ask(self):
+        return self.asks.best()
+
+    def mid(self):
+        bid, ask = self.bids.best(), self.asks.best()
+        return (bid[0] + ask[0]) / 2 if bid and ask else None
+
+    def spread(self):
+        bid, ask = self.bids.best(), self.asks.best()
+        return ask[0] - bid[0] if bid and ask else None
+
+    def top(self, n=10):
+        """(bids, asks), each the best `n` levels as (price, quantity), best first."""
+        return self.bids.top(n), self.asks.top(n)
+
+    def vwap(self, side, size):
+        """Average fill price for a market order of `size`: side "buy" takes
+        the asks, "sell" the bids. Returns (price, filled); filled < size if
+        the book is too thin."""
+        return (self.asks if side == "buy" else self.bids).vwap(size)
+
+    def report(self):
+        return (f"{self.symbol}: seq {self.seq}, {len(self.bids)} bids / {len(self.asks)} asks, "
+                f"{self.applied} diffs applied, {self.ignored} stale, {self.gaps} gaps, "
+                f"{self.snapshots} snapshots")
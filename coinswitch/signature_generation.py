@@ -0,0 +1,59 @@
+import json
+from functools import lru_cache
+from urllib.parse import unquote_plus, urlencode, urlparse
+
+from cryptography.hazmat.primitives.asymmetric import ed25519
+
+# ---------- Canonical Payload ----------
+# The exchange signs method + path + the body as
+# json.dumps(payload, separators=(',', ':'), sort_keys=True). json.dumps with
+# any non-default argument builds a new JSONEncoder on every call, so one
+# encoder is built here and reused; an empty payload (every GET) skips
+# encoding altogether.
+_encoder = json.JSONEncoder(separators=(',', ':'), sort_keys=True)
+EMPTY_PAYLOAD = "{}"
+
+
+def canonical_payload(payload):
+    if not payload:
+        return EMPTY_PAYLOAD
+    return _encoder.encode(payload)
+
+
+def with_params(endpoint, params):
+    """(endpoint with the query string, the unquoted form that gets signed)."""
+    if not params:
+        return endpoint, endpoint
+    endpoint += ('&', '?')[urlparse(endpoint).query == ''] + urlencode(params)
+    return endpoint, unquote_plus(endpoint)
+
+
+def signature_message(method, endpoint, payload=None, params=None):
+    _, signed_endpoint = with_params(endpoint, params) if method == "GET" else (endpoint, endpoint)
+    return method + signed_endpoint + canonical_payload(payload)
+
+
+# ---------- Signer ----------
+# Holds the parsed Ed25519 key, so the hex secret is decoded once rather than
+# on every request. Ed25519 signatures are deterministic, so the same message
+# always gets the same signature: messages without a body (GETs, polled over
+# and over) are signed once and then served from an LRU cache.
+class Signer:
+    def __init__(self, secret_key, cache_size=1024):
+        if isinstance(secret_key, str):
+            secret_key = bytes.fromhex(secret_key)
+        if isinstance(secret_key, bytes):
+            secret_key = ed25519.Ed25519PrivateKey.from_private_bytes(secret_key)
+        self.key = secret_key
+        self._sign_cached = lru_cache(maxsize=cache_size)(self._sign)
+
+    def _sign(self, message):
+        return self.key.sign(message.encode('utf-8')).hex()
+
+    def sign(self, message, cache=True):
+        """Hex signature of `message` (a str)."""
+        return self._sign_cached(message) if cache else self._sign(message)
+
+    def sign_request(self, method, endpoint, payload=None, params=None):
+        # a body makes the message one-off, not worth a cache slot
+        return self.sign(signature_message(method, endpoint, payload, params), cache=not payload)
@@ -0,0 +1,33 @@
+import asyncio
+
+from aiohttp import web
+from cryptography.hazmat.primitives.asymmetric import ed25519
+
+from coinswitch.async_client import AsyncCoinSwitchClient
+
+SECRET_KEY = ed25519.Ed25519PrivateKey.generate().private_bytes_raw().hex()
+
+
+async def send_once(**limits):
+    """One GET against a local server that echoes the path."""
+    async def handle(request):
+        return web.json_response({"path": request.path})
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        async with AsyncCoinSwitchClient("key", SECRET_KEY, base_url=f"http://127.0.0.1:{port}", **limits) as client:
+            return await asyncio.wait_for(client.get("/trade/api/v2/limited"), 2)
+    finally:
+        await runner.cleanup()
+
+
+def test_one_request_per_window_limit_sends():
+    # count * headroom < 1: the bucket must still hold one whole token
+    assert asyncio.run(send_once(rate_limits={"/trade/api/v2/limited": (1, 1.0)}))["path"] == "/trade/api/v2/limited"
+    assert asyncio.run(send_once(rate_limits={}, default_rate_limit=(1, 60)))["path"] == "/trade/api/v2/limited"
@@ -0,0 +1,136 @@
+# Per-phase frame profiler for the Space Dodge loop.
+#
+# The loop calls begin_frame(), then lap(phase) right after each phase
+# finishes; the time since the previous lap is charged to that phase. Frames
+# are kept in a rolling window for p50/p95/p99 and, when trace is on, in full
+# for export as CSV or Chrome trace-event JSON (load it in chrome://tracing or
+# https://ui.perfetto.dev). A disabled profiler returns from every call
+# straight away, and DodgeSim only laps when one is attached.
+import csv
+import json
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import pygame
+
+PHASES = ("events", "input", "spawn", "collide", "draw")
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+class FrameProfiler:
+    def __init__(self, enabled: bool = True, window: int = 600, trace: bool = False):
+        self.enabled = enabled
+        self.trace = trace
+        self.frames = 0
+        self._window: Dict[str, Deque[float]] = {name: deque(maxlen=window) for name in PHASES + ("total",)}
+        self._trace: List[Tuple[float, List[Tuple[str, float, float]]]] = []
+
+        self._frame_start = 0.0
+        self._last = 0.0
+        self._current: Dict[str, float] = {}
+        self._laps: List[Tuple[str, float, float]] = []
+
+    def begin_frame(self) -> None:
+        if not self.enabled:
+            return
+        self._frame_start = self._last = time.perf_counter()
+        self._current = dict.fromkeys(PHASES, 0.0)
+        self._laps = []
+
+    def lap(self, phase: str) -> None:
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._current[phase] += now - self._last
+        if self.trace:
+            self._laps.append((phase, self._last, now - self._last))
+        self._last = now
+
+    def end_frame(self) -> None:
+        if not self.enabled:
+            return
+        for name, spent in self._current.items():
+            self._window[name].append(spent)
+        self._window["total"].append(self._last - self._frame_start)
+        if self.trace:
+            self._trace.append((self._frame_start, self._laps))
+        self.frames += 1
+
+    def percentiles(self) -> Dict[str, Tuple[float, float, float]]:
+        """p50/p95/p99 in milliseconds per phase over the rolling window."""
+        stats = {}
+        for name, values in self._window.items():
+            ordered = sorted(values)
+            stats[name] = tuple(percentile(ordered, q) * 1000 for q in (0.50, 0.95, 0.99))
+        return stats
+
+    def export_csv(self, path: str) -> None:
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("frame", "start_ms") + tuple(f"{name}_ms" for name in PHASES) + ("total_ms",))
+            origin = self._trace[0][0] if self._trace else 0.0
+            for frame, (start, laps) in enumerate(self._trace):
+                spent = dict.fromkeys(PHASES, 0.0)
+                for name, _, duration in laps:
+                    spent[name] += duration
+                writer.writerow([frame, round((start - origin) * 1000, 3)] +
+                                [round(spent[name] * 1000, 4) for name in PHASES] +
+                                [round(sum(spent.values()) * 1000, 4)])
+
+    def export_chrome_trace(self, path: str) -> None:
+        origin = self._trace[0][0] if self._trace else 0.0
+        events = []
+        for frame, (start, laps) in enumerate(self._trace):
+            end = laps[-1][1] + laps[-1][2] if laps else start
+            events.append({"name": "frame", "ph": "X", "pid": 1, "tid": 1, "args": {"frame": frame},
+                           "ts": (start - origin) * 1e6, "dur": (end - start) * 1e6})
+            for name, lap_start, duration in laps:
+                events.append({"name": name, "ph": "X", "pid": 1, "tid": 1,
+                               "ts": (lap_start - origin) * 1e6, "dur": duration * 1e6})
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+class ProfilerOverlay:
+    def __init__(self, profiler: FrameProfiler, font: pygame.font.Font, pos=(640, 10),
+                 refresh_frames: int = 30, bg_color=(0, 0, 0)):
+        self.profiler = profiler
+        self.font = font
+        self.pos = pos
+        self.refresh_frames = refresh_frames
+        self.bg_color = bg_color
+        self.visible = False
+        self._lines: List[pygame.Surface] = []
+        self._rect: Optional[pygame.Rect] = None
+
+    def toggle(self, surface: pygame.Surface) -> None:
+        self.visible = not self.visible
+        if not self.visible and self._rect:
+            surface.fill(self.bg_color, self._rect)
+            pygame.display.update(self._rect)
+            self._rect = None
+
+    def draw(self, surface: pygame.Surface) -> None:
+        if not self.visible:
+            return
+        # text only changes every refresh_frames frames; blit the cached lines otherwise
+        if not self._lines or self.profiler.frames % self.refresh_frames == 0:
+            self._lines = [self.font.render(f"{name:<8} {p50:5.2f} {p95:5.2f} {p99:5.2f}", 1, "yellow")
+                           for name, (p50, p95, p99) in self.profiler.percentiles().items()]
+
+        x, y = self.pos
+        rect = pygame.Rect(x, y, max(line.get_width() for line in self._lines),
+                           sum(line.get_height() for line in self._lines))
+        dirty = rect.union(self._rect) if self._rect else rect
+        surface.fill(self.bg_color, dirty)
+        for line in self._lines:
+            surface.blit(line, (x, y))
+            y += line.get_height()
+        self._rect = rect
+        pygame.display.update(dirty)
@@ -0,0 +1,95 @@
+# Dirty-rectangle renderer for Space Dodge.
+#
+# Instead of clearing the whole window and pushing the full frame every tick,
+# it erases only what was drawn last frame, redraws the player, stars and HUD,
+# and hands just those rects to pygame.display.update(). The timer text is
+# rendered once per distinct string and kept in a small LRU cache.
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+import pygame
+
+
+class TextCache:
+    def __init__(self, font: pygame.font.Font, color="white", maxsize: int = 64):
+        self.font = font
+        self.color = color
+        self.maxsize = maxsize
+        self._surfaces: "OrderedDict[str, pygame.Surface]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text: str) -> pygame.Surface:
+        surface = self._surfaces.get(text)
+        if surface is not None:
+            self._surfaces.move_to_end(text)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self.font.render(text, 1, self.color)
+        self._surfaces[text] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surface
+
+
+class DirtyRectRenderer:
+    def __init__(self, surface: pygame.Surface, font: pygame.font.Font, bg_color=(0, 0, 0),
+                 hud_pos=(10, 10), full_update_limit: int = 256):
+        self.surface = surface
+        self.bg_color = bg_color
+        self.text = TextCache(font)
+        self.hud_pos = hud_pos
+        # past this many dirty rects one full-window update is cheaper
+        self.full_update_limit = full_update_limit
+
+        self._previous: List[pygame.Rect] = []
+        self._hud_text: Optional[str] = None
+        self._hud_rect: Optional[pygame.Rect] = None
+        self._cleared = False
+
+    def reset(self) -> None:
+        self._previous = []
+        self._hud_text = None
+        self._hud_rect = None
+        self._cleared = False
+
+    def draw(self, player: pygame.Rect, elapsed_time: float, stars: Iterable[pygame.Rect]) -> None:
+        surface = self.surface
+        dirty = []
+
+        if not self._cleared:
+            surface.fill(self.bg_color)
+            self._cleared = True
+            full = True
+        else:
+            full = False
+            for rect in self._previous:
+                surface.fill(self.bg_color, rect)
+            dirty.extend(self._previous)
+
+        # redraw the HUD when its text changes or something erased over it
+        hud_text = f"Time : {round(elapsed_time)}s"
+        hud_rect = self._hud_rect
+        if hud_text != self._hud_text or (hud_rect and hud_rect.collidelist(self._previous) != -1):
+            if hud_rect:
+                surface.fill(self.bg_color, hud_rect)
+                dirty.append(hud_rect)
+            hud_rect = surface.blit(self.text.render(hud_text), self.hud_pos)
+            dirty.append(hud_rect)
+            self._hud_text = hud_text
+            self._hud_rect = hud_rect
+
+        current = [pygame.draw.rect(surface, "green", player)]
+        for star in stars:
+            drawn = pygame.draw.rect(surface, "red", star)
+            if drawn.w and drawn.h:
+                current.append(drawn)
+        dirty.extend(current)
+        self._previous = current
+
+        if full or len(dirty) > self.full_update_limit:
+            pygame.display.update()
+        else:
+            pygame.display.update(dirty)
@@ -0,0 +1,191 @@
+# Replay recording and playback for Space Dodge.
+#
+# A DodgeSim episode is fully determined by its config, its RNG seed and the
+# left/right input of every tick, so that is all a replay stores:
+#
+#   header  "SDRP", version, seed, ticks, hit, then the SimConfig fields
+#   body    run-length encoded input, one varint per run: (length << 2) | keys
+#           where keys is bit 0 = left, bit 1 = right
+#
+# Input rarely changes from one tick to the next, so minutes of play usually
+# fit in a few kilobytes. ReplayPlayer re-simulates a replay and keeps state
+# snapshots every few seconds of game time so seeking doesn't replay from 0.
+import bisect
+import itertools
+import random
+import struct
+import sys
+import time
+from dataclasses import astuple, dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from dodge_sim import DodgeSim, SimConfig
+from dodge_stars import StarField
+
+MAGIC = b"SDRP"
+VERSION = 1
+HEADER = struct.Struct("<4sBQIB")
+CONFIG = struct.Struct("<8i4d")
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+@dataclass
+class Replay:
+    seed: int
+    config: SimConfig
+    runs: List[List[int]] = field(default_factory=list)  # [keys, length]
+    ticks: int = 0
+    hit: bool = False
+
+    def dumps(self) -> bytes:
+        out = bytearray(HEADER.pack(MAGIC, VERSION, self.seed, self.ticks, self.hit))
+        out += CONFIG.pack(*astuple(self.config))
+        for keys, length in self.runs:
+            _write_varint(out, (length << 2) | keys)
+        return bytes(out)
+
+    @classmethod
+    def loads(cls, data: bytes) -> "Replay":
+        magic, version, seed, ticks, hit = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a Space Dodge replay")
+        config = SimConfig(*CONFIG.unpack_from(data, HEADER.size))
+
+        runs = []
+        pos = HEADER.size + CONFIG.size
+        while pos < len(data):
+            value, pos = _read_varint(data, pos)
+            runs.append([value & 3, value >> 2])
+        return cls(seed, config, runs, ticks, bool(hit))
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(self.dumps())
+
+    @classmethod
+    def load(cls, path: str) -> "Replay":
+        with open(path, "rb") as f:
+            return cls.loads(f.read())
+
+
+class ReplayRecorder:
+    def __init__(self, seed: int, config: SimConfig):
+        self.replay = Replay(seed, config)
+
+    def record(self, left: bool, right: bool) -> None:
+        keys = bool(left) | bool(right) << 1
+        runs = self.replay.runs
+        if runs and runs[-1][0] == keys:
+            runs[-1][1] += 1
+        else:
+            runs.append([keys, 1])
+        self.replay.ticks += 1
+
+    def finish(self, sim: DodgeSim) -> Replay:
+        self.replay.hit = sim.hit
+        return self.replay
+
+
+def new_recorded_sim(config: SimConfig, seed: Optional[int] = None, **kwargs) -> DodgeSim:
+    """A DodgeSim seeded for replay, with a recorder attached."""
+    seed = random.randrange(2 ** 63) if seed is None else seed
+    sim = DodgeSim(config, random.Random(seed), **kwargs)
+    sim.recorder = ReplayRecorder(seed, config)
+    return sim
+
+
+class ReplayPlayer:
+    def __init__(self, replay: Replay, snapshot_every: int = 600, star_field=StarField):
+        self.replay = replay
+        self.snapshot_every = snapshot_every
+        self.sim = DodgeSim(replay.config, random.Random(replay.seed), star_field=star_field)
+
+        # tick at which each input run starts, for seeking into the middle of one
+        self._run_starts = []
+        tick = 0
+        for _, length in replay.runs:
+            self._run_starts.append(tick)
+            tick += length
+
+        self._snapshots: Dict[int, tuple] = {0: self.sim.snapshot()}
+        self._snapshot_ticks = [0]
+
+    def inputs(self, start: int = 0) -> Iterator[Tuple[bool, bool]]:
+        index = max(0, bisect.bisect_right(self._run_starts, start) - 1)
+        skip = start - (self._run_starts[index] if self._run_starts else 0)
+        for keys, length in self.replay.runs[index:]:
+            pair = (bool(keys & 1), bool(keys & 2))
+            for _ in range(length - skip):
+                yield pair
+            skip = 0
+
+    def seek(self, tick: int) -> DodgeSim:
+        """Put self.sim at ``tick`` (clamped to the replay) and return it."""
+        tick = max(0, min(tick, self.replay.ticks))
+        sim = self.sim
+        if not (self._snapshot_ticks[-1] <= sim.ticks <= tick):
+            nearest = self._snapshot_ticks[bisect.bisect_right(self._snapshot_ticks, tick) - 1]
+            sim.restore(self._snapshots[nearest])
+
+        for left, right in self.inputs(sim.ticks):
+            if sim.ticks >= tick or sim.hit:
+                break
+            sim.step(left, right)
+            if sim.ticks % self.snapshot_every == 0 and sim.ticks not in self._snapshots:
+                self._snapshots[sim.ticks] = sim.snapshot()
+                self._snapshot_ticks.append(sim.ticks)
+        return sim
+
+    def verify(self) -> bool:
+        """Re-simulate the whole replay and check it ends the way it was recorded."""
+        sim = self.seek(self.replay.ticks)
+        return sim.ticks == self.replay.ticks and sim.hit == self.replay.hit
+
+
+if __name__ == "__main__":
+    # python dodge_replay.py FILE [--watch SPEED]
+    replay = Replay.load(sys.argv[1])
+    player = ReplayPlayer(replay)
+
+    start = time.perf_counter()
+    ok = player.verify()
+    spent = time.perf_counter() - start
+    print(f"{replay.ticks} ticks ({replay.ticks * replay.config.tick_ms / 1000:.1f}s of play), "
+          f"{len(replay.runs)} input runs, hit={replay.hit}")
+    print(f"re-simulated in {spent * 1000:.1f} ms: {'matches' if ok else 'DIVERGED'}")
+
+    if "--watch" in sys.argv:
+        import pygame
+
+        import rainDodge
+
+        steps_per_frame = max(1, round(float(sys.argv[sys.argv.index("--watch") + 1])))
+        rainDodge.setup_window()
+        sim = player.seek(0)
+        inputs = player.inputs()
+        clock = pygame.time.Clock()
+        while not sim.hit and sim.ticks < replay.ticks:
+            clock.tick(60)
+            pygame.event.pump()
+            for left, right in itertools.islice(inputs, steps_per_frame):
+                sim.step(left, right)
+            rainDodge.draw_sim(sim)
+        pygame.time.delay(1000)
+        pygame.quit()
@@ -0,0 +1,176 @@
+# Pure game logic for Space Dodge, independent of the window and wall clock.
+#
+# DodgeSim.step() advances exactly one fixed tick. Randomness comes from an
+# injected random.Random, so a seed fully determines an episode. Two drivers
+# sit on top of it:
+#   * FixedStepRunner - real time, reads an injected clock and runs as many
+#     fixed ticks as have elapsed, then notifies frame observers (draw)
+#   * run_headless    - no clock at all, runs ticks back to back
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional, Tuple
+
+import pygame
+
+from dodge_stars import StarField
+
+
+@dataclass
+class SimConfig:
+    width: int = 1000
+    height: int = 800
+    player_width: int = 60
+    player_height: int = 40
+    player_vel: int = 5
+    star_width: int = 30
+    star_height: int = 40
+    star_vel: int = 5
+    spawn_start: float = 2000    # ms between spawns at the start
+    spawn_step: float = 100      # ms shaved off after every spawn
+    spawn_floor: float = 500     # ms between spawns never drops below this
+    tick_ms: float = 1000 / 60
+
+
+class DodgeSim:
+    def __init__(self, config: Optional[SimConfig] = None, rng: Optional[random.Random] = None,
+                 star_field: Callable[..., StarField] = StarField):
+        self.config = config or SimConfig()
+        self.rng = rng or random.Random()
+        # any class with StarField's interface, e.g. dodge_stars_np.ArrayStarField
+        self.star_field = star_field
+        # optional dodge_replay.ReplayRecorder, fed every tick's input
+        self.recorder = None
+        # optional dodge_profiler.FrameProfiler, only attached while profiling
+        self.profiler = None
+        self.reset()
+
+    def reset(self) -> None:
+        cfg = self.config
+        self.player = pygame.Rect(cfg.width // 2 - cfg.player_width // 2, cfg.height - cfg.player_height - 10,
+                                  cfg.player_width, cfg.player_height)
+        self.stars = self.star_field(cfg.width, cfg.height, cfg.star_width, cfg.star_height)
+        self.ticks = 0
+        self.star_count = 0.0
+        self.star_add_increment = cfg.spawn_start
+        self.hit = False
+
+    @property
+    def elapsed_time(self) -> float:
+        return self.ticks * self.config.tick_ms / 1000
+
+    def snapshot(self) -> tuple:
+        return (self.ticks, self.star_count, self.star_add_increment, self.hit, self.player.x,
+                self.stars.snapshot(), self.rng.getstate())
+
+    def restore(self, state: tuple) -> None:
+        (self.ticks, self.star_count, self.star_add_increment, self.hit, self.player.x,
+         stars, rng_state) = state
+        self.stars.restore(stars)
+        self.rng.setstate(rng_state)
+
+    def step(self, left: bool, right: bool) -> bool:
+        """Advance one fixed tick with the given input, return True on a hit."""
+        if self.hit:
+            return True
+
+        if self.recorder is not None:
+            self.recorder.record(left, right)
+
+        cfg = self.config
+        self.ticks += 1
+        self.star_count += cfg.tick_ms
+
+        if self.star_count > self.star_add_increment:
+            self.stars.spawn(self.rng.randint(0, cfg.width - cfg.star_width))
+            self.star_add_increment = max(cfg.spawn_floor, self.star_add_increment - cfg.spawn_step)
+            self.star_count = 0
+
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.lap("spawn")
+
+        player = self.player
+        if left and player.x - cfg.player_vel >= 0:
+            player.x -= cfg.player_vel
+        if right and player.x + cfg.player_vel + player.width <= cfg.width:
+            player.x += cfg.player_vel
+        if profiler is not None:
+            profiler.lap("input")
+
+        self.hit = self.stars.update(cfg.star_vel, player)
+        if profiler is not None:
+            profiler.lap("collide")
+        return self.hit
+
+
+Policy = Callable[[DodgeSim], Tuple[bool, bool]]
+Observer = Callable[[DodgeSim], None]
+
+# XORed into an episode's seed to seed its policy: with the sim's seed, the
+# policy would draw the same numbers as the star spawner
+POLICY_SEED_MIX = 0x9E3779B9
+
+
+def idle_policy(sim: DodgeSim) -> Tuple[bool, bool]:
+    return False, False
+
+
+class FixedStepRunner:
+    def __init__(self, sim: DodgeSim, clock: Callable[[], float] = time.perf_counter,
+                 observers: Iterable[Observer] = (), max_steps: int = 5):
+        self.sim = sim
+        self.clock = clock
+        self.observers = list(observers)
+        # cap on catch-up ticks per frame so a long stall can't spiral
+        self.max_steps = max_steps
+        self._last = clock()
+        self._accumulator = 0.0
+
+    def advance(self, left: bool, right: bool) -> int:
+        now = self.clock()
+        self._accumulator += (now - self._last) * 1000
+        self._last = now
+
+        tick_ms = self.sim.config.tick_ms
+        steps = 0
+        while self._accumulator >= tick_ms and steps < self.max_steps and not self.sim.hit:
+            self.sim.step(left, right)
+            self._accumulator -= tick_ms
+            steps += 1
+        if steps == self.max_steps:
+            self._accumulator = 0.0
+
+        for observer in self.observers:
+            observer(self.sim)
+        return steps
+
+
+def run_headless(sim: DodgeSim, policy: Policy = idle_policy, max_ticks: Optional[int] = None,
+                 observers: Iterable[Observer] = ()) -> DodgeSim:
+    observers = list(observers)
+    while not sim.hit and (max_ticks is None or sim.ticks < max_ticks):
+        left, right = policy(sim)
+        sim.step(left, right)
+        for observer in observers:
+            observer(sim)
+    return sim
+
+
+def random_policy(rng: random.Random) -> Policy:
+    def policy(sim: DodgeSim) -> Tuple[bool, bool]:
+        move = rng.random()
+        return move < 0.3, move > 0.7
+    return policy
+
+
+if __name__ == "__main__":
+    episodes = 200
+    start = time.perf_counter()
+    ticks = 0
+    for seed in range(episodes):
+        sim = run_headless(DodgeSim(rng=random.Random(seed)), random_policy(random.Random(seed ^ POLICY_SEED_MIX)),
+                           max_ticks=60 * 600)
+        ticks += sim.ticks
+    spent = time.perf_counter() - start
+    print(f"{episodes} episodes, {ticks} ticks in {spent:.2f}s ({ticks / spent:,.0f} ticks/s)")
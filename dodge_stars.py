@@ -0,0 +1,97 @@
+from collections import deque
+from typing import Deque, Iterator, List, Tuple
+
+import pygame
+
+
+# Star manager for Space Dodge.
+#
+# Stars never move sideways and every star falls at the same speed, so the
+# order in which stars are spawned is also their bottom-to-top order on screen.
+# That gives us two cheap structures:
+#   * one global deque in spawn order - stars leave the screen from its front
+#   * a uniform grid of x columns, each a deque in the same order - collision
+#     only walks the columns under the player and stops at the first star
+#     that is entirely above it
+# Rects that fall off screen go back on a free list and are reused on spawn.
+class StarField:
+    def __init__(self, width: int, height: int, star_width: int, star_height: int,
+                 cell_size: int = 0):
+        self.width = width
+        self.height = height
+        self.star_width = star_width
+        self.star_height = star_height
+        # a star spans at most two columns when cells are at least as wide as it
+        self.cell_size = max(cell_size or star_width * 2, star_width)
+
+        self._stars: Deque[pygame.Rect] = deque()
+        self._columns: List[Deque[pygame.Rect]] = [deque() for _ in range(width // self.cell_size + 1)]
+        self._free: List[pygame.Rect] = []
+
+    def __len__(self) -> int:
+        return len(self._stars)
+
+    def __iter__(self) -> Iterator[pygame.Rect]:
+        return iter(self._stars)
+
+    @property
+    def pooled(self) -> int:
+        return len(self._free)
+
+    def _cells(self, left: int, right: int) -> range:
+        last = len(self._columns) - 1
+        return range(min(last, max(0, left // self.cell_size)),
+                     min(last, max(0, (right - 1) // self.cell_size)) + 1)
+
+    def spawn(self, x: int) -> pygame.Rect:
+        if self._free:
+            star = self._free.pop()
+            star.x = x
+            star.y = -self.star_height
+        else:
+            star = pygame.Rect(x, -self.star_height, self.star_width, self.star_height)
+
+        self._stars.append(star)
+        for cell in self._cells(star.left, star.right):
+            self._columns[cell].append(star)
+        return star
+
+    def clear(self) -> None:
+        self._free.extend(self._stars)
+        self._stars.clear()
+        for column in self._columns:
+            column.clear()
+
+    def snapshot(self) -> List[Tuple[int, int]]:
+        return [(star.x, star.y) for star in self._stars]
+
+    def restore(self, positions: List[Tuple[int, int]]) -> None:
+        self.clear()
+        for x, y in positions:
+            self.spawn(x).y = y
+
+    def update(self, vel: int, player: pygame.Rect) -> bool:
+        """Move every star down by ``vel``, recycle the ones off screen and
+        return True if any remaining star hits the player."""
+        for star in self._stars:
+            star.y += vel
+
+        stars = self._stars
+        while stars and stars[0].y > self.height:
+            star = stars.popleft()
+            for cell in self._cells(star.left, star.right):
+                self._columns[cell].popleft()
+            self._free.append(star)
+
+        return self.collides(player)
+
+    def collides(self, player: pygame.Rect) -> bool:
+        for cell in self._cells(player.left, player.right):
+            for star in self._columns[cell]:
+                if star.top >= player.bottom:
+                    continue
+                if star.bottom <= player.top:
+                    break
+                if star.colliderect(player):
+                    return True
+        return False
@@ -0,0 +1,99 @@
+from typing import Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import pygame
+
+
+# Structure-of-arrays star field for very large star counts.
+#
+# Same interface as dodge_stars.StarField, but positions and sizes live in
+# contiguous NumPy arrays and movement, culling and the player overlap test run
+# as whole-array operations. pygame.Rect objects are only built while iterating
+# for drawing, and only for stars that are actually on screen.
+class ArrayStarField:
+    def __init__(self, width: int, height: int, star_width: int, star_height: int,
+                 capacity: int = 1024):
+        self.width = width
+        self.height = height
+        self.star_width = star_width
+        self.star_height = star_height
+
+        self._count = 0
+        self._x = np.empty(capacity, dtype=np.int32)
+        self._y = np.empty(capacity, dtype=np.int32)
+        self._w = np.empty(capacity, dtype=np.int32)
+        self._h = np.empty(capacity, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[pygame.Rect]:
+        n = self._count
+        x, y, w, h = self._x[:n], self._y[:n], self._w[:n], self._h[:n]
+        visible = np.flatnonzero(y + h > 0)
+        for sx, sy, sw, sh in zip(x[visible].tolist(), y[visible].tolist(),
+                                  w[visible].tolist(), h[visible].tolist()):
+            yield pygame.Rect(sx, sy, sw, sh)
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._count + extra
+        capacity = len(self._x)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("_x", "_y", "_w", "_h"):
+            grown = np.empty(capacity, dtype=np.int32)
+            grown[:self._count] = getattr(self, name)[:self._count]
+            setattr(self, name, grown)
+
+    def spawn(self, x: int, w: Optional[int] = None, h: Optional[int] = None) -> None:
+        self.spawn_many([x], w, h)
+
+    def spawn_many(self, xs: Sequence[int], w: Optional[int] = None, h: Optional[int] = None) -> None:
+        k = len(xs)
+        self._reserve(k)
+        start, end = self._count, self._count + k
+        w = self.star_width if w is None else w
+        h = self.star_height if h is None else h
+        self._x[start:end] = xs
+        self._w[start:end] = w
+        self._h[start:end] = h
+        self._y[start:end] = -self._h[start:end]
+        self._count = end
+
+    def clear(self) -> None:
+        self._count = 0
+
+    def snapshot(self) -> Tuple[np.ndarray, ...]:
+        n = self._count
+        return tuple(arr[:n].copy() for arr in (self._x, self._y, self._w, self._h))
+
+    def restore(self, arrays: Tuple[np.ndarray, ...]) -> None:
+        self._count = 0
+        self._reserve(len(arrays[0]))
+        for arr, saved in zip((self._x, self._y, self._w, self._h), arrays):
+            arr[:len(saved)] = saved
+        self._count = len(arrays[0])
+
+    def update(self, vel: int, player: pygame.Rect) -> bool:
+        """Move every star down by ``vel``, drop the ones off screen and
+        return True if any remaining star hits the player."""
+        n = self._count
+        y = self._y[:n]
+        y += vel
+
+        keep = y <= self.height
+        if not keep.all():
+            kept = int(np.count_nonzero(keep))
+            for arr in (self._x, self._w, self._h, self._y):
+                arr[:kept] = arr[:n][keep]
+            self._count = kept
+
+        return self.collides(player)
+
+    def collides(self, player: pygame.Rect) -> bool:
+        n = self._count
+        x, y, w, h = self._x[:n], self._y[:n], self._w[:n], self._h[:n]
+        return bool(np.any((x < player.right) & (x + w > player.left) &
+                           (y < player.bottom) & (y + h > player.top)))
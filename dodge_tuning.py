@@ -0,0 +1,154 @@
+# Batch runner for tuning the Space Dodge difficulty curve.
+#
+#   python dodge_tuning.py --episodes 2000 --policy dodge --out survival.csv
+#
+# Every combination of the spawn curve (start / step / floor, in ms) and
+# STAR_VEL in GRID is played for --episodes seeded headless episodes across a
+# ProcessPoolExecutor. Work is sent out in chunks of seeds with a bounded
+# number of chunks in flight, each finished episode is appended to the CSV as
+# soon as its chunk completes, and the summary table is built from fixed-size
+# per-config histograms - nothing grows with the number of episodes.
+import argparse
+import concurrent.futures
+import csv
+import itertools
+import os
+import random
+import time
+from typing import Dict, List, Tuple
+
+from dodge_sim import POLICY_SEED_MIX, DodgeSim, SimConfig, idle_policy, random_policy, run_headless
+
+GRID = {
+    "spawn_start": [2000, 1500],
+    "spawn_step": [100, 50],
+    "spawn_floor": [500, 300],
+    "star_vel": [5, 7],
+}
+CHUNK = 50
+BIN_SECONDS = 1
+
+
+def dodge_policy(rng: random.Random):
+    # scripted player: step away from the closest star about to land on it
+    def policy(sim: DodgeSim) -> Tuple[bool, bool]:
+        player = sim.player
+        danger = None
+        for star in sim.stars:
+            if star.bottom > player.top - 150 and star.top < player.bottom and \
+                    star.right > player.left - 20 and star.left < player.right + 20:
+                if danger is None or star.bottom > danger.bottom:
+                    danger = star
+        if danger is None:
+            return False, False
+        go_left = danger.centerx >= player.centerx
+        if go_left and player.left < sim.config.player_vel:
+            go_left = False
+        elif not go_left and player.right > sim.config.width - sim.config.player_vel:
+            go_left = True
+        return go_left, not go_left
+    return policy
+
+
+POLICIES = {
+    "idle": lambda rng: idle_policy,
+    "random": random_policy,
+    "dodge": dodge_policy,
+}
+
+
+def run_chunk(params: Dict[str, float], policy: str, seeds: List[int], max_ticks: int) -> List[Tuple[int, int, bool]]:
+    config = SimConfig(**params)
+    results = []
+    for seed in seeds:
+        policy_rng = random.Random(seed ^ POLICY_SEED_MIX)
+        sim = run_headless(DodgeSim(config, random.Random(seed)), POLICIES[policy](policy_rng), max_ticks)
+        results.append((seed, sim.ticks, sim.hit))
+    return results
+
+
+class SurvivalHistogram:
+    def __init__(self, max_seconds: float):
+        self.bins = [0] * (int(max_seconds // BIN_SECONDS) + 1)
+        self.episodes = 0
+        self.total = 0.0
+        self.survived = 0
+
+    def add(self, seconds: float, hit: bool) -> None:
+        self.bins[min(len(self.bins) - 1, int(seconds // BIN_SECONDS))] += 1
+        self.episodes += 1
+        self.total += seconds
+        self.survived += not hit
+
+    def quantile(self, q: float) -> float:
+        target = q * self.episodes
+        seen = 0
+        for index, count in enumerate(self.bins):
+            seen += count
+            if seen >= target and count:
+                return index * BIN_SECONDS
+        return (len(self.bins) - 1) * BIN_SECONDS
+
+
+def configs() -> List[Dict[str, float]]:
+    names = list(GRID)
+    return [dict(zip(names, values)) for values in itertools.product(*GRID.values())]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Batch headless Space Dodge episodes over the spawn curve grid")
+    parser.add_argument("--episodes", type=int, default=500, help="episodes per config")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="dodge")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-seconds", type=float, default=300, help="cap on a single episode")
+    parser.add_argument("--out", default="survival.csv")
+    args = parser.parse_args()
+
+    tick_ms = SimConfig().tick_ms
+    max_ticks = int(args.max_seconds * 1000 / tick_ms)
+    grid = configs()
+    histograms = [SurvivalHistogram(args.max_seconds) for _ in grid]
+    jobs = ((index, seeds) for index in range(len(grid))
+            for seeds in (list(range(start, min(start + CHUNK, args.episodes)))
+                          for start in range(0, args.episodes, CHUNK)))
+
+    start = time.perf_counter()
+    done = 0
+    with open(args.out, "w", newline="") as f, \
+            concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as executor:
+        writer = csv.writer(f)
+        writer.writerow(list(GRID) + ["seed", "ticks", "seconds", "hit"])
+
+        pending = {}
+        while True:
+            # keep a few chunks per worker queued, no more
+            for index, seeds in itertools.islice(jobs, args.workers * 2 - len(pending)):
+                pending[executor.submit(run_chunk, grid[index], args.policy, seeds, max_ticks)] = index
+            if not pending:
+                break
+
+            finished, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                index = pending.pop(future)
+                params = list(grid[index].values())
+                for seed, ticks, hit in future.result():
+                    seconds = ticks * tick_ms / 1000
+                    histograms[index].add(seconds, hit)
+                    writer.writerow(params + [seed, ticks, round(seconds, 3), int(hit)])
+                    done += 1
+            print(f"\r{done}/{len(grid) * args.episodes} episodes", end="", flush=True)
+
+    spent = time.perf_counter() - start
+    print(f"\n{done} episodes in {spent:.1f}s ({done / spent:,.0f} episodes/s, {args.workers} workers)\n")
+
+    print(" ".join(f"{name:>11}" for name in GRID) + "    mean     p10     p50     p90  survived")
+    for params, histogram in sorted(zip(grid, histograms), key=lambda item: -item[1].total):
+        print(" ".join(f"{value:>11}" for value in params.values()) +
+              f"  {histogram.total / histogram.episodes:6.1f}s {histogram.quantile(0.1):6.0f}s "
+              f"{histogram.quantile(0.5):6.0f}s {histogram.quantile(0.9):6.0f}s  "
+              f"{histogram.survived / histogram.episodes:7.1%}")
+    print(f"\nper-episode results: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
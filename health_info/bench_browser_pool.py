@@ -0,0 +1,77 @@
+import concurrent.futures
+import functools
+import http.server
+import os
+import sys
+import threading
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from health_info.browser_pool import BrowserPool
+from health_info.scrape_doctor import create_browser
+
+# ---------- Browser pool benchmark ----------
+# Serves the saved profile pages in fixtures/profiles from a local static HTTP
+# server and loads them through BrowserPool at a few pool sizes, next to the
+# old one-browser-per-page approach. Needs Chrome + chromedriver.
+#
+#   python -m health_info.bench_browser_pool [rounds]
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "profiles")
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve_fixtures():
+    handler = functools.partial(QuietHandler, directory=FIXTURES)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def load(driver, url):
+    driver.get(url)
+    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "td.element-data")))
+    return driver.find_element(By.ID, "title-position").text
+
+
+def fresh_browser(url):
+    driver = create_browser()
+    try:
+        return load(driver, url)
+    finally:
+        driver.quit()
+
+
+def pooled(pool, url):
+    with pool.lease() as driver:
+        return load(driver, url)
+
+
+def run(name, fetch, urls, workers):
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        names = list(executor.map(fetch, urls))
+    spent = time.perf_counter() - start
+    assert all(names), "a page came back without a name"
+    print(f"{name:<22} {len(urls)} pages in {spent:6.2f}s  {len(urls) / spent:6.2f} pages/s")
+
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    server = serve_fixtures()
+    base = f"http://127.0.0.1:{server.server_address[1]}/"
+    urls = [base + name for name in sorted(os.listdir(FIXTURES))] * rounds
+
+    run("browser per page (3)", fresh_browser, urls, 3)
+    for size in (1, 3, 6):
+        with BrowserPool(create_browser, size=size, max_pages=50) as pool:
+            run(f"pool size {size}", functools.partial(pooled, pool), urls, size)
+            print(f"{'':<22} browsers started: {pool.created}, recycled: {pool.recycled}")
+    server.shutdown()
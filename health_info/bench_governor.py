@@ -0,0 +1,103 @@
+import functools
+import http.server
+import os
+import sys
+import threading
+import time
+
+from health_info.fetch_engine import FetchEngine
+from scraping.governor import AIMDGovernor
+
+# ---------- AIMD governor check ----------
+# Serves the saved profile pages from a local server that behaves like a site
+# with limited capacity: every request takes LATENCY seconds, and once more
+# than CAPACITY are being served at the same time, extra ones get a 429 with a
+# Retry-After. Fetches the same URLs with a fixed concurrency and with the
+# governor, and reports what each got through.
+#
+#   python -m health_info.bench_governor [pages]
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "profiles")
+CAPACITY = 12
+LATENCY = 0.05
+RETRY_AFTER = "1"
+CEILING = 64
+
+
+class ThrottlingHandler(http.server.SimpleHTTPRequestHandler):
+    lock = threading.Lock()
+    active = 0
+    served = 0
+    rejected = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cls = ThrottlingHandler
+        with cls.lock:
+            cls.active += 1
+            over = cls.active > CAPACITY
+            if over:
+                cls.rejected += 1
+        try:
+            if over:
+                self.send_response(429)
+                self.send_header("Retry-After", RETRY_AFTER)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            time.sleep(LATENCY)
+            self.path = self.path.split("?")[0]
+            super().do_GET()
+            with cls.lock:
+                cls.served += 1
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+
+def serve_throttled():
+    handler = functools.partial(ThrottlingHandler, directory=FIXTURES)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.request_queue_size = 256
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_length(body, url, context):
+    return len(body)
+
+
+def run(name, urls, governor):
+    ThrottlingHandler.served = ThrottlingHandler.rejected = 0
+    outcome = {"ok": 0, "failed": 0}
+
+    def on_result(url, context, result, error):
+        outcome["failed" if error is not None else "ok"] += 1
+
+    engine = FetchEngine(parse_length, concurrency=CEILING, per_host_rate=10_000, per_host_burst=CEILING,
+                         parse_workers=2, governor=governor)
+    start = time.perf_counter()
+    engine.crawl(((url, None) for url in urls), on_result)
+    spent = time.perf_counter() - start
+    print(f"{name:<9} {outcome['ok']:4d} ok {outcome['failed']:4d} failed   "
+          f"{ThrottlingHandler.rejected:4d} 429s   {spent:5.2f}s   {outcome['ok'] / spent:6.0f} pages/s")
+    if governor is not None:
+        print(f"          {governor.report()}")
+    return outcome
+
+
+if __name__ == "__main__":
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    server = serve_throttled()
+    base = f"http://127.0.0.1:{server.server_port}"
+    names = sorted(os.listdir(FIXTURES))
+    urls = [f"{base}/{names[i % len(names)]}?n={i}" for i in range(pages)]
+    print(f"{pages} pages, server takes {CAPACITY} at a time at {LATENCY * 1000:.0f} ms each "
+          f"(best case {CAPACITY / LATENCY:.0f} pages/s)")
+
+    run("fixed", urls, None)
+    governed = run("governed", urls, AIMDGovernor(initial=4, maximum=CEILING, latency_target=1.0))
+    server.shutdown()
+    sys.exit(0 if governed["failed"] == 0 else 1)
@@ -0,0 +1,74 @@
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from scraping.links import LinkStream, url_set
+
+# ---------- Link Stream Benchmark ----------
+# Writes a synthetic doctor_links.csv (a fifth of the rows repeat an earlier
+# URL) and compares the old load-everything-then-drop_duplicates start-up with
+# LinkStream: time until the first link is available, total time to walk the
+# file, and peak RSS growth for each.
+#
+#   python -m health_info.bench_links [rows]
+
+
+def make_links(path, rows):
+    rng = random.Random(0)
+    with open(path, "w") as f:
+        for i in range(rows):
+            # every fifth row repeats a random earlier (non-repeat) row's URL
+            n = rng.randrange(i) // 5 * 5 if i % 5 == 4 else i
+            f.write(f"State{n % 50},https://example.org/find-a-doctor/record/{n:018d}QAO\n")
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_legacy(path):
+    start = time.perf_counter()
+    df = pd.read_csv(path, header=None, names=["State", "DoctorProfileURL"]).drop_duplicates(
+        subset="DoctorProfileURL")
+    rows = df.itertuples(index=False)
+    next(rows)
+    first = time.perf_counter() - start
+    count = 1 + sum(1 for _ in rows)
+    return first, time.perf_counter() - start, count
+
+
+def bench_stream(path, kind):
+    start = time.perf_counter()
+    links = iter(LinkStream(path, seen=url_set(kind)))
+    next(links)
+    first = time.perf_counter() - start
+    count = 1 + sum(1 for _ in links)
+    return first, time.perf_counter() - start, count
+
+
+def run(name, path):
+    baseline = peak_rss_mb()
+    first, total, count = bench_legacy(path) if name == "legacy" else bench_stream(path, name)
+    print(f"{name:<7} first link {first * 1000:7.1f} ms   all {count} links {total:6.2f} s   "
+          f"peak RSS +{peak_rss_mb() - baseline:6.1f} MB")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--run":
+        run(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "doctor_links.csv")
+        make_links(path, rows)
+        print(f"{rows} rows, {os.path.getsize(path) / 2 ** 20:.0f} MB")
+        # peak RSS never goes down, so each variant gets its own process
+        for name in ("legacy", "set", "bloom"):
+            subprocess.run([sys.executable, "-m", "health_info.bench_links", "--run", name, path], check=True)
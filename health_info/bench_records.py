@@ -0,0 +1,84 @@
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from scraping.columnar import load
+from scraping.records import DoctorRecord, FIELDS
+from scraping.sink import open_sink
+
+# ---------- Record storage benchmark ----------
+# Takes the scraped rows in doctor_details.csv, repeats them up to N records
+# (each with its own source URL) and compares plain dicts with DoctorRecord
+# for memory, then the CSV, Parquet and Arrow sinks for file size, write time
+# and how long it takes to load the result back. The rows repeat, so the
+# Parquet size is a best case; Arrow is left uncompressed so loading it is a
+# memory map rather than a decode.
+#
+#   python -m health_info.bench_records [records]
+
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "doctor_details.csv")
+
+
+def source_rows():
+    # no header; columns are in DoctorRecord field order
+    with open(SOURCE, newline="", encoding="utf-8") as f:
+        return [dict(zip(FIELDS, row)) for row in csv.reader(f) if len(row) == len(FIELDS)]
+
+
+def build(rows, count, make):
+    return [make({**rows[i % len(rows)], "source_result_url": f"{rows[i % len(rows)]['source_result_url']}?n={i}"})
+            for i in range(count)]
+
+
+def measure(rows, count, make):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = build(rows, count, make)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return records, used
+
+
+def size_of(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def load_back(path):
+    if path.endswith(".csv"):
+        return len(pd.read_csv(path, dtype=str, keep_default_na=False))
+    return load(path).num_rows
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rows = source_rows()
+
+    _, dict_bytes = measure(rows, count, dict)
+    records, record_bytes = measure(rows, count, lambda values: DoctorRecord(**values))
+    # the URL strings are new in both; the per-record container is the difference
+    print(f"{count} records from {len(rows)} scraped rows")
+    print(f"  dict          {dict_bytes / count:7.0f} bytes/record")
+    print(f"  DoctorRecord  {record_bytes / count:7.0f} bytes/record")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("out.csv", "out.parquet", "out.arrow"):
+            path = os.path.join(tmp, name)
+            start = time.perf_counter()
+            with open_sink(path, resume=False, checkpoint_every=50_000) as sink:
+                for record in records:
+                    sink.write(record)
+            write_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            loaded = load_back(path)
+            load_time = time.perf_counter() - start
+            assert loaded == count, (name, loaded)
+            print(f"  {name:<12} {size_of(path) / 2 ** 20:7.2f} MB  write {write_time:5.2f}s  "
+                  f"load {load_time * 1000:7.1f} ms")
@@ -0,0 +1,99 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+
+# ---------- Browser Pool ----------
+# Keeps up to `size` warm webdriver instances and leases one to each worker.
+# A driver goes back to the idle queue after each page and is quit and
+# replaced after `max_pages` pages, when a page raises inside the lease, or
+# when it fails the health check before being handed out again. At most
+# `size` drivers are ever alive, so memory stays bounded however many pages
+# are scraped.
+class BrowserPool:
+    def __init__(self, factory, size=3, max_pages=50, lease_timeout=None):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self.lease_timeout = lease_timeout
+
+        self._idle = queue.LifoQueue()   # most recently used first, it's the warmest
+        self._slots = threading.BoundedSemaphore(size)
+        self._pages = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.created = 0
+        self.recycled = 0
+
+    def _healthy(self, driver):
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        with self._lock:
+            self._pages.pop(id(driver), None)
+            self.recycled += 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self.lease_timeout):
+            raise TimeoutError("no browser available")
+
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    driver = self.factory()
+                    with self._lock:
+                        self._pages[id(driver)] = 0
+                        self.created += 1
+                    return driver
+
+                if self._healthy(driver):
+                    return driver
+                self._quit(driver)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, driver, failed):
+        with self._lock:
+            self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+            worn_out = self._pages[id(driver)] >= self.max_pages
+
+        if failed or worn_out or self._closed:
+            self._quit(driver)
+        else:
+            self._idle.put(driver)
+        self._slots.release()
+
+    @contextmanager
+    def lease(self):
+        driver = self._acquire()
+        try:
+            yield driver
+        except BaseException:
+            self._release(driver, failed=True)
+            raise
+        self._release(driver, failed=False)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,233 @@
+import argparse
+import collections
+import concurrent.futures
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from scraping.records import FIELDS
+
+# ---------- Batch Cleaning ----------
+# Post-processing for scraper output, run over whole columns at a time rather
+# than row by row inside the scrape workers. Reads the raw output (CSV or a
+# .parquet/.arrow sink directory) a chunk at a time and writes a cleaned copy,
+# so it can be rerun with new rules on output that is already scraped.
+#
+#   address   full_address -> street, city, state (full name), postcode
+#   phones    tel_*/fax_*/mobile -> "(AAA) BBB-CCCC[ xEXT]"
+#   names     whitespace, ALL CAPS / all lower case, "M.D." style degrees
+#
+#   python -m health_info.clean doctors_details.parquet doctors_clean.parquet
+
+US_STATES = {
+    "AL": "Alabama", "AK": "Alaska", "AZ": "Arizona", "AR": "Arkansas", "CA": "California", "CO": "Colorado",
+    "CT": "Connecticut", "DE": "Delaware", "DC": "District of Columbia", "FL": "Florida", "GA": "Georgia",
+    "HI": "Hawaii", "ID": "Idaho", "IL": "Illinois", "IN": "Indiana", "IA": "Iowa", "KS": "Kansas",
+    "KY": "Kentucky", "LA": "Louisiana", "ME": "Maine", "MD": "Maryland", "MA": "Massachusetts",
+    "MI": "Michigan", "MN": "Minnesota", "MS": "Mississippi", "MO": "Missouri", "MT": "Montana",
+    "NE": "Nebraska", "NV": "Nevada", "NH": "New Hampshire", "NJ": "New Jersey", "NM": "New Mexico",
+    "NY": "New York", "NC": "North Carolina", "ND": "North Dakota", "OH": "Ohio", "OK": "Oklahoma",
+    "OR": "Oregon", "PA": "Pennsylvania", "RI": "Rhode Island", "SC": "South Carolina", "SD": "South Dakota",
+    "TN": "Tennessee", "TX": "Texas", "UT": "Utah", "VT": "Vermont", "VA": "Virginia", "WA": "Washington",
+    "WV": "West Virginia", "WI": "Wisconsin", "WY": "Wyoming", "PR": "Puerto Rico",
+}
+
+# ---------- Address ----------
+# Profile addresses come flattened to one line, e.g.
+#   "1850 Blackfoot St NW Suite 450 Coon Rapids, MN 55433 United States"
+#   "333 Cedar Street, New Haven, CT 06510"
+# The tail ("ST 12345[-6789]") is unambiguous and is split off with plain
+# vectorized string ops. Where street and city meet is not: a comma wins if
+# there is one, otherwise the street runs to the last street-type word or unit
+# number and the rest is the city, and failing both the city is taken to be
+# the last word. Cities are at most three capitalized words, which keeps
+# "Dept of Orthopaedics" and the like in the street.
+WORD = r"[A-Z][A-Za-z.'-]*"
+UNIT = r"(?:Suite|Ste|Unit|Fl|Floor|Bldg|Building|Room|Rm|PH|Box|Tower|Zone|Pod|Wing|Level)"
+CITY = r"(?P<city>(?!" + UNIT + r"\b)" + WORD + r"(?: " + WORD + r"){0,2})$"
+SAINT_CITIES = r"(?!\.?\s+(?:Louis|Paul|Petersburg|Charles|George|Augustine|Cloud|Joseph|Clair|Helena|Johns)\b)"
+STREET_END = (r"(?:\b(?:St" + SAINT_CITIES + r"|Street|Ave|Avenue|Rd|Road|Dr|Drive|Blvd|Boulevard|Way|Ln|Lane|"
+              r"Pkwy|Parkway|Ct|Court|Hwy|Highway|Pl|Place|Cir|Circle|Ter|Terrace|Trl|Trail|Pike|Plaza|Sq|Square|"
+              r"Loop|Row|Route|Rte|Ext|Center|Centre)\.?(?:\s+(?:N|S|E|W|NE|NW|SE|SW)\b\.?)?"
+              r"|\b" + UNIT + r"\.?\s*#?\s*[\w-]+|#\s*[\w-]+"
+              r"|\b\d+(?:st|nd|rd|th)\s+(?:Floor|Fl)\b\.?)")
+STREET_CITY_PATTERNS = [
+    r"^(?P<street>.+),\s*" + CITY,
+    r"^(?P<street>.*" + STREET_END + r"),?\s+" + CITY,
+]
+STATE_RE = r"[A-Z]{2}"
+ZIP_RE = r"\d{5}(?:-\d{4})?"
+ADDRESS_COLUMNS = ["street", "city", "state", "postcode"]
+
+
+def _split_tail(addresses):
+    """(head, state, postcode) with the "ST 12345" tail taken off the end."""
+    text = addresses.str.removesuffix(" United States").str.removesuffix(" USA")
+    words = text.str.rsplit(" ", n=2, expand=True).reindex(columns=[0, 1, 2]).fillna("")
+    # right-align short addresses ("DE 19711", "FL") so the last word is in 2
+    for _ in range(2):
+        short = words[2] == ""
+        words.loc[short, [0, 1, 2]] = pd.DataFrame({0: "", 1: words[0], 2: words[1]})[short].to_numpy()
+    words = words.apply(lambda column: column.str.rstrip(","))
+
+    with_zip = words[2].str.fullmatch(ZIP_RE) & words[1].str.fullmatch(STATE_RE)
+    state_last = ~with_zip & words[2].str.fullmatch(STATE_RE)
+
+    head = (words[0] + " " + words[1]).where(state_last, words[0].where(with_zip, ""))
+    state = words[1].where(with_zip, words[2].where(state_last, ""))
+    postcode = words[2].where(with_zip, "")
+    return head.str.strip(" ,"), state, postcode
+
+
+def split_addresses(addresses):
+    """street/city/state/postcode columns for a Series of one-line addresses;
+    rows without a recognizable state get empty strings."""
+    addresses = addresses.fillna("").str.replace(r"\s+", " ", regex=True).str.strip()
+    head, state, postcode = _split_tail(addresses)
+    parts = pd.DataFrame({"street": "", "city": "", "state": state.map(US_STATES).fillna(state),
+                          "postcode": postcode}, index=addresses.index)
+
+    todo = (state != "") & (head != "")
+    for pattern in STREET_CITY_PATTERNS:
+        found = head[todo].str.extract(pattern)
+        hit = found["city"].notna()
+        index = hit[hit].index
+        parts.loc[index, "street"] = found.loc[hit, "street"]
+        parts.loc[index, "city"] = found.loc[hit, "city"]
+        todo[index] = False
+
+    # last resort: the last word is the city
+    last = head[todo].str.rsplit(" ", n=1, expand=True).reindex(columns=[0, 1])
+    one_word = last[1].isna()
+    parts.loc[last.index, "street"] = last[0].where(~one_word, "")
+    parts.loc[last.index, "city"] = last[1].where(~one_word, last[0])
+
+    parts["street"] = parts["street"].fillna("").str.strip(" ,")
+    parts["city"] = parts["city"].fillna("").str.strip(" ,")
+    return parts
+
+
+# ---------- Phones ----------
+PHONE_FIELDS = ["tel_1", "tel_2", "tel_3", "fax_1", "fax_2", "fax_3", "mobile"]
+EXTENSION = re.compile(r"(?:\bx|\bext\.?|extension)\s*(\d+)", re.I)
+
+
+def normalize_phones(phones):
+    """US numbers as "(AAA) BBB-CCCC", with " xNNN" for an extension; anything
+    that isn't 10 digits (11 with a leading 1) is only trimmed."""
+    phones = phones.fillna("").str.strip()
+    present = phones != ""
+    if not present.all():
+        # most tel_2/fax_*/mobile columns are almost all empty
+        phones[present] = normalize_phones(phones[present]) if present.any() else phones[present]
+        return phones
+    extension = phones.str.extract(EXTENSION)[0]
+    digits = phones.str.replace(EXTENSION, "", regex=True).str.replace(r"\D", "", regex=True)
+    digits = digits.where(~((digits.str.len() == 11) & digits.str.startswith("1")), digits.str[1:])
+
+    formatted = "(" + digits.str[:3] + ") " + digits.str[3:6] + "-" + digits.str[6:]
+    formatted = formatted + np.where(extension.notna(), " x" + extension.fillna(""), "")
+    return formatted.where(digits.str.len() == 10, phones)
+
+
+# ---------- Names ----------
+NAME_FIELDS = ["forename", "surname"]
+
+
+def normalize_names(names):
+    """Collapse whitespace and stray commas; ALL CAPS or all lower case words
+    become Title Case, mixed case (McDonald, O'Leary) is left alone."""
+    names = names.fillna("").str.replace(r"[\s,]+", " ", regex=True).str.strip()
+    one_case = (names == names.str.upper()) | (names == names.str.lower())
+    return names.where(~one_case, names.str.title())
+
+
+def normalize_titles(titles):
+    """"M.D., Ph.D." -> "MD PhD"."""
+    return titles.fillna("").str.replace(".", "", regex=False).str.replace(r"[\s,]+", " ", regex=True).str.strip()
+
+
+def clean_frame(df):
+    """Cleaned copy of a frame of DoctorRecord columns. Address columns are
+    only replaced where full_address could be parsed."""
+    df = df.copy()
+    if "full_address" in df:
+        parts = split_addresses(df["full_address"])
+        parsed = parts["state"] != ""
+        for column in ADDRESS_COLUMNS:
+            if column in df:
+                df[column] = df[column].where(~parsed, parts[column])
+    for column in PHONE_FIELDS:
+        if column in df:
+            df[column] = normalize_phones(df[column])
+    for column in NAME_FIELDS:
+        if column in df:
+            df[column] = normalize_names(df[column])
+    if "title" in df:
+        df["title"] = normalize_titles(df["title"])
+    return df
+
+
+# ---------- Files ----------
+def read_chunks(path, chunk_size=100_000, header=True):
+    if path.endswith((".parquet", ".arrow")):
+        from scraping.columnar import load
+
+        for batch in load(path).to_batches(max_chunksize=chunk_size):
+            yield batch.to_pandas().astype(object).fillna("")
+    elif path.endswith(".jsonl"):
+        for chunk in pd.read_json(path, lines=True, dtype=False, chunksize=chunk_size):
+            yield chunk.astype(object).fillna("")
+    else:
+        yield from pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_size,
+                               header=0 if header else None, names=None if header else list(FIELDS))
+
+
+def clean_file(source, target, chunk_size=100_000, header=True, workers=1):
+    """Clean `source` into `target` one chunk at a time; returns rows written.
+    With workers > 1 chunks are cleaned in that many processes (a few chunks
+    ahead of the writer) and still written in input order."""
+    from scraping.sink import open_sink
+
+    if os.path.isdir(target) or os.path.isfile(target):
+        print(f"Overwriting {target}")
+    rows = 0
+    with open_sink(target, resume=False, checkpoint_every=chunk_size) as sink:
+        if workers <= 1:
+            for chunk in read_chunks(source, chunk_size, header):
+                sink.write_frame(clean_frame(chunk))
+                rows += len(chunk)
+            return rows
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = collections.deque()
+            for chunk in read_chunks(source, chunk_size, header):
+                pending.append(executor.submit(clean_frame, chunk))
+                if len(pending) >= workers * 2:
+                    cleaned = pending.popleft().result()
+                    sink.write_frame(cleaned)
+                    rows += len(cleaned)
+            while pending:
+                cleaned = pending.popleft().result()
+                sink.write_frame(cleaned)
+                rows += len(cleaned)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean scraped doctor records in batches.")
+    parser.add_argument("source", help="raw scraper output: .csv/.jsonl file or .parquet/.arrow directory")
+    parser.add_argument("target", help="where to write the cleaned copy (format from the extension)")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes cleaning chunks")
+    parser.add_argument("--no-header", action="store_true", help="CSV without a header row, in DoctorRecord order")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = clean_file(args.source, args.target, args.chunk_size, header=not args.no_header,
+                      workers=args.workers)
+    spent = time.perf_counter() - start
+    print(f"Cleaned {rows} rows in {spent:.1f}s ({rows / spent * 60:,.0f} rows/min) -> {args.target}")
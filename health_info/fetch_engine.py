@@ -0,0 +1,154 @@
+import asyncio
+import concurrent.futures
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from rate_limit import TokenBucket, backoff, parse_retry_after
+from scraping.governor import THROTTLE_STATUSES
+
+
+def _timed_parse(parse, body, url, context):
+    """Runs in the parser process, so the time is parsing only, not the trip
+    through the pool."""
+    start = time.perf_counter()
+    result = parse(body, url, context)
+    return result, time.perf_counter() - start
+
+
+# ---------- Fetch Engine ----------
+# A fixed set of worker coroutines pull (url, context) items off a bounded
+# queue, so however many URLs are fed in, at most `concurrency` requests are
+# in flight and at most 2 * `concurrency` items are buffered. All requests go
+# through one keep-alive aiohttp session. Response bodies are handed to
+# `parse(body, url, context)` in a process pool so parsing never blocks the
+# event loop; `parse` must be a module-level (picklable) function. With a
+# scraping.http_cache.ResponseCache, cached pages skip the network and the
+# rate limiter entirely.
+#
+# With a scraping.governor.AIMDGovernor, `concurrency` is only the ceiling:
+# the governor decides how many of the workers may have a request out, based
+# on latency, 429/403/503 responses and timeouts, and throttled requests are
+# retried up to `max_retries` times with jittered exponential backoff (or the
+# server's Retry-After, if longer).
+#
+# With a scraping.telemetry.Telemetry, every request's dns/connect/ttfb/total
+# time and bytes, every page's parse time, and every failure's kind are
+# recorded on it.
+class FetchEngine:
+    def __init__(self, parse, concurrency=100, per_host_rate=5.0, per_host_burst=10,
+                 parse_workers=None, headers=None, timeout=10, cache=None, governor=None, max_retries=3, telemetry=None):
+        self.parse = parse
+        self.telemetry = telemetry
+        self.cache = cache
+        self.governor = governor
+        self.max_retries = max_retries
+        self.concurrency = concurrency
+        self.per_host_rate = per_host_rate
+        self.per_host_burst = per_host_burst
+        self.parse_workers = parse_workers
+        self.headers = headers
+        self.timeout = timeout
+        self._buckets = {}
+
+    def _bucket(self, url):
+        host = urlsplit(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.per_host_rate, self.per_host_burst)
+        return bucket
+
+    async def _fetch(self, session, url):
+        """One GET, through the cache if there is one. Returns (body, latency),
+        latency None when the body came from the cache."""
+        start = None
+
+        async def throttle():
+            nonlocal start
+            await self._bucket(url).acquire()
+            start = time.monotonic()
+
+        if self.cache is not None:
+            body = await self.cache.get_async(session, url, throttle=throttle)
+            body = body.decode("utf-8", errors="replace")
+        else:
+            await throttle()
+            async with session.get(url) as response:
+                response.raise_for_status()
+                body = await response.text()
+        latency = time.monotonic() - start if start is not None else None
+        if latency is not None and self.telemetry is not None:
+            self.telemetry.observe("total", latency)
+        return body, latency
+
+    async def _fetch_with_retry(self, session, url):
+        governor = self.governor
+        for attempt in range(self.max_retries + 1):
+            delay = None
+            try:
+                async with governor.async_slot():
+                    body, latency = await self._fetch(session, url)
+            except aiohttp.ClientResponseError as e:
+                if e.status not in THROTTLE_STATUSES or attempt == self.max_retries:
+                    raise
+                delay = parse_retry_after((e.headers or {}).get("Retry-After"))
+                governor.on_throttle(delay)
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+                if attempt == self.max_retries:
+                    raise
+                governor.on_error()
+            else:
+                if latency is not None:
+                    governor.on_success(latency)
+                return body
+            await asyncio.sleep(max(delay or 0, backoff(attempt)))
+
+    async def _worker(self, session, parser, queue, on_result):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            url, context = item
+            telemetry = self.telemetry
+            parsing = False
+            try:
+                if self.governor is not None:
+                    body = await self._fetch_with_retry(session, url)
+                else:
+                    body, _ = await self._fetch(session, url)
+                parsing = True
+                result, parse_time = await loop.run_in_executor(parser, _timed_parse, self.parse, body, url,
+                                                                context)
+            except Exception as e:
+                if telemetry is not None:
+                    telemetry.error(e, parsing)
+                on_result(url, context, None, e)
+            else:
+                if telemetry is not None:
+                    telemetry.observe_parse(parse_time)
+                    telemetry.page_done()
+                on_result(url, context, result, None)
+
+    async def run(self, items, on_result):
+        """Fetch and parse every (url, context) in `items`, calling
+        on_result(url, context, result, error) as each one finishes."""
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        trace_configs = [self.telemetry.trace_config()] if self.telemetry is not None else None
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.parse_workers) as parser:
+            async with aiohttp.ClientSession(connector=connector, headers=self.headers, timeout=timeout,
+                                             trace_configs=trace_configs) as session:
+                workers = [asyncio.create_task(self._worker(session, parser, queue, on_result))
+                           for _ in range(self.concurrency)]
+                for item in items:
+                    await queue.put(item)
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+
+    def crawl(self, items, on_result):
+        asyncio.run(self.run(items, on_result))
@@ -0,0 +1,209 @@
+import html as html_lib
+import re
+from collections import namedtuple
+
+# ---------- Profile Extractors ----------
+# Every profile page is a table of <td class="element-label">/<td
+# class="element-data"> pairs plus the doctor's name in a heading. Each backend
+# pulls out just that:
+#   fields          {label text: value text}, same text as BeautifulSoup's
+#                   get_text(strip=True) / get_text(" ", strip=True)
+#   title_position  text of <h2 id="title-position">, or None
+#   heading         text of the first <h2>, else the first <h1>, or None
+#
+#   bs4         the original BeautifulSoup scan, kept as the reference
+#   lxml        libxml2 parse, default when selectolax is not installed
+#   selectolax  lexbor parse, fastest full parser and the default
+#   regex       no DOM at all, precompiled patterns over the raw HTML; only
+#               for pages laid out like the saved fixtures
+#
+# bench_extract.py checks every backend against bs4 on fixtures/profiles.
+
+Profile = namedtuple("Profile", "fields title_position heading")
+
+
+class MissingHeading(ValueError):
+    """The page has no name heading - usually a block or error page served
+    with a 200, not a profile."""
+    telemetry_kind = "missing_h2"
+
+
+TAG_RE = re.compile(r"<[^>]*>")
+
+
+def _join_text(strings, sep):
+    return sep.join(s for s in (s.strip() for s in strings) if s)
+
+
+# ---------- bs4 ----------
+def extract_bs4(page):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page, "html.parser")
+    fields = {}
+    for tr in soup.find_all('tr'):
+        label = tr.find('td', class_='element-label')
+        value = tr.find('td', class_='element-data')
+        if label and value:
+            fields[label.get_text(strip=True)] = value.get_text(" ", strip=True)
+
+    title_position = soup.find("h2", {"id": "title-position"})
+    heading = soup.find("h2") or soup.find("h1")
+    return Profile(fields,
+                   title_position.get_text(strip=True) if title_position else None,
+                   heading.get_text(strip=True) if heading else None)
+
+
+# ---------- lxml ----------
+def extract_lxml(page):
+    import lxml.html
+
+    root = lxml.html.fromstring(page)
+    fields = {}
+    for tr in root.iter("tr"):
+        label = value = None
+        for td in tr.iter("td"):
+            classes = (td.get("class") or "").split()
+            if label is None and "element-label" in classes:
+                label = td
+            if value is None and "element-data" in classes:
+                value = td
+        if label is not None and value is not None:
+            fields[_join_text(label.itertext(), "")] = _join_text(value.itertext(), " ")
+
+    title_position = root.xpath('(//h2[@id="title-position"])[1]')
+    heading = root.xpath("(//h2)[1]") or root.xpath("(//h1)[1]")
+    return Profile(fields,
+                   _join_text(title_position[0].itertext(), "") if title_position else None,
+                   _join_text(heading[0].itertext(), "") if heading else None)
+
+
+# ---------- selectolax ----------
+def _node_text(node, sep):
+    return _join_text((n.text_content or "" for n in node.traverse(include_text=True) if n.tag == "-text"), sep)
+
+
+def extract_selectolax(page):
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(page)
+    fields = {}
+    for tr in tree.css("tr"):
+        label = tr.css_first("td.element-label")
+        value = tr.css_first("td.element-data")
+        if label is not None and value is not None:
+            fields[_node_text(label, "")] = _node_text(value, " ")
+
+    title_position = tree.css_first("h2#title-position")
+    heading = tree.css_first("h2") or tree.css_first("h1")
+    return Profile(fields,
+                   _node_text(title_position, "") if title_position is not None else None,
+                   _node_text(heading, "") if heading is not None else None)
+
+
+# ---------- regex ----------
+PAIR_RE = re.compile(
+    r'<td[^>]*class="[^"]*\belement-label\b[^"]*"[^>]*>(.*?)</td>\s*'
+    r'<td[^>]*class="[^"]*\belement-data\b[^"]*"[^>]*>(.*?)</td>', re.S)
+TITLE_POSITION_RE = re.compile(r'<h2[^>]*\bid="title-position"[^>]*>(.*?)</h2>', re.S)
+H2_RE = re.compile(r"<h2\b[^>]*>(.*?)</h2>", re.S)
+H1_RE = re.compile(r"<h1\b[^>]*>(.*?)</h1>", re.S)
+
+
+def _fragment_text(fragment, sep):
+    return _join_text((html_lib.unescape(s) for s in TAG_RE.split(fragment)), sep)
+
+
+def extract_regex(page):
+    fields = {_fragment_text(label, ""): _fragment_text(value, " ") for label, value in PAIR_RE.findall(page)}
+    title_position = TITLE_POSITION_RE.search(page)
+    heading = H2_RE.search(page) or H1_RE.search(page)
+    return Profile(fields,
+                   _fragment_text(title_position.group(1), "") if title_position else None,
+                   _fragment_text(heading.group(1), "") if heading else None)
+
+
+BACKENDS = {
+    "bs4": extract_bs4,
+    "lxml": extract_lxml,
+    "selectolax": extract_selectolax,
+    "regex": extract_regex,
+}
+
+
+def available_backends():
+    names = []
+    for name, module in (("bs4", "bs4"), ("lxml", "lxml.html"), ("selectolax", "selectolax.lexbor")):
+        try:
+            __import__(module)
+            names.append(name)
+        except ImportError:
+            pass
+    return names + ["regex"]
+
+
+def get_extractor(name=None):
+    """Backend by name; by default the fastest exact parser that is installed."""
+    if name is None:
+        installed = available_backends()
+        name = next(backend for backend in ("selectolax", "lxml", "bs4", "regex") if backend in installed)
+    return BACKENDS[name]
+
+
+# ---------- Address / Name Splitting ----------
+def address_text(address_raw, sep=" "):
+    """Plain text of an address cell: tags dropped, entities decoded."""
+    return _join_text((html_lib.unescape(s) for s in TAG_RE.split(address_raw)), sep)
+
+
+# The site wraps addresses at odd places ("Fort Walton<br>Beach, FL 32547"),
+# so line breaks say nothing about where the city starts. Instead the
+# "City, ST 12345" locality is anchored at the end, and the city is taken to
+# be the words after the last one that belongs to a street: a street type,
+# a number, a "#unit", or whatever follows Suite/Ste/Unit/Apt.
+Address = namedtuple("Address", "street city state postcode")
+
+LOCALITY_RE = re.compile(
+    r"^(?P<before>.*?),?\s*\b(?P<state>[A-Z]{2})\s+(?P<postcode>\d{5})(?:-\d{4})?(?:\s+United States)?\s*$")
+STREET_WORD_RE = re.compile(
+    r"^(?:#?\d[\w-]*|#\w+|st|street|ave|avenue|dr|drive|rd|road|blvd|boulevard|pkwy|pwky|parkway|ln|lane|way|"
+    r"ct|court|cir|circle|pl|place|hwy|highway|fl|floor|n|s|e|w|ne|nw|se|sw)[.,]*$", re.I)
+UNIT_WORD_RE = re.compile(r"^(?:suite|ste|unit|apt|slot|bldg)\.?$", re.I)
+
+
+def parse_address(address_raw):
+    """Address(street, city, state, postcode) from an address cell, HTML or
+    text. Fields that can't be found are ''; without a locality the whole
+    text is the street."""
+    text = " ".join(address_text(address_raw).split())
+    match = LOCALITY_RE.match(text)
+    if match is None:
+        return Address(text, '', '', '')
+
+    words = match.group("before").rstrip(",").split()
+    city_start = 0
+    for i, word in enumerate(words):
+        if STREET_WORD_RE.match(word) or (i and UNIT_WORD_RE.match(words[i - 1])):
+            city_start = i + 1
+    if city_start == len(words) and words:
+        # nothing after the street words: the last one is the city after all
+        city_start -= 1
+    street = " ".join(words[:city_start]).rstrip(",")
+    city = " ".join(words[city_start:])
+    return Address(street, city, match.group("state"), match.group("postcode"))
+
+
+def split_name_title(name):
+    """title, forename, surname from "First Middle Last  Title" (two spaces
+    before the title) or "First Middle Last, Title"."""
+    if '  ' in name:
+        parts = name.replace(',', ' ').split("  ")
+        title = parts[1]
+        full_name = parts[0].split()
+    else:
+        parts = name.rsplit(',', 1)
+        title = parts[1] if len(parts) > 1 else ''
+        full_name = parts[0].split()
+    forename = " ".join(full_name[:-1]) if len(full_name) > 1 else ""
+    surname = full_name[-1] if full_name else ""
+    return title, forename, surname
@@ -1,8 +1,9 @@
-import pandas as pd
+import atexit
 import concurrent.futures
+import functools
+import itertools
 import time
 import random
-from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
@@ -10,58 +11,54 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 
+from health_info.browser_pool import BrowserPool
+from health_info.profile_extract import MissingHeading, get_extractor, parse_address, split_name_title
+from rate_limit import backoff
+from scraping.governor import AIMDGovernor
+from scraping.http_cache import ResponseCache
+from scraping.links import LinkStream, url_set
+from scraping.records import DoctorRecord
+from scraping.sink import RecordSink, open_sink
+from scraping.telemetry import Telemetry
+
 # ---------- CONFIG ----------
 CHROMEDRIVER_PATH = "/usr/local/bin/chromedriver"
-MAX_WORKERS = 3
 REQUEST_DELAY = (1, 3)
 MAX_RETRIES = 2
 
-# ---------- Load CSV ----------
-df = pd.read_csv("doctor_links.csv", header=None, names=["State", "DoctorProfileURL"]).drop_duplicates(
-    subset="DoctorProfileURL")
-print(f"Total profiles to scrape: {len(df)}")
-
-results = []
-errors = []
-
-
-# ---------- Address Parser (Simplified since we have state) ----------
-def parse_address(address_raw):
-    if not address_raw:
-        return '', '', ''
-
-    # Clean HTML and normalize
-    soup = BeautifulSoup(address_raw.replace("<br>", "\n").replace("<br/>", "\n"), "html.parser")
-    address_text = soup.get_text("\n", strip=True)
-    lines = [line.strip() for line in address_text.split('\n') if line.strip()]
-
-    street = ''
-    city = ''
-    postcode = ''
-
-    try:
-        if lines:
-            street = lines[0]
-
-            # Last line typically contains city and postcode
-            if len(lines) > 1:
-                last_line = lines[-1]
-
-                # Handle cases like "Birmingham, AL 35205" or "Birmingham 35205"
-                if ',' in last_line:
-                    city_part, postcode_part = last_line.rsplit(',', 1)
-                    city = city_part.strip()
-                    # Extract just the postcode (5 digits)
-                    postcode = ''.join(filter(str.isdigit, postcode_part))[:5]
-                else:
-                    # Try to extract postcode from end (5 digits)
-                    postcode = ''.join(filter(str.isdigit, last_line))[-5:]
-                    city = last_line.replace(postcode, '').strip().rstrip(',')
-
-    except Exception as e:
-        print(f"Address parsing error: {e}")
-
-    return street, city, postcode
+# Browsers loading pages at once: starts at INITIAL_WORKERS and is adjusted
+# between 1 and MAX_WORKERS by the AIMD governor - up while pages load within
+# LATENCY_TARGET seconds, down when loads time out or crawl
+MAX_WORKERS = 8
+INITIAL_WORKERS = 2
+LATENCY_TARGET = 15.0
+POOL_SIZE = MAX_WORKERS
+PAGES_PER_BROWSER = 50
+
+# Rendered pages are cached on disk between runs; OFFLINE replays from the cache only
+OFFLINE = False
+
+# Records are appended to these as they finish; with RESUME a rerun skips every
+# URL already in either file instead of starting over. A .parquet/.arrow output
+# is a directory of columnar parts, .csv/.jsonl a single file
+OUTPUT_PATH = "doctors_details.parquet"
+ERRORS_PATH = "scraping_errors.csv"
+RESUME = True
+
+# Links are read and deduplicated a chunk at a time, and only a couple of
+# profiles per worker are queued at once; "bloom" keeps dedup memory fixed
+# however long the file, "set" is exact
+LINKS_PATH = "doctor_links.csv"
+LINK_DEDUP = "bloom"
+
+# Live Prometheus metrics on http://127.0.0.1:METRICS_PORT/metrics (None to
+# turn off); a JSON summary is written to TELEMETRY_PATH when the run ends
+METRICS_PORT = 9465
+TELEMETRY_PATH = "doctors_telemetry.json"
+
+# Page parser backend (see profile_extract.py); None picks the fastest installed
+EXTRACTOR = None
+extract = get_extractor(EXTRACTOR)
 
 
 # ---------- Create Browser Instance ----------
@@ -80,178 +77,156 @@ def create_browser():
     return driver
 
 
-# ---------- Profile Scraper ----------
-def scrape_profile(row):
-    url = row["DoctorProfileURL"]
-    state = row["State"]  # Using the state from CSV
+def save_screenshot(driver):
+    try:
+        screenshot_path = f"error_{int(time.time())}.png"
+        driver.save_screenshot(screenshot_path)
+        print(f"Screenshot saved: {screenshot_path}")
+    except:
+        pass
 
+
+# ---------- Page Render ----------
+# Only called on a cache miss, so cached pages skip the delay and the browser
+def render_page(url, pool, governor, telemetry):
     time.sleep(random.uniform(*REQUEST_DELAY))
-    driver = None
 
-    for attempt in range(MAX_RETRIES):
+    # a driver that raises in here is quit and replaced by the pool; a browser
+    # never sees the status code, so a block page shows up as a wait timeout
+    with governor.slot(), pool.lease() as driver:
+        start = time.monotonic()
         try:
-            driver = create_browser()
             driver.get(url)
 
             WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, "td.element-data"))
             )
+            page_source = driver.page_source
+        except Exception:
+            governor.on_error()
+            save_screenshot(driver)
+            raise
+        latency = time.monotonic() - start
+        governor.on_success(latency)
+        telemetry.observe("total", latency)
+        telemetry.add_bytes(len(page_source.encode("utf-8")))
+        return page_source
+
 
-            soup = BeautifulSoup(driver.page_source, "html.parser")
+# ---------- Profile Scraper ----------
+# `cache`, `pool`, `governor` and `telemetry` are built by the caller (see
+# __main__), so importing this module opens nothing.
+def scrape_profile(link, cache, pool, governor, telemetry):
+    url = link.url
+    state = link.state  # Using the state from CSV
+
+    for attempt in range(MAX_RETRIES):
+        parsing = False
+        try:
+            page_source = cache.render(url, lambda u: render_page(u, pool, governor, telemetry))
+            parsing = True
+            start = time.perf_counter()
+            profile = extract(page_source)
 
             # Parse all data fields
-            data = {}
-            for tr in soup.find_all('tr'):
-                label = tr.find('td', class_='element-label')
-                value = tr.find('td', class_='element-data')
-                if label and value:
-                    key = label.get_text(strip=True)
-                    val = value.get_text(" ", strip=True)
-                    data[key] = val
+            data = profile.fields
 
             # Extract name
-            name_tag = soup.find("h2") or soup.find("h1")
-            if not name_tag:
-                raise ValueError("Could not find name element")
-
-            # working as expected, do not touch
-
-            title = ''
-            full_name = ''
-            forename = ''
-            surname = ''
-            try:
-                name_tag = name_tag.get_text(strip=True)
-                if '  ' in name_tag:
-                    name_text = name_tag.replace(',', ' ').split("  ")
-                    title = name_text[1] if len(name_tag) > 1 else ''
-                    # Handle name components
-                    full_name = name_text[0].split()
-                    forename = " ".join(full_name[:-1]) if len(full_name) > 1 else ""
-                    surname = full_name[-1] if full_name else ""
+            if profile.heading is None:
+                raise MissingHeading(url)
 
-                else:
-                    name_tag = name_tag.rsplit(',', 1)
-                    title = name_tag[1]
-                    full_name = name_text[0].split()
-                    forename = " ".join(full_name[:-1]) if len(full_name) > 1 else ""
-                    surname = full_name[-1] if full_name else ""
-            except Exception as e:
-                print(name_tag)
-                forename = name_tag
-
-
-            # Parse address (using state from CSV)
-            address_raw = data.get("Practice Address", "").strip()
-
-            street = ''
-            city = ''
-            pincode = ''
-            try:
-                if '\n' in address_raw:
-
-                    address_new = address_raw.split('\n')
-                    street = address_new[0]
-                    city_state_info = address_new[1].split(',')
-                    city = city_state_info[0]
-                    pincode = city_state_info[1].split(' ')[1]
-
-                elif ',' in address_raw:
-
-                    address_new = address_raw.rsplit(',', 1)
-                    pincode = address_new[1].split(' ')[1]
-                    for i in reversed(range(len(address_new[0]))):
-                        if i == ' ' or i == '\n':
-                            city = address_new[0][i:]
-                            street = address_new[0][:i]
-
-            except Exception as e:
-                print(e, address_raw)
+            title, forename, surname = split_name_title(profile.heading)
+
+            # Parse address (state from the CSV when the address has none)
+            address = parse_address(data.get("Practice Address", ""))
 
             # Build result
-            result = {
-                "title": title,
-                "forename": forename,
-                "surname": surname,
-
-                "full_address": data.get("Practice Address", ""),
-                "institution": data.get("Practice Name", ""),
-                "department": data.get("Specialty", ""),
-                "street": street,
-                "city": city,
-                "state": state,  # Using the state from CSV
-                "postcode": pincode,
-                "country": "United States",
-                "specialty": data.get("Specialty", ""),
-                "reg_number": "",
-                "tel_1": data.get("Phone", ""),
-                "tel_2": "",
-                "tel_3": "",
-                "fax_1": "",
-                "fax_2": "",
-                "fax_3": "",
-                "mobile": "",
-                "email_1": "",
-                "email_2": "",
-                "language": "",
-                "gender": "",
-                "workplace": data.get("Practice Name", ""),
-                "website": data.get("Website", ""),
-                "source_result_url": url
-            }
+            result = DoctorRecord(
+                title=title,
+                forename=forename,
+                surname=surname,
+                full_address=data.get("Practice Address", ""),
+                institution=data.get("Practice Name", ""),
+                department=data.get("Specialty", ""),
+                street=address.street,
+                city=address.city,
+                state=address.state or state,
+                postcode=address.postcode,
+                specialty=data.get("Specialty", ""),
+                tel_1=data.get("Phone", ""),
+                workplace=data.get("Practice Name", ""),
+                website=data.get("Website", ""),
+                source_result_url=url,
+            )
+            telemetry.observe_parse(time.perf_counter() - start)
+            telemetry.page_done()
 
             return result
 
         except Exception as e:
-            print(f"Attempt {attempt + 1} failed for {url}: {str(e)}")
-            if driver:
-                try:
-                    screenshot_path = f"error_{int(time.time())}.png"
-                    driver.save_screenshot(screenshot_path)
-                    print(f"Screenshot saved: {screenshot_path}")
-                except:
-                    pass
+            kind = telemetry.error(e, parsing)
+            print(f"Attempt {attempt + 1} failed for {url} ({kind}): {str(e)}")
 
             if attempt < MAX_RETRIES - 1:
-                time.sleep(5)
-
-        finally:
-            if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
+                time.sleep(backoff(attempt, base=5))
 
     # If all retries failed
-    errors.append({
-        "url": url,
-        "state": state
-    })
     return None
 
 
 # ---------- Main Execution ----------
 if __name__ == "__main__":
-    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = [executor.submit(scrape_profile, row) for _, row in df.iterrows()]
-
-        for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
-            result = future.result()
-            if result:
-                results.append(result)
-            if i % 10 == 0:
-                print(f"Processed {i} profiles...")
-                time.sleep(5)
-
-    # ---------- Save Results ----------
-    if results:
-        output_df = pd.DataFrame(results)
-        output_df.to_csv("doctors_details.csv", index=False)
-        print(f"✅ Successfully saved {len(results)} profiles.")
-
-    if errors:
-        error_df = pd.DataFrame(errors)
-        error_df.to_csv("scraping_errors.csv", index=False)
-        print(f"⚠️ Encountered {len(errors)} errors. Saved to scraping_errors.csv.")
+    # drivers are started on first lease, not here
+    pool = BrowserPool(create_browser, size=POOL_SIZE, max_pages=PAGES_PER_BROWSER)
+    cache = ResponseCache(offline=OFFLINE)
+    governor = AIMDGovernor(initial=INITIAL_WORKERS, maximum=MAX_WORKERS, latency_target=LATENCY_TARGET)
+    telemetry = Telemetry("scrape_doctor")
+    scrape = functools.partial(scrape_profile, cache=cache, pool=pool, governor=governor, telemetry=telemetry)
+
+    output = open_sink(OUTPUT_PATH, key="source_result_url", resume=RESUME)
+    error_output = RecordSink(ERRORS_PATH, fieldnames=["url", "state"], key="url", resume=RESUME)
+    skip = output.done | error_output.done
+    if skip:
+        print(f"Resuming: {len(skip)} already done")
+    links = LinkStream(LINKS_PATH, seen=url_set(LINK_DEDUP), skip=skip)
+    pending_links = iter(links)
+    atexit.register(telemetry.write_summary, TELEMETRY_PATH)
+    if METRICS_PORT is not None:
+        print(f"Metrics on http://127.0.0.1:{telemetry.serve(METRICS_PORT)}/metrics")
+
+    with pool, output, error_output, concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {}
+        processed = 0
+        while True:
+            for link in itertools.islice(pending_links, MAX_WORKERS * 2 - len(futures)):
+                futures[executor.submit(scrape, link)] = link
+            if not futures:
+                break
+
+            finished, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                link = futures.pop(future)
+                result = future.result()
+                if result:
+                    output.write(result)
+                else:
+                    error_output.write({"url": link.url, "state": link.state})
+                processed += 1
+                if processed % 10 == 0:
+                    print(f"Processed {processed} profiles... ({int(governor.limit)} browsers at once) - "
+                          f"{telemetry.report()}")
+    print(links.report())
+    print(governor.report())
+    print(f"Browsers started: {pool.created}, recycled: {pool.recycled}")
+    cache.close()
+    print(cache.report())
+    print(telemetry.report())
+
+    # ---------- Summary ----------
+    if output.written:
+        print(f"✅ Successfully saved {output.written} profiles to {OUTPUT_PATH}.")
+
+    if error_output.written:
+        print(f"⚠️ Encountered {error_output.written} errors. Saved to {ERRORS_PATH}.")
 
     print("🎉 Scraping complete.")
@@ -1,18 +1,49 @@
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-import concurrent.futures
-import time
-import random
-
-# Load URLs from CSV (no headers)
-df = pd.read_csv("doctor_links.csv", header=None, names=["State", "DoctorProfileURL"]).drop_duplicates(
-    subset="DoctorProfileURL")
-
-print(f"Actual length: {len(df)}")
-
-# For storing extracted doctor data
-results = []
+import atexit
+
+from health_info.fetch_engine import FetchEngine
+from health_info.profile_extract import MissingHeading, address_text, get_extractor, parse_address
+from scraping.governor import AIMDGovernor
+from scraping.http_cache import ResponseCache
+from scraping.links import LinkStream, url_set
+from scraping.records import DoctorRecord
+from scraping.sink import RecordSink, open_sink
+from scraping.telemetry import Telemetry
+
+# Extracted doctor data is appended here as pages finish; with RESUME a rerun
+# skips every URL already in the output or the errors file. A .parquet/.arrow
+# output is a directory of columnar parts, .csv/.jsonl a single file
+OUTPUT_PATH = "scraped_doctor_details.parquet"
+ERRORS_PATH = "scraped_doctor_errors.csv"
+RESUME = True
+
+# Links are read and deduplicated a chunk at a time as the workers need them;
+# "bloom" keeps dedup memory fixed however long the file, "set" is exact
+LINKS_PATH = "doctor_links.csv"
+LINK_DEDUP = "bloom"
+
+# Requests in flight start at INITIAL_CONCURRENCY and are adjusted between
+# 1 and CONCURRENCY by the AIMD governor: up while responses come back fast,
+# down on 429/403/timeouts. The per-host request rate replaces the old random
+# 0.5-1.5s sleep in every worker
+CONCURRENCY = 100
+INITIAL_CONCURRENCY = 10
+LATENCY_TARGET = 5.0
+MAX_RETRIES = 3
+PER_HOST_RATE = 10
+PER_HOST_BURST = 20
+
+# Pages are cached on disk between runs; OFFLINE replays from the cache only
+OFFLINE = False
+
+# Live Prometheus metrics on http://127.0.0.1:METRICS_PORT/metrics (None to
+# turn off); a JSON summary is written to TELEMETRY_PATH when the run ends
+METRICS_PORT = 9464
+TELEMETRY_PATH = "scraped_doctor_telemetry.json"
+PROGRESS_EVERY = 100
+
+# Page parser backend (see profile_extract.py); None picks the fastest installed
+EXTRACTOR = None
+extract = get_extractor(EXTRACTOR)
 
 # Common headers to avoid 403 Forbidden
 HEADERS = {
@@ -24,90 +55,77 @@ HEADERS = {
 }
 
 
-def scrape_profile(row):
-    url = row["DoctorProfileURL"]
-    state = row["State"]
-
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        data = {}
-        for tr in soup.find_all('tr'):
-            label = tr.find('td', class_='element-label')
-            value = tr.find('td', class_='element-data')
-            if label and value:
-                key = label.get_text(strip=True)
-                val = value.get_text(" ", strip=True)
-                data[key] = val
-
-        name_tag = soup.find("h2", {"id": "title-position"})
-        if not name_tag:
-            return None
-
-        full_name = name_tag.get_text(strip=True)
-        doctor_name = full_name.split()
-        if len(doctor_name) < 3:
-            return None
-
-        address_raw = data.get("Practice Address", "")
-        address_cleaned = BeautifulSoup(address_raw.replace("<br>", " "), "html.parser").get_text(" ", strip=True)
-        address_parts = address_cleaned.split()
-
-        street = " ".join(address_parts[:-3]) if len(address_parts) >= 3 else ""
-        city = address_parts[-3] if len(address_parts) >= 3 else ""
-        state_postcode = address_parts[-2] if len(address_parts) >= 2 else ""
-        postcode = address_parts[-1] if len(address_parts) >= 1 else ""
-        state_from_addr = state_postcode.split()[0] if state_postcode else ""
-
-        # Optional random delay (politeness)
-        time.sleep(random.uniform(0.5, 1.5))
-
-        return {
-            "title": doctor_name[-1],
-            "forename": " ".join(doctor_name[0:-2]),
-            "surname": doctor_name[-2],
-            "institution": data.get("Practice Name", ""),
-            "department": data.get("Specialty", ""),
-            "street": street,
-            "city": city,
-            "state": state_from_addr or state,
-            "postcode": postcode,
-            "country": "United States",
-            "specialty": data.get("Specialty", ""),
-            "reg_number": "",
-            "tel_1": data.get("Phone", ""),
-            "tel_2": "",
-            "tel_3": "",
-            "fax_1": "",
-            "fax_2": "",
-            "fax_3": "",
-            "mobile": "",
-            "email_1": "",
-            "email_2": "",
-            "language": "",
-            "gender": "",
-            "workplace": data.get("Practice Name", ""),
-            "website": data.get("Website", ""),
-            "source_result_url": url
-        }
-
-    except Exception as e:
-        print(f"Error scraping {url}: {e}")
+# Runs in the fetch engine's process pool, so it gets the page body rather than
+# fetching it; fetch errors are reported by the engine.
+def parse_profile(html, url, state):
+    profile = extract(html)
+    data = profile.fields
+
+    full_name = profile.title_position
+    if full_name is None:
+        raise MissingHeading(url)
+
+    doctor_name = full_name.split()
+    if len(doctor_name) < 3:
         return None
 
+    address = " ".join(address_text(data.get("Practice Address", "")).split())
+    street, city, state_from_addr, postcode = parse_address(address)
+
+    return DoctorRecord(
+        title=doctor_name[-1],
+        forename=" ".join(doctor_name[0:-2]),
+        surname=doctor_name[-2],
+        full_address=address,
+        institution=data.get("Practice Name", ""),
+        department=data.get("Specialty", ""),
+        street=street,
+        city=city,
+        state=state_from_addr or state,
+        postcode=postcode,
+        specialty=data.get("Specialty", ""),
+        tel_1=data.get("Phone", ""),
+        workplace=data.get("Practice Name", ""),
+        website=data.get("Website", ""),
+        source_result_url=url,
+    )
 
-# Multithreading execution
-with concurrent.futures.ThreadPoolExecutor(max_workers=1000) as executor:
-    futures = [executor.submit(scrape_profile, row) for _, row in df.iterrows()]
-    for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
-        result = future.result()
-        if result:
-            results.append(result)
-        print(f"Processed {i}/{len(futures)}")
 
-# Save to CSV
-output_df = pd.DataFrame(results)
-output_df.to_csv("scraped_doctor_details.csv", index=False)
-print("Scraping complete. Saved to scraped_doctor_details.csv")
+def on_result(url, state, result, error):
+    global processed
+    processed += 1
+    if error is not None:
+        print(f"Error scraping {url}: {type(error).__name__} {error}")
+        error_output.write({"url": url, "state": state})
+    elif result:
+        output.write(result)
+    if processed % PROGRESS_EVERY == 0:
+        print(f"Processed {processed} ({links.rows} links read) - {telemetry.report()}")
+
+
+if __name__ == "__main__":
+    output = open_sink(OUTPUT_PATH, key="source_result_url", resume=RESUME)
+    error_output = RecordSink(ERRORS_PATH, fieldnames=["url", "state"], key="url", resume=RESUME)
+    skip = output.done | error_output.done
+    if skip:
+        print(f"Resuming: {len(skip)} already done")
+    links = LinkStream(LINKS_PATH, seen=url_set(LINK_DEDUP), skip=skip)
+    processed = 0
+
+    telemetry = Telemetry("state")
+    atexit.register(telemetry.write_summary, TELEMETRY_PATH)
+    if METRICS_PORT is not None:
+        print(f"Metrics on http://127.0.0.1:{telemetry.serve(METRICS_PORT)}/metrics")
+
+    cache = ResponseCache(offline=OFFLINE)
+    governor = AIMDGovernor(initial=INITIAL_CONCURRENCY, maximum=CONCURRENCY, latency_target=LATENCY_TARGET)
+    engine = FetchEngine(parse_profile, concurrency=CONCURRENCY, per_host_rate=PER_HOST_RATE,
+                         per_host_burst=PER_HOST_BURST, headers=HEADERS, cache=cache, governor=governor,
+                         max_retries=MAX_RETRIES, telemetry=telemetry)
+    with output, error_output:
+        engine.crawl(((link.url, link.state) for link in links), on_result)
+    print(links.report())
+    print(governor.report())
+    print(cache.report())
+    print(telemetry.report())
+    print(f"Scraping complete. Saved {output.written} profiles to {OUTPUT_PATH}")
@@ -0,0 +1,89 @@
+import concurrent.futures
+import threading
+
+import pytest
+
+from health_info.browser_pool import BrowserPool
+
+
+class FakeDriver:
+    """Stands in for a webdriver: answers the health check until broken."""
+
+    def __init__(self, alive):
+        self.alive = alive
+        self.healthy = True
+        self.quit_called = False
+        alive.append(self)
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise RuntimeError("browser gone")
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+        self.alive.remove(self)
+
+
+def fake_pool(**options):
+    alive = []
+    return BrowserPool(lambda: FakeDriver(alive), **options), alive
+
+
+def test_concurrency_bounded_by_size():
+    pool, alive = fake_pool(size=2, max_pages=5, lease_timeout=0.05)
+    with pool.lease() as first, pool.lease() as second:
+        assert first is not second
+        with pytest.raises(TimeoutError):
+            with pool.lease():
+                pass
+
+    pool.lease_timeout = None
+    most = 0
+    lock = threading.Lock()
+
+    def page(_):
+        nonlocal most
+        with pool.lease():
+            with lock:
+                most = max(most, len(alive))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(page, range(40)))
+    assert most <= 2 and len(alive) <= 2
+    pool.close()
+    assert not alive
+
+
+def test_recycled_after_max_pages():
+    pool, alive = fake_pool(size=1, max_pages=3)
+    drivers = []
+    for _ in range(7):
+        with pool.lease() as driver:
+            drivers.append(driver)
+    # pages 1-3, 4-6 and 7 each on their own browser
+    assert drivers[0] is drivers[2] and drivers[3] is drivers[5] and drivers[6] is not drivers[5]
+    assert drivers[0].quit_called and drivers[3].quit_called and alive == [drivers[6]]
+    assert pool.created == 3 and pool.recycled == 2
+
+
+def test_failed_page_replaces_browser():
+    pool, alive = fake_pool(size=1, max_pages=50)
+    with pytest.raises(ValueError):
+        with pool.lease() as failed:
+            raise ValueError("page broke")
+    assert failed.quit_called
+    with pool.lease() as driver:
+        assert driver is not failed
+    assert pool.created == 2 and pool.recycled == 1
+
+
+def test_unhealthy_browser_evicted():
+    pool, alive = fake_pool(size=2, max_pages=50)
+    with pool.lease() as broken:
+        pass
+    broken.healthy = False
+    with pool.lease() as driver:
+        assert driver is not broken
+    assert broken.quit_called and alive == [driver]
+    assert pool.created == 2 and pool.recycled == 1
@@ -1,12 +1,11 @@
-import random
-import time
 import pygame
 
-WIDTH, HEIGHT = 1000, 800
-
-WIN = pygame.display.set_mode((WIDTH, HEIGHT))
+from dodge_profiler import FrameProfiler, ProfilerOverlay
+from dodge_render import DirtyRectRenderer
+from dodge_replay import new_recorded_sim
+from dodge_sim import FixedStepRunner, SimConfig
 
-pygame.display.set_caption("Space Dodge")
+WIDTH, HEIGHT = 1000, 800
 
 PLAYER_HEIGHT, PLAYER_WIDTH = 40, 60
 
@@ -15,9 +14,30 @@ STAR_WIDTH = 30
 STAR_HEIGHT = 40
 STAR_VEL = 5
 
-pygame.font.init()
+# redraw only what changed each frame instead of the whole window
+DIRTY_RECTS = True
+
+# every run is recorded here; replay it with `python dodge_replay.py last_run.sdr`
+REPLAY_PATH = "last_run.sdr"
+
+# per-phase frame timing; F3 toggles the on-screen p50/p95/p99 overlay and
+# PROFILE_TRACE (if set) gets every frame at exit - CSV for a .csv path,
+# Chrome trace-event JSON otherwise
+PROFILE = False
+PROFILE_TRACE = None
+
+# the window and font are created in setup_window() so the game logic can be
+# imported (and simulated) without a display
+WIN = None
+FONT = None
 
-FONT = pygame.font.SysFont("comicsans", 30)
+
+def setup_window():
+    global WIN, FONT
+    WIN = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Space Dodge")
+    pygame.font.init()
+    FONT = pygame.font.SysFont("comicsans", 30)
 
 
 # No need for try-except block for background anymore
@@ -37,72 +57,67 @@ def draw(player, elapsed_time, stars):
     pygame.display.update()
 
 
+def draw_sim(sim):
+    draw(sim.player, sim.elapsed_time, sim.stars)
+
+
 def main():
+    setup_window()
     run = True
 
-    player = pygame.Rect(WIDTH // 2 - PLAYER_WIDTH // 2, HEIGHT - PLAYER_HEIGHT - 10,
-                         PLAYER_WIDTH, PLAYER_HEIGHT)
+    config = SimConfig(WIDTH, HEIGHT, PLAYER_WIDTH, PLAYER_HEIGHT, PLAYER_VEL,
+                       STAR_WIDTH, STAR_HEIGHT, STAR_VEL)
+    sim = new_recorded_sim(config)
+    if DIRTY_RECTS:
+        renderer = DirtyRectRenderer(WIN, FONT, BG_COLOR)
+        observer = lambda state: renderer.draw(state.player, state.elapsed_time, state.stars)
+    else:
+        observer = draw_sim
+
+    profiler = FrameProfiler(enabled=PROFILE, trace=PROFILE_TRACE is not None)
+    overlay = ProfilerOverlay(profiler, pygame.font.SysFont("monospace", 16), bg_color=BG_COLOR)
+    if PROFILE:
+        sim.profiler = profiler
+
+    def draw_frame(state):
+        observer(state)
+        overlay.draw(WIN)
+        profiler.lap("draw")
+
+    runner = FixedStepRunner(sim, observers=[draw_frame])
     clock = pygame.time.Clock()
-    start_time = time.time()
-    elapsed_time = 0
-
-    star_add_increment = 2000
-    star_count = 0
-
-    stars = []
-    hit = False
 
     while run:
-        star_count += clock.tick(60)
-        elapsed_time = time.time() - start_time
-
-        if star_count > star_add_increment:
-
-            star_x = random.randint(0, WIDTH - STAR_WIDTH)
-            star = (pygame.rect
-
-
-                    (star_x, -STAR_HEIGHT,
-                               STAR_WIDTH, STAR_HEIGHT))
-            stars.append(star)
-
-            star_add_increment = max(500, star_add_increment - 100)
-            star_count = 0
+        clock.tick(60)
+        profiler.begin_frame()
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 run = False
                 break
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3 and PROFILE:
+                overlay.toggle(WIN)
+        profiler.lap("events")
 
         keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT] and player.x - PLAYER_VEL >= 0:
-            player.x -= PLAYER_VEL
-        if keys[pygame.K_RIGHT] and player.x + PLAYER_VEL + player.width <= WIDTH:
-            player.x += PLAYER_VEL
-
-        for star in stars[:]:
-            star.y += STAR_VEL
-            if star.y > HEIGHT:
-                stars.remove(star)
-            elif star.colliderect(player):
-                hit = True
-                break
+        profiler.lap("input")
+        runner.advance(keys[pygame.K_LEFT], keys[pygame.K_RIGHT])
+        profiler.end_frame()
 
-        if hit:
+        if sim.hit:
             lost_text = FONT.render("You Lost!", 1, "white")
             WIN.blit(lost_text, (WIDTH/2 - lost_text.get_width()/2, HEIGHT/2 - lost_text.get_height()/2))
             pygame.display.update()
             pygame.time.delay(4000)
             break
 
-        draw(player, elapsed_time, stars)
-
+    sim.recorder.finish(sim).save(REPLAY_PATH)
+    if PROFILE_TRACE and PROFILE_TRACE.endswith(".csv"):
+        profiler.export_csv(PROFILE_TRACE)
+    elif PROFILE_TRACE:
+        profiler.export_chrome_trace(PROFILE_TRACE)
     pygame.quit()
 
 
 if __name__ == "__main__":
     main()
-
-
-
-
@@ -0,0 +1,56 @@
+# Client-side rate limiting and retry timing, shared by the scrapers
+# (health_info.fetch_engine, scraping.governor) and the exchange clients
+# (coinswitch).
+#
+#   bucket = TokenBucket(rate=5.0, capacity=10)   # 5/s on average, bursts of 10
+#   await bucket.acquire()
+#   await asyncio.sleep(max(parse_retry_after(header) or 0, backoff(attempt)))
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date),
+    or None if missing or unparseable."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+# ---------- Token Bucket ----------
+# `rate` requests per second on average, bursts up to `capacity`. A capacity
+# below 1 could never hold a whole token, so it is raised to 1. Only ever
+# touched from the event loop thread, so no locking.
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
@@ -0,0 +1,169 @@
+import glob
+import os
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from scraping.records import DICTIONARY_FIELDS, FIELDS
+
+
+def arrow_schema(fieldnames=FIELDS, dictionary_fields=DICTIONARY_FIELDS):
+    return pa.schema([
+        pa.field(name, pa.dictionary(pa.int32(), pa.string()) if name in dictionary_fields else pa.string())
+        for name in fieldnames
+    ])
+
+
+def _fsync_dir(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _part_number(part):
+    return int(os.path.basename(part).split("-", 1)[1].split(".", 1)[0])
+
+
+def _readable(part):
+    """Whether a part file's footer and schema can be read."""
+    try:
+        if part.endswith(".parquet"):
+            pq.read_metadata(part)
+        else:
+            pa.ipc.open_file(pa.memory_map(part)).schema
+    except (OSError, pa.ArrowInvalid):
+        return False
+    return True
+
+
+# ---------- Columnar Sink ----------
+# Same interface as scraping.sink.RecordSink, but `path` is a directory of
+# Parquet (path ending in .parquet) or Arrow IPC (.arrow) part files. Records
+# are buffered column by column and every checkpoint writes the buffer out as
+# one new part (written to a temp name, then renamed), so the parts on disk
+# are always complete and a crash only loses the unflushed buffer. The temp
+# file is fsync'd before the rename and the directory after it, so a part is
+# never renamed into place ahead of its data. Repeated fields
+# (DICTIONARY_FIELDS) are dictionary-encoded.
+#
+# On resume only the `key` column is read back from the existing parts to
+# fill `done`; a part that can't be read (left by a crash or a full disk) is
+# deleted and its records scraped again. Not thread-safe: write from one
+# thread.
+class ColumnarSink:
+    def __init__(self, path, fieldnames=None, key=None, resume=True, checkpoint_every=5000,
+                 checkpoint_interval=60.0, dictionary_fields=DICTIONARY_FIELDS):
+        self.path = path
+        self.fieldnames = tuple(fieldnames or FIELDS)
+        self.parquet = path.endswith(".parquet")
+        self.extension = ".parquet" if self.parquet else ".arrow"
+        self.schema = arrow_schema(self.fieldnames, dictionary_fields)
+        self.dictionary_fields = [name for name in self.fieldnames if name in dictionary_fields]
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+
+        os.makedirs(path, exist_ok=True)
+        for stale in glob.glob(os.path.join(path, "*.tmp")):
+            os.remove(stale)
+        parts = self._parts()
+        if not resume:
+            for part in parts:
+                os.remove(part)
+            parts = []
+        for part in [p for p in parts if not _readable(p)]:
+            print(f"Dropping unreadable part {part}")
+            os.remove(part)
+            parts.remove(part)
+
+        self.done = set()
+        if key and parts:
+            table = load(path, columns=[key])
+            self.done = set(table.column(key).to_pylist())
+        self._next_part = max((_part_number(part) for part in parts), default=-1) + 1
+
+        self._columns = {name: [] for name in self.fieldnames}
+        self.written = 0
+        self._pending = 0
+        self._last_checkpoint = time.monotonic()
+        self._closed = False
+
+    def _parts(self):
+        return sorted(glob.glob(os.path.join(self.path, "part-*" + self.extension)))
+
+    def write(self, record):
+        values = record.as_dict() if hasattr(record, "as_dict") else record
+        for name, column in self._columns.items():
+            column.append(values.get(name, ""))
+
+        self.written += 1
+        self._pending += 1
+        if self._pending >= self.checkpoint_every or \
+                time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
+
+    def write_frame(self, df):
+        """Write a whole pandas DataFrame as its own part (after any buffered
+        records); missing columns are left empty."""
+        self.checkpoint()
+        if len(df):
+            columns = {name: pa.array(df[name].to_numpy(object) if name in df else [""] * len(df), pa.string())
+                       for name in self.fieldnames}
+            self._write_part(pa.table(columns))
+            self.written += len(df)
+
+    def checkpoint(self):
+        if self._pending:
+            self._write_part(pa.table({name: pa.array(values, pa.string()) for name, values in self._columns.items()}))
+            for column in self._columns.values():
+                column.clear()
+        self._pending = 0
+        self._last_checkpoint = time.monotonic()
+
+    def _write_part(self, table):
+        table = table.cast(self.schema)
+        part = os.path.join(self.path, f"part-{self._next_part:05d}{self.extension}")
+        tmp = part + ".tmp"
+        if self.parquet:
+            pq.write_table(table, tmp, compression="zstd", use_dictionary=self.dictionary_fields)
+        else:
+            with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, self.schema) as writer:
+                writer.write_table(table)
+        with open(tmp, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, part)
+        _fsync_dir(self.path)
+        self._next_part += 1
+
+    def close(self):
+        if not self._closed:
+            self.checkpoint()
+            self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------- Loading ----------
+def load(path, columns=None):
+    """All parts of a ColumnarSink directory (or a single file) as one
+    pyarrow Table. Arrow IPC parts are memory-mapped, so their columns are
+    read without copying."""
+    files = sorted(glob.glob(os.path.join(path, "part-*"))) if os.path.isdir(path) else [path]
+    files = [f for f in files if not f.endswith(".tmp")]
+    tables = []
+    for file in files:
+        if file.endswith(".parquet"):
+            tables.append(pq.read_table(file, columns=columns, memory_map=True))
+        else:
+            table = pa.ipc.open_file(pa.memory_map(file)).read_all()
+            tables.append(table.select(columns) if columns else table)
+    if not tables:
+        table = arrow_schema().empty_table()
+        return table.select(columns) if columns else table
+    return pa.concat_tables(tables)
@@ -0,0 +1,126 @@
+import asyncio
+import collections
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+# Responses that mean "slow down" rather than "this page is broken"
+THROTTLE_STATUSES = frozenset({403, 429, 503})
+
+
+# ---------- AIMD Governor ----------
+# Decides how many requests may be in flight, the way TCP sizes its window:
+#   - every response under `latency_target` adds `increase / limit`, so the
+#     limit grows by about `increase` per round of `limit` requests
+#   - a throttle (429/403/503), a timeout, or a response slower than
+#     `latency_target` multiplies the limit by `decrease`, at most once per
+#     `cooldown` seconds so one burst of rejections counts as one signal
+#   - a Retry-After holds back every new request until it has passed
+#
+# Requests take a slot with `with governor.slot():` from threads or
+# `async with governor.async_slot():` on an event loop (use one or the other
+# per governor), then report the outcome with on_success/on_throttle/on_error.
+class AIMDGovernor:
+    def __init__(self, initial=4, minimum=1, maximum=100, increase=1.0, decrease=0.5, latency_target=5.0,
+                 cooldown=1.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Condition()
+        self._waiters = collections.deque()
+
+        self.successes = 0
+        self.throttled = 0
+        self.errors = 0
+        self.peak_limit = self.limit
+
+    # ---------- Control Law ----------
+    def on_success(self, latency):
+        with self._lock:
+            self.successes += 1
+            if self.latency_target is not None and latency > self.latency_target:
+                self._decrease()
+            else:
+                self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+                self.peak_limit = max(self.peak_limit, self.limit)
+            self._wake()
+
+    def on_throttle(self, retry_after=None):
+        with self._lock:
+            self.throttled += 1
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            self._decrease()
+
+    def on_error(self):
+        """A timeout or dropped connection: back off like a throttle."""
+        with self._lock:
+            self.errors += 1
+            self._decrease()
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown:
+            self.limit = max(self.minimum, self.limit * self.decrease)
+            self._last_decrease = now
+
+    def _ready(self):
+        return self.in_flight < int(self.limit) and time.monotonic() >= self.paused_until
+
+    # ---------- Slots ----------
+    @contextmanager
+    def slot(self):
+        with self._lock:
+            while not self._ready():
+                self._lock.wait(timeout=max(0.05, self.paused_until - time.monotonic()))
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self._lock.notify_all()
+
+    def _wake(self):
+        # called with the lock held
+        self._lock.notify_all()
+        # woken coroutines re-check, so waking one too many is harmless
+        for _ in range(min(len(self._waiters), int(self.limit) - self.in_flight)):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+    @asynccontextmanager
+    async def async_slot(self):
+        loop = asyncio.get_running_loop()
+        while not self._ready():
+            pause = self.paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            with self._lock:
+                self._wake()
+
+    def report(self):
+        return (f"Governor: limit {self.limit:.1f} (peak {self.peak_limit:.1f}), {self.successes} ok, "
+                f"{self.throttled} throttled, {self.errors} errors")
@@ -0,0 +1,218 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DIR = os.path.join(ROOT, ".http_cache")
+DEFAULT_TTL = 7 * 24 * 3600
+
+
+class CacheMiss(LookupError):
+    pass
+
+
+# ---------- URL Normalization ----------
+# Same page, same key: lowercase scheme/host, no default port, no fragment,
+# query parameters sorted.
+def normalize_url(url):
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port is not None and (scheme, port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+class CachedResponse:
+    def __init__(self, url, body, etag, last_modified, fetched_at, ttl):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.ttl = ttl
+
+    @property
+    def fresh(self):
+        return time.time() - self.fetched_at < self.ttl
+
+    @property
+    def text(self):
+        return self.body.decode("utf-8", errors="replace")
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+# ---------- Response Cache ----------
+# Bodies are stored once per distinct content under bodies/ab/<sha256>, and a
+# small sqlite index maps each normalized URL to its body hash plus the
+# ETag/Last-Modified validators and fetch time. Entries younger than `ttl` are
+# served straight from disk; older ones are revalidated with a conditional
+# request. In offline mode nothing goes to the network: any entry, fresh or
+# not, is served and a URL that was never cached raises CacheMiss.
+#
+# Safe to share between threads. Hit/miss counters feed report().
+class ResponseCache:
+    def __init__(self, directory=DEFAULT_DIR, ttl=DEFAULT_TTL, offline=False):
+        self.directory = directory
+        self.ttl = ttl
+        self.offline = offline
+        os.makedirs(os.path.join(directory, "bodies"), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # with WAL, NORMAL only syncs at checkpoints; a power cut can lose the
+        # last few entries, which just means fetching those pages again
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            )""")
+        self._db.commit()
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _body_path(self, body_hash):
+        return os.path.join(self.directory, "bodies", body_hash[:2], body_hash)
+
+    def lookup(self, url):
+        key = normalize_url(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body_hash, etag, last_modified, fetched_at FROM responses WHERE url = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        body_hash, etag, last_modified, fetched_at = row
+        try:
+            with open(self._body_path(body_hash), "rb") as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        return CachedResponse(key, body, etag, last_modified, fetched_at, self.ttl)
+
+    def store(self, url, body, headers=None):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        headers = headers or {}
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self._body_path(body_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (normalize_url(url), body_hash, headers.get("ETag"), headers.get("Last-Modified"), time.time()))
+            self._db.commit()
+            # every stored body is one that had to be downloaded
+            self.misses += 1
+
+    def touch(self, url):
+        """A 304 came back: the cached body is still good for another ttl."""
+        with self._lock:
+            self._db.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), normalize_url(url)))
+            self._db.commit()
+            self.revalidated += 1
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def begin(self, url):
+        """Cache decision before fetching `url`.
+
+        Returns (body, None) when the cached body can be used as is, or
+        (None, entry) when the caller has to fetch - `entry` is the stale
+        cached response to revalidate against, or None if there is none."""
+        entry = self.lookup(url)
+        if entry is not None and (entry.fresh or self.offline):
+            self._count("hits")
+            return entry.body, None
+        if self.offline:
+            self._count("misses")
+            raise CacheMiss(url)
+        return None, entry
+
+    # ---------- Fetch Helpers ----------
+    def get(self, session, url, throttle=None, **kwargs):
+        """requests-style GET through the cache; returns the body as bytes.
+        `throttle()` is called only when the network is actually used."""
+        body, entry = self.begin(url)
+        if body is not None:
+            return body
+        if throttle is not None:
+            throttle()
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry is not None:
+            headers.update(entry.conditional_headers())
+        response = session.get(url, headers=headers, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self.touch(url)
+            return entry.body
+        response.raise_for_status()
+        self.store(url, response.content, response.headers)
+        return response.content
+
+    async def get_async(self, session, url, throttle=None, **kwargs):
+        """aiohttp GET through the cache; returns the body as bytes.
+        `await throttle()` runs only when the network is actually used. The
+        sqlite and body-file work runs in the loop's default executor, so
+        one worker's disk I/O doesn't stall the others."""
+        loop = asyncio.get_running_loop()
+        body, entry = await loop.run_in_executor(None, self.begin, url)
+        if body is not None:
+            return body
+        if throttle is not None:
+            await throttle()
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry is not None:
+            headers.update(entry.conditional_headers())
+        async with session.get(url, headers=headers, **kwargs) as response:
+            if response.status == 304 and entry is not None:
+                await loop.run_in_executor(None, self.touch, url)
+                return entry.body
+            response.raise_for_status()
+            body = await response.read()
+        await loop.run_in_executor(None, self.store, url, body, response.headers)
+        return body
+
+    def render(self, url, render):
+        """For pages fetched through a browser, where there are no validators:
+        serve fresh entries from disk, otherwise call render(url) and store it."""
+        body, _ = self.begin(url)
+        if body is not None:
+            return body.decode("utf-8", errors="replace")
+        html = render(url)
+        self.store(url, html)
+        return html
+
+    def report(self):
+        return f"HTTP cache: {self.hits} hits, {self.revalidated} revalidated (304), {self.misses} misses"
+
+    def close(self):
+        with self._lock:
+            self._db.close()
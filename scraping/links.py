@@ -0,0 +1,122 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+Link = namedtuple("Link", "state url")
+
+# fixed keys so a URL hashes the same in every run and every process
+HASH_KEYS = ("scraping.links.1", "scraping.links.2")
+
+
+def _hashes(urls):
+    """Two independent 64-bit hashes per URL, vectorized over a Series."""
+    return [pd.util.hash_pandas_object(urls, index=False, hash_key=key).to_numpy() for key in HASH_KEYS]
+
+
+# ---------- URL Sets ----------
+# Both take a whole chunk of URLs at once and return a boolean mask of the ones
+# not seen before (first occurrence within the chunk counts as new), adding
+# them as they go.
+#
+#   DigestSet     exact up to 64-bit hash collisions (~1 in 10^12 pairs);
+#                 ~70 bytes per URL instead of the URL string itself
+#   BloomFilter   fixed size whatever the input, sized up front for
+#                 `capacity` URLs at `error_rate` false positives - a false
+#                 positive means a new URL is wrongly skipped. With `path`
+#                 the bits live in a memory-mapped file instead of the heap.
+class DigestSet:
+    def __init__(self):
+        self._seen = set()
+
+    def add_many(self, urls):
+        seen = self._seen
+        new = np.zeros(len(urls), dtype=bool)
+        for i, digest in enumerate(_hashes(urls)[0].tolist()):
+            if digest not in seen:
+                seen.add(digest)
+                new[i] = True
+        return new
+
+    def __len__(self):
+        return len(self._seen)
+
+
+class BloomFilter:
+    def __init__(self, capacity=10_000_000, error_rate=1e-7, path=None):
+        bits = int(-capacity * np.log(error_rate) / np.log(2) ** 2)
+        self.size = (bits + 7) // 8 * 8
+        self.hashes = max(1, round(self.size / capacity * np.log(2)))
+        if path is None:
+            self._bits = np.zeros(self.size // 8, dtype=np.uint8)
+        else:
+            self._bits = np.memmap(path, dtype=np.uint8, mode="w+", shape=(self.size // 8,))
+        self._count = 0
+
+    @staticmethod
+    def _mask(positions):
+        return np.left_shift(np.uint8(1), (positions & np.uint64(7)).astype(np.uint8))
+
+    def add_many(self, urls):
+        # exact dedup inside the chunk first, so the filter only has to answer
+        # for URLs from earlier chunks
+        first = ~urls.duplicated().to_numpy()
+        h1, h2 = _hashes(urls[first])
+        steps = np.arange(self.hashes, dtype=np.uint64)
+        positions = (h1[:, None] + steps * (h2[:, None] | np.uint64(1))) % np.uint64(self.size)
+
+        fresh = ~np.all(self._bits[positions >> np.uint64(3)] & self._mask(positions), axis=1)
+
+        # several new bits can land in the same byte, so combine them per byte
+        # with reduceat before OR-ing them in (much faster than np.bitwise_or.at)
+        positions = np.sort(positions[fresh], axis=None)
+        if len(positions):
+            byte = positions >> np.uint64(3)
+            starts = np.flatnonzero(np.r_[True, byte[1:] != byte[:-1]])
+            self._bits[byte[starts]] |= np.bitwise_or.reduceat(self._mask(positions), starts)
+        self._count += int(fresh.sum())
+
+        new = np.zeros(len(urls), dtype=bool)
+        new[np.flatnonzero(first)[fresh]] = True
+        return new
+
+    def __len__(self):
+        return self._count
+
+
+def url_set(kind="bloom", **kwargs):
+    return BloomFilter(**kwargs) if kind == "bloom" else DigestSet()
+
+
+# ---------- Link Stream ----------
+# Reads a "state,url" link file (no header) in chunks of `chunk_size` rows and
+# yields each Link the first time its URL appears, so scraping starts after the
+# first chunk instead of after the whole file is loaded and deduplicated.
+# URLs passed in `skip` (e.g. RecordSink.done on resume) are never yielded.
+# Feed it straight into a bounded queue / bounded set of futures: the file is
+# only read as fast as the workers drain it.
+class LinkStream:
+    def __init__(self, path, seen=None, chunk_size=20_000, skip=()):
+        self.path = path
+        self.seen = seen if seen is not None else url_set()
+        self.chunk_size = chunk_size
+
+        self.rows = 0
+        self.duplicates = 0
+        if skip:
+            self.seen.add_many(pd.Series(list(skip), dtype=object))
+
+    def __iter__(self):
+        chunks = pd.read_csv(self.path, header=None, names=["State", "DoctorProfileURL"], dtype=str,
+                             chunksize=self.chunk_size)
+        for chunk in chunks:
+            chunk = chunk.dropna(subset=["DoctorProfileURL"])
+            new = self.seen.add_many(chunk["DoctorProfileURL"])
+            self.rows += len(chunk)
+            self.duplicates += len(chunk) - int(new.sum())
+            chunk = chunk[new]
+            for state, url in zip(chunk["State"].tolist(), chunk["DoctorProfileURL"].tolist()):
+                yield Link(state, url)
+
+    def report(self):
+        return f"Links: {self.rows} read, {self.duplicates} duplicate or already done"
@@ -0,0 +1,49 @@
+from dataclasses import dataclass, fields
+
+
+# ---------- Doctor Record ----------
+# The one record every scraper produces. Slotted, so a record is a fixed
+# array of references (~290 bytes) instead of a 27-entry dict (~1.3 KB), and
+# the many empty fields all point at the same "" object.
+@dataclass(slots=True)
+class DoctorRecord:
+    title: str = ""
+    forename: str = ""
+    surname: str = ""
+    full_address: str = ""
+    institution: str = ""
+    department: str = ""
+    street: str = ""
+    city: str = ""
+    state: str = ""
+    postcode: str = ""
+    country: str = "United States"
+    specialty: str = ""
+    reg_number: str = ""
+    tel_1: str = ""
+    tel_2: str = ""
+    tel_3: str = ""
+    fax_1: str = ""
+    fax_2: str = ""
+    fax_3: str = ""
+    mobile: str = ""
+    email_1: str = ""
+    email_2: str = ""
+    language: str = ""
+    gender: str = ""
+    workplace: str = ""
+    website: str = ""
+    source_result_url: str = ""
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in FIELDS}
+
+    def values(self):
+        return [getattr(self, name) for name in FIELDS]
+
+
+FIELDS = tuple(field.name for field in fields(DoctorRecord))
+
+# Columns with few distinct values, stored dictionary-encoded in columnar output
+DICTIONARY_FIELDS = ("title", "institution", "department", "city", "state", "country", "specialty",
+                     "language", "gender", "workplace")
@@ -0,0 +1,133 @@
+import csv
+import json
+import os
+import time
+
+
+# ---------- Record Sink ----------
+# Append-only output for scraped records, written as they come in instead of
+# collected and saved at the end. `.jsonl` paths get one JSON object per line,
+# anything else is CSV (header taken from `fieldnames` or the first record).
+#
+# Every `checkpoint_every` records or `checkpoint_interval` seconds the file is
+# flushed and fsync'd and its byte offset is written to <path>.ckpt. On
+# resume the file is cut back to the last checkpoint, so a crash mid-write
+# never leaves a torn record, and the values of the `key` column already in
+# the file are loaded into `done` so the caller can skip them.
+#
+# Records can be dicts or scraping.records.DoctorRecord; write_frame() takes a
+# whole pandas DataFrame at once (batch jobs such as health_info.clean).
+#
+# Not thread-safe: write from one thread (the one collecting results).
+class RecordSink:
+    def __init__(self, path, fieldnames=None, key=None, resume=True, checkpoint_every=100,
+                 checkpoint_interval=5.0):
+        self.path = path
+        self.checkpoint_path = path + ".ckpt"
+        self.fieldnames = fieldnames
+        self.jsonl = path.endswith(".jsonl")
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+
+        self.done = set()
+        if resume and os.path.exists(path):
+            self._recover()
+            if key:
+                self.done = set(self._read_column(key))
+        else:
+            for stale in (path, self.checkpoint_path):
+                if os.path.exists(stale):
+                    os.remove(stale)
+
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._writer = None
+        self.written = 0
+        self._pending = 0
+        self._last_checkpoint = time.monotonic()
+
+    def _recover(self):
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                offset = json.load(f)["offset"]
+            if os.path.getsize(self.path) > offset:
+                os.truncate(self.path, offset)
+
+    def _read_column(self, key):
+        with open(self.path, newline="", encoding="utf-8") as f:
+            if self.jsonl:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line).get(key)
+            else:
+                reader = csv.DictReader(f)
+                if self.fieldnames is None:
+                    self.fieldnames = reader.fieldnames
+                for row in reader:
+                    yield row.get(key)
+
+    def write(self, record):
+        if hasattr(record, "as_dict"):
+            record = record.as_dict()
+        if self.jsonl:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            if self._writer is None:
+                self.fieldnames = self.fieldnames or list(record)
+                self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, extrasaction="ignore")
+                if self._file.tell() == 0:
+                    self._writer.writeheader()
+            self._writer.writerow(record)
+
+        self.written += 1
+        self._pending += 1
+        if self._pending >= self.checkpoint_every or \
+                time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
+
+    def write_frame(self, df):
+        """Write every row of a pandas DataFrame in one go, then checkpoint."""
+        if self.jsonl:
+            if len(df):
+                self._file.write(df.to_json(orient="records", lines=True, force_ascii=False).rstrip("\n") + "\n")
+        else:
+            if self._writer is None:
+                self.fieldnames = self.fieldnames or list(df.columns)
+                self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, extrasaction="ignore")
+                if self._file.tell() == 0:
+                    self._writer.writeheader()
+            df.reindex(columns=self.fieldnames, fill_value="").to_csv(self._file, header=False, index=False,
+                                                                      lineterminator="\r\n")
+        self.written += len(df)
+        self.checkpoint()
+
+    def checkpoint(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"offset": self._file.tell()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.checkpoint_path)
+        self._pending = 0
+        self._last_checkpoint = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.checkpoint()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_sink(path, **kwargs):
+    """RecordSink for .csv/.jsonl paths; a path ending in .parquet or .arrow is
+    a directory of columnar parts (scraping.columnar.ColumnarSink, needs pyarrow)."""
+    if path.endswith((".parquet", ".arrow")):
+        from scraping.columnar import ColumnarSink
+        return ColumnarSink(path, **kwargs)
+    return RecordSink(path, **kwargs)
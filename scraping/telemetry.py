@@ -0,0 +1,344 @@
+import bisect
+import collections
+import http.server
+import json
+import os
+import threading
+import time
+
+# Histogram bucket upper bounds in seconds; parse times are mostly well under
+# 10 ms, network phases mostly 10 ms - 10 s
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+                   30.0, 60.0)
+
+# Request phases; not every client reports every phase
+#   dns      host name lookup (aiohttp only; cached lookups are not timed)
+#   connect  new TCP connection plus TLS handshake; with requests it includes
+#            the DNS lookup
+#   ttfb     request sent -> response headers received
+#   total    whole request including the body (browser page load for selenium)
+PHASES = ("dns", "connect", "ttfb", "total")
+
+
+# ---------- Error Taxonomy ----------
+# Exceptions can name their own kind with a `telemetry_kind` class attribute
+# (health_info.profile_extract.MissingHeading is "missing_h2"); otherwise the
+# kind comes from the exception type and, for HTTP errors, the status code.
+def classify_error(error, parsing=False):
+    kind = getattr(error, "telemetry_kind", None)
+    if kind:
+        return kind
+    status = getattr(error, "status", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int) and 400 <= status < 600:
+        return f"{status // 100}xx"
+    # selenium's TimeoutException is not a TimeoutError
+    if isinstance(error, TimeoutError) or "Timeout" in type(error).__name__:
+        return "timeout"
+    if type(error).__name__ == "CacheMiss":
+        return "cache_miss"
+    if parsing or isinstance(error, (ValueError, KeyError, IndexError, TypeError, AttributeError)):
+        return "parse"
+    if isinstance(error, OSError):
+        return "connection"
+    return "other"
+
+
+# ---------- Histogram ----------
+# Prometheus-style: cumulative counts per upper bound plus sum and count.
+# Quantiles for the summary are interpolated within buckets, like
+# histogram_quantile() does. Not locked; Telemetry holds the lock.
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                # observed min/max narrow the end buckets
+                low = max(self.min, self.buckets[i - 1] if i else 0.0)
+                high = min(self.max, self.buckets[i] if i < len(self.buckets) else self.max)
+                return low + (high - low) * (rank - seen) / count
+            seen += count
+        return self.max
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        return {"count": self.count, "mean": self.sum / self.count, "p50": self.quantile(0.5),
+                "p95": self.quantile(0.95), "p99": self.quantile(0.99), "max": self.max, "sum": self.sum}
+
+
+# ---------- Telemetry ----------
+# One per scraper run, shared by every worker thread / coroutine. Records
+#   - latency histograms per request phase (PHASES) and for parsing
+#   - bytes downloaded, pages done, and pages/second over the last `window`
+#     seconds
+#   - errors counted by kind (classify_error)
+#
+# Exported live as Prometheus text on http://127.0.0.1:<port>/metrics (and
+# the JSON summary on /summary) with serve(port), and as a JSON file with
+# write_summary(path) - register that with atexit to get it however the run
+# ends. Comparing the "total" and "parse" histograms shows whether a run is
+# waiting on the network or on the parser.
+#
+# Hooks: trace_config() for aiohttp sessions, mount(session) for requests.
+class Telemetry:
+    def __init__(self, name, window=60.0):
+        self.name = name
+        self.window = window
+        self.started = time.time()
+        self.latency = {phase: Histogram() for phase in PHASES}
+        self.parse = Histogram()
+        self.errors = collections.Counter()
+        self.pages = 0
+        self.bytes = 0
+        self._recent = collections.deque()
+        self._lock = threading.Lock()
+        self._server = None
+
+    def observe(self, phase, seconds):
+        with self._lock:
+            self.latency[phase].observe(seconds)
+
+    def observe_parse(self, seconds):
+        with self._lock:
+            self.parse.observe(seconds)
+
+    def add_bytes(self, count):
+        with self._lock:
+            self.bytes += count
+
+    def page_done(self):
+        now = time.monotonic()
+        with self._lock:
+            self.pages += 1
+            self._recent.append(now)
+            self._trim(now)
+
+    def error(self, error, parsing=False):
+        """Count `error` (an exception or an already classified kind); returns the kind."""
+        kind = error if isinstance(error, str) else classify_error(error, parsing)
+        with self._lock:
+            self.errors[kind] += 1
+        return kind
+
+    def _trim(self, now):
+        while self._recent and now - self._recent[0] > self.window:
+            self._recent.popleft()
+
+    def pages_per_second(self):
+        """Rolling rate over the last `window` seconds (less at the start)."""
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            span = min(self.window, time.time() - self.started)
+            return len(self._recent) / span if span > 0 else 0.0
+
+    # ---------- Export ----------
+    def summary(self):
+        rate = self.pages_per_second()
+        with self._lock:
+            elapsed = time.time() - self.started
+            return {
+                "scraper": self.name,
+                "started": self.started,
+                "elapsed": elapsed,
+                "pages": self.pages,
+                "pages_per_second": self.pages / elapsed if elapsed > 0 else 0.0,
+                "recent_pages_per_second": rate,
+                "bytes": self.bytes,
+                "errors": dict(self.errors),
+                "latency": {phase: histogram.summary() for phase, histogram in self.latency.items()},
+                "parse": self.parse.summary(),
+            }
+
+    def write_summary(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        os.replace(tmp, path)
+
+    def prometheus(self):
+        rate = self.pages_per_second()
+        label = f'scraper="{self.name}"'
+        lines = []
+
+        def histogram(metric, help_text, histograms):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for extra, h in histograms:
+                labels = label + extra
+                for bound, total in h.cumulative():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{metric}_bucket{{{labels},le="{le}"}} {total}')
+                lines.append(f"{metric}_sum{{{labels}}} {h.sum}")
+                lines.append(f"{metric}_count{{{labels}}} {h.count}")
+
+        with self._lock:
+            histogram("scraper_request_seconds", "Request latency by phase.",
+                      [(f',phase="{phase}"', h) for phase, h in self.latency.items()])
+            histogram("scraper_parse_seconds", "Time to parse one page.", [("", self.parse)])
+            lines += [
+                "# HELP scraper_pages_total Pages fetched and parsed.",
+                "# TYPE scraper_pages_total counter",
+                f"scraper_pages_total{{{label}}} {self.pages}",
+                "# HELP scraper_bytes_total Response bytes downloaded.",
+                "# TYPE scraper_bytes_total counter",
+                f"scraper_bytes_total{{{label}}} {self.bytes}",
+                "# HELP scraper_errors_total Failed pages by kind.",
+                "# TYPE scraper_errors_total counter",
+            ]
+            lines += [f'scraper_errors_total{{{label},kind="{kind}"}} {count}' for kind, count in
+                      sorted(self.errors.items())]
+        lines += [
+            f"# HELP scraper_pages_per_second Pages per second over the last {self.window:g}s.",
+            "# TYPE scraper_pages_per_second gauge",
+            f"scraper_pages_per_second{{{label}}} {rate}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=9464, host="127.0.0.1"):
+        """Serve /metrics (Prometheus text) and /summary (JSON) from a daemon
+        thread; port 0 picks a free one. Returns the bound port."""
+        telemetry = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = telemetry.prometheus().encode(), "text/plain; version=0.0.4"
+                elif self.path == "/summary":
+                    body, content_type = json.dumps(telemetry.summary()).encode(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = http.server.ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_port
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def report(self):
+        total, parse = self.latency["total"], self.parse
+        errors = ", ".join(f"{count} {kind}" for kind, count in self.errors.most_common()) or "no errors"
+        fetch_p50 = total.quantile(0.5)
+        parse_p50 = parse.quantile(0.5)
+        return (f"Telemetry: {self.pages} pages ({self.pages_per_second():.1f}/s recent), "
+                f"{self.bytes / 2 ** 20:.1f} MB, fetch p50 "
+                f"{'-' if fetch_p50 is None else f'{fetch_p50 * 1000:.0f} ms'}, parse p50 "
+                f"{'-' if parse_p50 is None else f'{parse_p50 * 1000:.1f} ms'}, {errors}")
+
+    # ---------- Client Hooks ----------
+    def trace_config(self):
+        """aiohttp.TraceConfig recording dns/connect/ttfb and bytes for every
+        request on the session it is passed to."""
+        import aiohttp
+
+        async def on_request_start(session, context, params):
+            context.start = time.monotonic()
+
+        async def on_dns_start(session, context, params):
+            context.dns_start = time.monotonic()
+
+        async def on_dns_end(session, context, params):
+            context.dns = time.monotonic() - context.dns_start
+            self.observe("dns", context.dns)
+
+        async def on_connect_start(session, context, params):
+            context.connect_start = time.monotonic()
+            context.dns = 0.0
+
+        async def on_connect_end(session, context, params):
+            # aiohttp resolves the host inside connection creation
+            self.observe("connect", time.monotonic() - context.connect_start - context.dns)
+
+        async def on_request_end(session, context, params):
+            self.observe("ttfb", time.monotonic() - context.start)
+
+        async def on_chunk(session, context, params):
+            self.add_bytes(len(params.chunk))
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(on_request_start)
+        trace.on_dns_resolvehost_start.append(on_dns_start)
+        trace.on_dns_resolvehost_end.append(on_dns_end)
+        trace.on_connection_create_start.append(on_connect_start)
+        trace.on_connection_create_end.append(on_connect_end)
+        trace.on_request_end.append(on_request_end)
+        trace.on_response_chunk_received.append(on_chunk)
+        return trace
+
+    def mount(self, session, **adapter_kwargs):
+        """Time new connections and responses on a requests.Session: mounts an
+        HTTPAdapter (built with `adapter_kwargs`) whose connections report
+        "connect", and a response hook for "ttfb" and bytes."""
+        from requests.adapters import HTTPAdapter
+        from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+        from urllib3.connection import HTTPConnection, HTTPSConnection
+
+        telemetry = self
+
+        def timed(connection_class):
+            class TimedConnection(connection_class):
+                def connect(self):
+                    start = time.monotonic()
+                    super().connect()
+                    telemetry.observe("connect", time.monotonic() - start)
+            return TimedConnection
+
+        pools = {
+            "http": type("TimedHTTPConnectionPool", (HTTPConnectionPool,),
+                         {"ConnectionCls": timed(HTTPConnection)}),
+            "https": type("TimedHTTPSConnectionPool", (HTTPSConnectionPool,),
+                          {"ConnectionCls": timed(HTTPSConnection)}),
+        }
+
+        class TimedAdapter(HTTPAdapter):
+            def init_poolmanager(self, *args, **kwargs):
+                super().init_poolmanager(*args, **kwargs)
+                self.poolmanager.pool_classes_by_scheme = pools
+
+        def on_response(response, *args, **kwargs):
+            # `elapsed` runs from sending the request to parsing the headers
+            self.observe("ttfb", response.elapsed.total_seconds())
+            self.add_bytes(len(response.content))
+
+        adapter = TimedAdapter(**adapter_kwargs)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.hooks["response"].append(on_response)
+        return session
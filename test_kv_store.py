@@ -0,0 +1,303 @@
+# Multithreaded benchmark for RWKeyValueStore / ReadWriteLock.
+#
+#   read scaling   reader threads each do READ_HOLD of work per read while
+#                  holding the read lock (a read that uses the value in place,
+#                  via store.view); with a plain mutex only one reader is in at
+#                  a time, with the read/write lock they overlap
+#   write latency  reader threads keep every segment busy while one writer
+#                  times each put; compared with a reader-preferring lock,
+#                  which lets overlapping readers keep the writer out
+#
+# CPython runs one thread's bytecode at a time, so pure dict reads don't get
+# faster with more threads whatever the lock; the hold stands for work that
+# releases the GIL (I/O, hashing, numpy) while the value is in use.
+#
+#   python test_kv_store.py            full table
+#   python -m pytest test_kv_store.py  the lock and store checks, no timings
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+import pytest
+
+from DurableKeyValueStore import DurableKeyValueStore
+from ReadWriteLock import ReadWriteLock
+from RWKeyValueStore import RWKeyValueStore
+
+KEYS = 10_000
+READ_HOLD = 0.0002
+WRITE_INTERVAL = 0.002
+
+
+# ---------- Baselines ----------
+class MutexStore:
+    """One dict behind one threading.Lock."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: Dict[Any, Any] = {}
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._data.get(key, default)
+
+    @contextmanager
+    def view(self, key, default=None) -> Iterator[Any]:
+        with self._lock:
+            yield self._data.get(key, default)
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+
+
+class ReaderPreferringLock(ReadWriteLock):
+    """Readers get in whenever no writer is inside, waiting writers or not."""
+
+    def acquire_read(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: not self._writing, timeout):
+                return False
+            self._readers += 1
+            return True
+
+
+def reader_preferring_store(shards: int) -> RWKeyValueStore:
+    store = RWKeyValueStore(shards)
+    for shard in store._shards:
+        shard.lock = ReaderPreferringLock()
+    return store
+
+
+def filled(store):
+    for key in range(KEYS):
+        store.put(key, key)
+    return store
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+# ---------- Workloads ----------
+def read_throughput(store, threads: int, duration: float, hold: float = READ_HOLD) -> float:
+    """Reads per second over all `threads`."""
+    stop = threading.Event()
+    counts = [0] * threads
+
+    def reader(index):
+        rng = random.Random(index)
+        count = 0
+        while not stop.is_set():
+            with store.view(rng.randrange(KEYS)):
+                if hold:
+                    time.sleep(hold)
+            count += 1
+        counts[index] = count
+
+    workers = [threading.Thread(target=reader, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    time.sleep(duration)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def write_latencies(store, readers: int, duration: float, hold: float = READ_HOLD) -> List[float]:
+    """Seconds each put took while `readers` threads read continuously."""
+    stop = threading.Event()
+    latencies: List[float] = []
+
+    def reader(index):
+        rng = random.Random(index)
+        while not stop.is_set():
+            with store.view(rng.randrange(KEYS)):
+                time.sleep(hold)
+
+    def writer():
+        rng = random.Random(-1)
+        while not stop.is_set():
+            key = rng.randrange(KEYS)
+            start = time.perf_counter()
+            store.put(key, -key)
+            latencies.append(time.perf_counter() - start)
+            time.sleep(WRITE_INTERVAL)
+
+    workers = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    workers.append(threading.Thread(target=writer))
+    for worker in workers:
+        worker.start()
+    time.sleep(duration)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return latencies
+
+
+STORES: Dict[str, Callable[[], Any]] = {
+    "mutex": MutexStore,
+    "rwlock x1": lambda: RWKeyValueStore(1),
+    "rwlock x16": lambda: RWKeyValueStore(16),
+    "reader-pref x1": lambda: reader_preferring_store(1),
+}
+
+
+# ---------- Checks ----------
+# Orderings are checked with barriers and events rather than timings, which
+# a loaded machine can stretch; the timings are the benchmark's business.
+def wait_until(condition: Callable[[], bool], timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+def test_readers_overlap():
+    readers = 8
+    store = filled(RWKeyValueStore(1))
+    # every reader holds the one segment's read lock at the barrier: with a
+    # mutex the second would never get in and the barrier would break
+    inside = threading.Barrier(readers + 1, timeout=5)
+    leave = threading.Event()
+
+    def reader(key):
+        with store.view(key):
+            inside.wait()
+            leave.wait(5)
+
+    workers = [threading.Thread(target=reader, args=(i,), daemon=True) for i in range(readers)]
+    for worker in workers:
+        worker.start()
+    inside.wait()
+    assert store._shards[0].lock.readers == readers
+    leave.set()
+    for worker in workers:
+        worker.join()
+    assert store._shards[0].lock.readers == 0
+
+
+def test_writer_not_starved():
+    store = filled(RWKeyValueStore(1))
+    lock = store._shards[0].lock
+    inside, leave = threading.Event(), threading.Event()
+    seen: List[Any] = []
+
+    def early_reader():
+        with store.view(1):
+            inside.set()
+            leave.wait(5)
+
+    early = threading.Thread(target=early_reader, daemon=True)
+    early.start()
+    assert inside.wait(5)
+    writer = threading.Thread(target=store.put, args=(1, -1), daemon=True)
+    writer.start()
+    assert wait_until(lambda: lock._writers_waiting == 1)
+    # the waiting writer holds back readers arriving after it...
+    acquired = lock.acquire_read(timeout=0)
+    if acquired:
+        lock.release_read()
+    assert not acquired
+    late = threading.Thread(target=lambda: seen.append(store.get(1)), daemon=True)
+    late.start()
+    assert not seen
+    # ...and gets in as soon as the readers already inside leave
+    leave.set()
+    for thread in (early, writer, late):
+        thread.join(5)
+    assert seen == [-1] and lock.readers == 0 and not lock.writing
+
+
+def test_write_timeout():
+    lock = ReadWriteLock()
+    with lock.read():
+        start = time.perf_counter()
+        assert not lock.acquire_write(timeout=0.05)
+        assert time.perf_counter() - start >= 0.05
+    # the timed-out writer no longer holds readers back
+    with lock.read(timeout=0.05), lock.read(timeout=0.05):
+        assert lock.readers == 2
+
+
+def test_store_consistent_under_writes():
+    store = RWKeyValueStore(8)
+    threads = [threading.Thread(target=lambda: [store.compute("n", lambda n: (n or 0) + 1) for _ in range(2000)])
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store["n"] == 8000
+    store.update({i: i for i in range(100)})
+    assert store.get_many([1, 2, 500]) == {1: 1, 2: 2} and len(store) == 101
+
+
+def test_durable_store_recovers(tmp_path):
+    with DurableKeyValueStore(str(tmp_path), fsync="always", compact_after=None) as store:
+        store.update({f"k{i}": i for i in range(100)})
+        store.compact()
+        store.put("k1", "rewritten")
+        store.delete("k2")
+        store.compute("n", lambda n: (n or 0) + 1)
+    # a write torn by a crash is dropped, the ones before it kept
+    with open(tmp_path / "log-00000001.wal", "ab") as log:
+        log.write(b"\x00" * 7)
+    with DurableKeyValueStore(str(tmp_path)) as store:
+        assert store.replayed == 3
+        assert store["k1"] == "rewritten" and "k2" not in store and store["k99"] == 99 and store["n"] == 1
+        assert len(store) == 100 and len(store.items()) == 100
+
+
+def test_durable_store_compute_and_retired_snapshots(tmp_path):
+    with DurableKeyValueStore(str(tmp_path), compact_after=None) as store:
+        store.update({"a": 1, "b": 2})
+        # a value that can't be pickled leaves the old one in place
+        with pytest.raises(TypeError):
+            store.compute("a", lambda value: threading.Lock())
+        assert store["a"] == 1
+        store.compact()
+        old = store._snapshot
+        keys = store.keys()
+        assert next(keys) == "a"
+        store.put("c", 3)
+        store.compact()
+        # still being iterated: closed once the iteration finishes
+        assert not old._map.closed
+        assert list(keys) == ["b"] and old._map.closed
+        store.put("d", 4)
+        current = store._snapshot
+        store.compact()
+        assert current._map.closed
+
+
+# ---------- Benchmark ----------
+if __name__ == "__main__":
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    thread_counts = (1, 2, 4, 8, 16)
+    print(f"Reads/second, {READ_HOLD * 1e6:.0f} us held per read")
+    print(f"  {'threads':<16}" + "".join(f"{n:>10}" for n in thread_counts))
+    for name, factory in STORES.items():
+        store = filled(factory())
+        print(f"  {name:<16}" + "".join(f"{read_throughput(store, n, duration):10,.0f}" for n in thread_counts))
+
+    print("Reads/second, nothing held (GIL-bound)")
+    for name in ("mutex", "rwlock x16"):
+        store = filled(STORES[name]())
+        print(f"  {name:<16}" + "".join(f"{read_throughput(store, n, duration, hold=0):10,.0f}"
+                                        for n in thread_counts))
+
+    readers = 8
+    print(f"Write latency with {readers} reader threads")
+    for name, factory in STORES.items():
+        latencies = write_latencies(filled(factory()), readers, duration * 2)
+        print(f"  {name:<16} {len(latencies):5d} puts   p50 {percentile(latencies, 0.5) * 1000:7.3f} ms   "
+              f"p99 {percentile(latencies, 0.99) * 1000:7.3f} ms   max {max(latencies) * 1000:7.3f} ms")
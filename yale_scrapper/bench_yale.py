@@ -0,0 +1,119 @@
+import http.server
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+from scraping.http_cache import ResponseCache
+from yale_scrapper import yale
+
+# ---------- Yale crawler benchmark ----------
+# Serves the recorded API responses in fixtures/ from a local server that adds
+# LATENCY to every response, then crawls every department twice: the old way
+# (one bare requests.get + json.loads(response.text) after another) and with
+# yale.crawl. Both must return the same people. Also times json vs orjson on
+# the fixture bodies.
+#
+#   python -m yale_scrapper.bench_yale [latency_ms]
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+DEPARTMENT_PATH = "/website-api-data/myysm/people/people-by-department/"
+LATENCY = 0.05
+
+
+class FixtureHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path.startswith(DEPARTMENT_PATH):
+            name = parts.path[len(DEPARTMENT_PATH):].strip("/")
+            page = dict(parse_qsl(parts.query)).get("page", "1")
+            name = name if page == "1" else f"{name}.page-{page}"
+        else:
+            name = "index"
+        try:
+            with open(os.path.join(FIXTURES, name + ".json"), "rb") as f:
+                body = f.read()
+        except FileNotFoundError:
+            self.send_error(404)
+            return
+        time.sleep(LATENCY)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve_fixtures():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def legacy_crawl(base_url):
+    data = json.loads(requests.get(base_url).text)
+    people = []
+    for item in data['contextNavigation']['navigationItems']:
+        link = item['link']
+        if '/myysm/people/people-by-department/' not in link['url']:
+            continue
+        url = yale.api_url(base_url, link['url'])
+        page = pages = 1
+        while page <= pages:
+            data = json.loads(requests.get(yale.page_url(url, page)).text)
+            members = data['mainComponents'][0]['models']['members']
+            people.extend(members['collection'])
+            pages = yale.page_count(members)
+            page += 1
+    return people
+
+
+def time_decoders():
+    bodies = []
+    for name in sorted(os.listdir(FIXTURES)):
+        with open(os.path.join(FIXTURES, name), "rb") as f:
+            bodies.append(f.read())
+    size = sum(map(len, bodies))
+    decoder = getattr(yale.loads, "__module__", None) or "json"
+    for label, loads in (("json", lambda body: json.loads(body.decode())), (decoder, yale.loads)):
+        start = time.perf_counter()
+        for _ in range(20):
+            for body in bodies:
+                loads(body)
+        spent = time.perf_counter() - start
+        print(f"  {label:<10} {20 * size / spent / 2 ** 20:7.1f} MB/s decoding")
+
+
+if __name__ == "__main__":
+    LATENCY = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else LATENCY
+    server = serve_fixtures()
+    base_url = f"http://127.0.0.1:{server.server_port}/website-api-data/myysm/people/"
+    print(f"{len(os.listdir(FIXTURES))} recorded responses, {LATENCY * 1000:.0f} ms server latency")
+
+    start = time.perf_counter()
+    legacy = legacy_crawl(base_url)
+    legacy_time = time.perf_counter() - start
+    print(f"  sequential {len(legacy):5d} people  {legacy_time:6.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(directory=tmp)
+        start = time.perf_counter()
+        people = list(yale.crawl(base_url, cache=cache))
+        crawl_time = time.perf_counter() - start
+        cache.close()
+    print(f"  crawl      {len(people):5d} people  {crawl_time:6.2f}s  ({legacy_time / crawl_time:.1f}x, "
+          f"{yale.WORKERS} workers)")
+
+    time_decoders()
+    server.shutdown()
+
+    expected = sorted(item["email"] for item in legacy)
+    sys.exit(0 if sorted(person.email_1 for person in people) == expected else 1)
@@ -0,0 +1,27 @@
+import argparse
+import os
+import time
+
+from health_info.clean import clean_file
+
+# ---------- Clean Yale Output ----------
+# Runs the batch cleaning from health_info.clean over what yale.py saved, so
+# new cleaning rules can be applied without crawling the site again.
+#
+#   python -m yale_scrapper.data_clean
+#   python -m yale_scrapper.data_clean yale_people.parquet yale_people_clean.csv
+
+OUTPUT_PATH = "yale_people.parquet"
+CLEAN_PATH = "yale_people_clean.parquet"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean the people saved by yale.py.")
+    parser.add_argument("source", nargs="?", default=OUTPUT_PATH)
+    parser.add_argument("target", nargs="?", default=CLEAN_PATH)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = clean_file(args.source, args.target, workers=args.workers)
+    print(f"Cleaned {rows} people in {time.perf_counter() - start:.1f}s -> {args.target}")
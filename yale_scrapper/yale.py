@@ -1,67 +1,179 @@
-import requests
+import atexit
+import concurrent.futures
+import contextlib
 import json
+import time
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
 
+import requests
 
-def get_department_urls(base_url):
-    response = requests.get(base_url)
-    data = json.loads(response.text)
-    navigation_items = data['contextNavigation']['navigationItems']
+from scraping.http_cache import ResponseCache
+from scraping.records import DoctorRecord
+from scraping.sink import open_sink
+from scraping.telemetry import Telemetry
 
-    department_urls = {}
-    for item in navigation_items:
-        link = item['link']
-        if '/myysm/people/people-by-department/' in link['url']:
-            department_urls[link['text']] = link['url']
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
 
-    return department_urls
+# Responses are cached on disk between runs; OFFLINE replays from the cache only
+OFFLINE = False
 
+# Department pages fetched at once, all over one pooled keep-alive session
+WORKERS = 16
 
-url = "https://medicine.yale.edu/website-api-data/myysm/people/people-by-department/therapeutic-radiology/"
-departments = get_department_urls(url)
+BASE_URL = "https://medicine.yale.edu/website-api-data/myysm/people/people-by-department/therapeutic-radiology/"
+API_PREFIX = "/website-api-data"
+OUTPUT_PATH = "yale_people.parquet"
 
+# Live Prometheus metrics on http://127.0.0.1:METRICS_PORT/metrics (None to
+# turn off); a JSON summary is written to TELEMETRY_PATH when the run ends
+METRICS_PORT = 9466
+TELEMETRY_PATH = "yale_telemetry.json"
 
-def get_doctor_information(url):
-    response = requests.get(url)
-    data = json.loads(response.text)
-    info = data['mainComponents'][0]['models']['members']['collection']
+telemetry = Telemetry("yale")
 
 
-    result = []
+def make_session(workers=WORKERS):
+    # the adapter times new connections; a response hook records TTFB and bytes
+    return telemetry.mount(requests.Session(), pool_connections=4, pool_maxsize=workers)
 
 
+# ---------- Department List ----------
+def api_url(base_url, link):
+    """Navigation links point at site pages; the same path under API_PREFIX is the JSON."""
+    path = urlsplit(urljoin(base_url, link)).path
+    if not path.startswith(API_PREFIX):
+        path = API_PREFIX + path
+    return urljoin(base_url, path)
 
 
-    for item in info:
-       result.append({
-            "title": title,
-            "forename": forename if type(forename) != type(list) else " ".join(forename),
-            "surname": surname,
-            "full_address": data.get("Practice Address", ""),
-            "institution": data.get("Practice Name", ""),
-            "department": data.get("Specialty", ""),
-            "street": street,
-            "city": city,
-            "state": state,  # Using the state from CSV
-            "postcode": pincode,
-            "country": "United States",
-            "specialty": data.get("Specialty", ""),
-            "reg_number": "",
-            "tel_1": data.get("Phone", ""),
-            "tel_2": "",
-            "tel_3": "",
-            "fax_1": "",
-            "fax_2": "",
-            "fax_3": "",
-            "mobile": "",
-            "email_1": "",
-            "email_2": "",
-            "language": "",
-            "gender": "",
-            "workplace": data.get("Practice Name", ""),
-            "website": data.get("Website", ""),
-            "source_result_url": url
-        })
+def get_department_urls(base_url, session, cache):
+    data = loads(cache.get(session, base_url))
+    navigation_items = data['contextNavigation']['navigationItems']
 
+    department_urls = {}
+    for item in navigation_items:
+        link = item['link']
+        if '/myysm/people/people-by-department/' in link['url']:
+            department_urls[link['text']] = api_url(base_url, link['url'])
 
+    return department_urls
 
 
+# ---------- Department Pages ----------
+def page_url(url, page):
+    if page == 1:
+        return url
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query["page"] = str(page)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def page_count(members):
+    return int((members.get("pagination") or {}).get("totalPages") or 1)
+
+
+def normalize_member(item, department, url):
+    forename = " ".join(part for part in (item.get("firstName"), item.get("middleName")) if part)
+    profile = item.get("url") or ""
+    return DoctorRecord(
+        title=item.get("suffix", ""),
+        forename=forename,
+        surname=item.get("lastName", ""),
+        full_address=item.get("address", ""),
+        institution="Yale School of Medicine",
+        department=item.get("department") or department,
+        specialty=item.get("title", ""),
+        tel_1=item.get("phone", ""),
+        fax_1=item.get("fax", ""),
+        email_1=item.get("email", ""),
+        workplace="Yale School of Medicine",
+        website=urljoin(url, profile) if profile else "",
+        source_result_url=url,
+    )
+
+
+def get_doctor_information(session, cache, url, department=""):
+    """Members on one department page, and how many pages the department has."""
+    start = None
+
+    def throttle():
+        nonlocal start
+        start = time.monotonic()
+
+    body = cache.get(session, url, throttle=throttle)
+    if start is not None:
+        telemetry.observe("total", time.monotonic() - start)
+
+    start = time.perf_counter()
+    data = loads(body)
+    members = data['mainComponents'][0]['models']['members']
+    records = [normalize_member(item, department, url) for item in members['collection']]
+    telemetry.observe_parse(time.perf_counter() - start)
+    telemetry.page_done()
+    return records, page_count(members)
+
+
+# ---------- Crawler ----------
+# Fetches page 1 of every department at once; as each comes back, its
+# remaining pages are queued too, so a department with many pages doesn't
+# hold up the rest. Members are yielded as soon as their page is parsed.
+# Failed pages are reported in `errors` and skipped. Without a `session` or
+# `cache`, a pooled session and a ResponseCache(offline=OFFLINE) are opened
+# for the crawl and closed after it.
+def crawl(base_url=BASE_URL, workers=WORKERS, errors=None, session=None, cache=None):
+    with contextlib.ExitStack() as stack:
+        if session is None:
+            session = stack.enter_context(make_session(workers))
+        if cache is None:
+            cache = ResponseCache(offline=OFFLINE)
+            stack.callback(cache.close)
+        yield from _crawl(base_url, workers, errors, session, cache)
+
+
+def _crawl(base_url, workers, errors, session, cache):
+    departments = get_department_urls(base_url, session, cache)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+
+        def submit(department, url, page):
+            target = page_url(url, page)
+            pending[executor.submit(get_doctor_information, session, cache, target, department)] = (department, url, page)
+
+        for department, url in departments.items():
+            submit(department, url, 1)
+
+        while pending:
+            finished, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                department, url, page = pending.pop(future)
+                try:
+                    records, pages = future.result()
+                except Exception as e:
+                    kind = telemetry.error(e)
+                    print(f"Error scraping {page_url(url, page)} ({kind}): {e}")
+                    if errors is not None:
+                        errors.append((department, page_url(url, page), e))
+                    continue
+                if page == 1:
+                    for next_page in range(2, pages + 1):
+                        submit(department, url, next_page)
+                yield from records
+
+
+if __name__ == "__main__":
+    atexit.register(telemetry.write_summary, TELEMETRY_PATH)
+    if METRICS_PORT is not None:
+        print(f"Metrics on http://127.0.0.1:{telemetry.serve(METRICS_PORT)}/metrics")
+    cache = ResponseCache(offline=OFFLINE)
+    with make_session() as session, open_sink(OUTPUT_PATH, resume=False) as output:
+        for record in crawl(session=session, cache=cache):
+            output.write(record)
+    cache.close()
+    print(cache.report())
+    print(telemetry.report())
+    print(f"Saved {output.written} people to {OUTPUT_PATH}")